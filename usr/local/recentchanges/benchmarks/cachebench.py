@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# csv vs binary columnar ctimecache / systimeche parse and write times                       10/18/2026
+#
+# python3 benchmarks/cachebench.py
+# python3 benchmarks/cachebench.py --dirs 1000000 --files 200000
+#
+# synthetic caches in memory. gpg is left out so only the serialization is timed
+# flake8: noqa: E402
+import argparse
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src import cachefmt
+from src.gpgcrypto import dict_string
+from src.gpgcrypto import dict_to_list
+from src.gpgcrypto import dict_to_list_sys
+
+
+def make_sys(n):
+    cache = {}
+    for i in range(n):
+        root = f"/home/user/projects/dir{i // 1000}/sub{i}"
+        cache[root] = {
+            'modified_time': '2026-10-18 12:00:00',
+            'modified_ep': 1792300000.0 + i / 7,
+            'file_count': str(i % 50),
+            'idx_count': str(i % 30),
+            'idx_bytes': str(i * 4096),
+            'max_depth': str(root.count('/')),
+            'type': 'symlink' if i % 997 == 0 else '',
+            'target': '/mnt/target' if i % 997 == 0 else ''
+        }
+    return cache
+
+
+def make_ctime(n):
+    cache = {}
+    for i in range(n):
+        versions = cache.setdefault(f"/home/user/files/big{i}.bin", {})
+        for v in range(1 + i % 2):
+            versions[1792300000000000 + i * 10 + v] = {
+                "checksum": f"{i:032x}",
+                "entropy": round((i % 800) / 100, 2),
+                "mime": "application/octet-stream",
+                "size": 1048576 + i,
+                "modified_time": '2026-10-18 12:00:00',
+                "owner": None,
+                "domain": None
+            }
+    return cache
+
+
+def timed(fn, *args):
+    t = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t, result
+
+
+def bench(label, kind, cache, to_list, load_csv):
+    el_csv_w, text = timed(lambda c: dict_string(to_list(c)), cache)
+    el_csv_r, parsed = timed(load_csv, text)
+    el_bin_w, blob = timed(cachefmt.dump, kind, cache)
+    el_bin_r, lazy = timed(cachefmt.load, blob)
+
+    sample = list(cache)[::max(1, len(cache) // 1000)]
+    el_touch, _ = timed(lambda c: [c.get(k) for k in sample], lazy)
+    lazy[sample[0] + "/new"] = cache[sample[0]]
+    del lazy[sample[1]]
+    el_rew, blob2 = timed(cachefmt.dump, kind, lazy)
+    parsed[sample[0] + "/new"] = parsed[sample[0]]
+    del parsed[sample[1]]
+
+    same = dict(cachefmt.load(blob2).items()) == parsed
+    print(f"{label:>10} {len(cache):>9} entries  csv {len(text) / 1e6:7.1f} MB  binary {len(blob) / 1e6:7.1f} MB  match {same}")
+    print(f"{'':>10} csv write {el_csv_w:7.3f}s  csv parse {el_csv_r:7.3f}s")
+    print(f"{'':>10} bin write {el_bin_w:7.3f}s  bin load  {el_bin_r:7.3f}s  {len(sample)} gets {el_touch:.4f}s  rewrite after gets {el_rew:.3f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="cache format benchmark")
+    parser.add_argument("--dirs", type=int, default=1000000, help="systimeche directories. default 1000000")
+    parser.add_argument("--files", type=int, default=200000, help="ctimecache files. default 200000")
+    args = parser.parse_args(argv)
+
+    bench("systimeche", cachefmt.SYS, make_sys(args.dirs), dict_to_list_sys, cachefmt.load_sys_csv)
+    bench("ctimecache", cachefmt.CTIME, make_ctime(args.files), dict_to_list, cachefmt.load_ctime_csv)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
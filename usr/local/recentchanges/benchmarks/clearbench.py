@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# cache clear. LIKE over the whole table vs LIKE above the clear marks                        10/18/2026
+#
+# python3 benchmarks/clearbench.py
+# python3 benchmarks/clearbench.py --rows 2000000 --new 20000 --cache 50 --dir /mnt/nvme/tmp
+#
+# a database from create_db with --rows rows in logs and stats that has been cleared once. then --new rows as a few
+# searches add them and the cache is cleared again. every --cache th path is under a cache directory the default
+# cachermPATTERNS delete. the full LIKE and delete_like have to delete the same rows
+# flake8: noqa: E402
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.pyfunctions import cache_clear_patterns
+from src.pysql import create_clear_marks
+from src.pysql import create_db
+from src.pysql import delete_like
+
+
+PATTERNS = [
+    "caches", "cache2", "Cache2", ".cache", "share/Trash", "home/{{user}}/.local/state/wireplumber",
+    "root/.local/state/wireplumber", "usr/share/mime/application", "usr/share/mime/text", "usr/share/mime/image",
+    "release/cache",
+]
+CACHE_DIRS = ("/home/user/.cache/thumbnails", "/home/user/.mozilla/firefox/p/cache2/entries", "/home/user/.local/share/Trash/files")
+TABLES = ("logs", "stats")
+
+
+def paths(start, n, cache_every):
+    for i in range(start, start + n):
+        if i % cache_every == 0:
+            yield f"{CACHE_DIRS[i % len(CACHE_DIRS)]}/f{i}"
+        else:
+            yield f"/home/user/projects/p{i % 997}/src/d{i % 31}/module{i}.py"
+
+
+def fill(c, start, n, cache_every):
+    c.executemany(
+        "INSERT INTO logs (timestamp, filename, changetime, checksum) VALUES ('2026-10-18 12:00:00', ?, '2026-10-18 12:00:00', 'x')",
+        ((p,) for p in paths(start, n, cache_every))
+    )
+    c.executemany(
+        "INSERT INTO stats (action, timestamp, filename, creationtime) VALUES ('Modified', '2026-10-18 12:00:00', ?, '2026-10-18 12:00:00')",
+        ((p,) for p in paths(start, n, cache_every))
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="cache clear benchmark")
+    parser.add_argument("--rows", type=int, default=500000, help="rows in logs and stats. default 500000")
+    parser.add_argument("--new", type=int, default=5000, help="rows added before the second clear. default 5000")
+    parser.add_argument("--cache", type=int, default=100, help="every nth path is a cache file. default 100")
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="where to put the database")
+    args = parser.parse_args(argv)
+
+    fd, db = tempfile.mkstemp(suffix=".db", dir=args.dir)
+    os.close(fd)
+    os.remove(db)
+    try:
+        conn = create_db(db, ("sys", "sys2"), action=True)
+        c = conn.cursor()
+        patterns = cache_clear_patterns("user", PATTERNS)
+
+        fill(c, 0, args.rows, args.cache)
+        conn.commit()
+
+        create_clear_marks(c)
+        t = time.perf_counter()
+        first = sum(delete_like(c, table, p) for p in patterns for table in TABLES)
+        el_first = time.perf_counter() - t
+        conn.commit()
+
+        fill(c, args.rows, args.new, args.cache)
+        conn.commit()
+
+        t = time.perf_counter()
+        like_rows = 0
+        for p in patterns:
+            for table in TABLES:
+                c.execute(f"DELETE FROM {table} WHERE filename LIKE ?", (p,))
+                like_rows += c.rowcount
+        el_like = time.perf_counter() - t
+        conn.rollback()
+
+        t = time.perf_counter()
+        marked_rows = sum(delete_like(c, table, p) for p in patterns for table in TABLES)
+        el_marked = time.perf_counter() - t
+        conn.rollback()
+        conn.close()
+
+        print(f"{args.rows} rows x {len(TABLES)} tables  {len(patterns)} patterns  first clear {first} rows {el_first:.3f}s")
+        print(f"{args.new} new rows  deleted {like_rows} / {marked_rows} same {like_rows == marked_rows}")
+        print(f"clear   LIKE {el_like:8.3f}s  marks {el_marked:8.3f}s  {el_like / max(el_marked, 1e-9):6.1f}x")
+    finally:
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(db + suffix):
+                os.remove(db + suffix)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
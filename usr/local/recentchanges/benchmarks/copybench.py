@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# copy detection for new files. a lookup per file vs detect_copies in one pass                10/18/2026
+#
+# python3 benchmarks/copybench.py
+# python3 benchmarks/copybench.py --new 100000 --logs 500000 --profile 1000000 --dir /mnt/nvme/tmp
+#
+# a database from create_db with --logs rows in logs and --profile rows split over sys_a and sys_b. --new files as
+# logger_process gets them after a large download. every --copy th one has the checksum of a stored file under another
+# inode and every --same th one is already stored under its own inode. both ways have to find the same copies.
+# the per file lookup runs on the first --sample files and its time is scaled to --new. sys_a has no checksum index so
+# each of its lookups reads the whole table
+# flake8: noqa: E402
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.pysql import create_db
+from src.pysql import detect_copies
+
+
+SYS_TABLES = ("sys", "sys2")
+TS = "2026-10-18 12:00:00"
+
+
+def fill(c, table, rows, offset, count=False):
+    extra = ", count" if count else ""
+    marks = ", ?" if count else ""
+    c.executemany(
+        f"INSERT INTO {table} (timestamp, filename, changetime, inode, checksum, filesize{extra}) VALUES (?, ?, ?, ?, ?, ?{marks})",
+        (
+            (TS, f"/home/user/{table}/f{i}", TS, offset + i, f"{offset + i:032x}", 4096, *((1,) if count else ()))
+            for i in range(rows)
+        )
+    )
+
+
+def copy_per_file(cursor, inode, checksum, ps):
+    """ the lookup logger_process ran for each new file before detect_copies """
+    if ps:
+        sys_a, sys_b = SYS_TABLES
+        cursor.execute(
+            f"""
+            SELECT filename, inode FROM logs WHERE checksum = ?
+            UNION ALL
+            SELECT filename, inode FROM {sys_a} WHERE checksum = ?
+            UNION ALL
+            SELECT filename, inode FROM {sys_b} WHERE checksum = ?
+            """,
+            (checksum, checksum, checksum)
+        )
+    else:
+        cursor.execute("SELECT filename, inode FROM logs WHERE checksum = ?", (checksum,))
+    return any(int(o_inode) != inode for _, o_inode in cursor.fetchall())
+
+
+def new_files(n, stored, copy_every, same_every):
+    """ (inode, checksum) of the new files. stored is how many checksums are in the database from inode 0 """
+    files = []
+    for i in range(n):
+        if i % copy_every == 0:
+            files.append((10 ** 9 + i, f"{i % stored:032x}"))  # stored checksum under another inode
+        elif i % same_every == 0:
+            files.append((i % stored, f"{i % stored:032x}"))  # the stored file itself
+        else:
+            files.append((10 ** 9 + i, f"{10 ** 9 + i:032x}"))
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="copy detection benchmark")
+    parser.add_argument("--new", type=int, default=100000, help="new files. default 100000")
+    parser.add_argument("--logs", type=int, default=200000, help="rows in logs. default 200000")
+    parser.add_argument("--profile", type=int, default=400000, help="rows in sys_a and sys_b. default 400000")
+    parser.add_argument("--copy", type=int, default=7, help="every nth new file is a copy. default 7")
+    parser.add_argument("--same", type=int, default=11, help="every nth new file is already stored. default 11")
+    parser.add_argument("--sample", type=int, default=200, help="new files timed with the per file lookup. default 200")
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="where to put the database")
+    args = parser.parse_args(argv)
+
+    fd, db = tempfile.mkstemp(suffix=".db", dir=args.dir)
+    os.close(fd)
+    os.remove(db)
+    try:
+        create_db(db, SYS_TABLES)
+        with sqlite3.connect(db) as conn:
+            c = conn.cursor()
+            sys_b_rows = args.profile // 4
+            fill(c, "logs", args.logs, 0)
+            fill(c, SYS_TABLES[0], args.profile - sys_b_rows, args.logs, count=True)
+            fill(c, SYS_TABLES[1], sys_b_rows, args.logs + args.profile - sys_b_rows, count=True)
+            conn.commit()
+
+            files = new_files(args.new, args.logs + args.profile, args.copy, args.same)
+
+            sample = min(args.sample, args.new)
+            for ps in (False, True):
+                t = time.perf_counter()
+                single = {i for i, (inode, checksum) in enumerate(files[:sample]) if copy_per_file(c, inode, checksum, ps)}
+                el_single = (time.perf_counter() - t) * args.new / max(sample, 1)
+
+                t = time.perf_counter()
+                batched = detect_copies(c, ((i, inode, checksum) for i, (inode, checksum) in enumerate(files)), SYS_TABLES, ps)
+                el_batch = time.perf_counter() - t
+                conn.rollback()
+
+                label = "logs+sys" if ps else "logs"
+                same = single == {i for i in batched if i < sample}
+                print(f"{label:>9} {args.new} new  {len(batched)} copies  first {sample} match {same}")
+                print(f"{'':>9} per file {el_single:8.3f}s (scaled)  detect_copies {el_batch:8.3f}s  {el_single / max(el_batch, 1e-9):6.1f}x")
+    finally:
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(db + suffix):
+                os.remove(db + suffix)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# micro benchmark old Counter entropy path vs histogram backends               10/18/2026
+#
+# python3 benchmarks/entropybench.py
+# python3 benchmarks/entropybench.py --sizes 1M,100M --dir /mnt/sda3/tmp
+#
+# each file is random data written to --dir and removed afterwards. the 2G run needs the free space
+# flake8: noqa: E402
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.fileops import calculate_checksum
+from src.fileops import file_shannon
+from src.histogram import BACKENDS
+
+
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(value):
+    value = value.strip().upper()
+    if value[-1] in UNITS:
+        return int(float(value[:-1]) * UNITS[value[-1]])
+    return int(value)
+
+
+def make_file(path, size):
+    block = 8 * 1024 * 1024
+    with open(path, "wb") as f:
+        left = size
+        while left > 0:
+            n = min(block, left)
+            f.write(os.urandom(n))
+            left -= n
+
+
+def old_path(file_path):
+    """ the original calculate_checksum loop """
+    counts = Counter()
+    total_size = 0
+    hash_func = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(8192):
+            hash_func.update(chunk)
+            counts.update(chunk)
+            total_size += len(chunk)
+    return hash_func.hexdigest(), file_shannon(counts, total_size)
+
+
+def hash_only(file_path):
+    hash_func = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(8192):
+            hash_func.update(chunk)
+    return hash_func.hexdigest(), None
+
+
+def new_path(file_path):
+    st = os.lstat(file_path)
+    checks, entropy, *_ = calculate_checksum(file_path, None, st.st_mtime_ns // 1000, st.st_ino, st.st_size, retry=1)
+    return checks, entropy
+
+
+def timed(fn, file_path):
+    t = time.perf_counter()
+    result = fn(file_path)
+    return time.perf_counter() - t, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="entropy histogram benchmark")
+    parser.add_argument("--sizes", default="1M,100M,2G", help="comma separated sizes. default 1M,100M,2G")
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="where to write the test files")
+    parser.add_argument("--skip-old", action="store_true", help="dont run the Counter path on files over 100M")
+    args = parser.parse_args(argv)
+
+    print(f"backends available: {', '.join(BACKENDS)}")
+    print(f"{'size':>8} {'path':>10} {'seconds':>10} {'MB/s':>10}  entropy")
+
+    for label in args.sizes.split(","):
+        size = parse_size(label)
+        with tempfile.NamedTemporaryFile(dir=args.dir, prefix="entropybench_", delete=False) as tmp:
+            file_path = tmp.name
+        try:
+            make_file(file_path, size)
+            runs = [("hash", hash_only), ("new", new_path)]
+            if not (args.skip_old and size > UNITS["M"] * 100):
+                runs.insert(1, ("old", old_path))
+
+            baseline = None
+            for name, fn in runs:
+                el, (checks, entropy) = timed(fn, file_path)
+                if name == "old":
+                    baseline = (checks, entropy)
+                elif name == "new" and baseline and baseline != (checks, entropy):
+                    print(f"mismatch old {baseline} new {(checks, entropy)}")
+                rate = (size / UNITS["M"]) / el if el else 0.0
+                print(f"{label:>8} {name:>10} {el:>10.3f} {rate:>10.1f}  {entropy if entropy is not None else ''}")
+        finally:
+            os.remove(file_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
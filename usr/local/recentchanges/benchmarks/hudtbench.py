@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# hudt output throughput. a line at a time vs queued and written per frame                     10/18/2026
+#
+# QT_QPA_PLATFORM=offscreen python3 benchmarks/hudtbench.py
+# python3 benchmarks/hudtbench.py --lines 200000 --chunk 64 --show
+#
+# --lines paths as a search with feedback prints them. they come in reads of --chunk lines as handle_stdout gets them
+# and every --color th one is colored. the event loop runs after each read. the line pane inserts each line as hudt did
+# before. lines/s is until the last line is on screen
+# flake8: noqa: E402
+import argparse
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from PySide6.QtGui import QTextCharFormat, QTextCursor
+from PySide6.QtWidgets import QApplication, QPlainTextEdit
+from src.qtclasses import ANSI_COLOR_MAP
+from src.qtclasses import ANSI_REGEX
+from src.qtclasses import FastColorText
+from src.qtclasses import RESET_CODE
+
+
+class LineText(QPlainTextEdit):
+    """ hudt before. each line split and inserted as it arrives """
+
+    def __init__(self):
+        super().__init__()
+        self.setReadOnly(True)
+        self.current_color = None
+
+    def append_colored_output(self, line):
+        parts = ANSI_REGEX.split(line)
+        i = 0
+        while i < len(parts):
+            if parts[i]:
+                fmt = QTextCharFormat()
+                if self.current_color:
+                    fmt.setForeground(self.current_color)
+                cursor = self.textCursor()
+                cursor.movePosition(QTextCursor.MoveOperation.End)
+                cursor.insertText(parts[i], fmt)
+                self.setTextCursor(cursor)
+            i += 1
+            if i < len(parts):
+                code = parts[i]
+                if code == RESET_CODE:
+                    self.current_color = None
+                elif code in ANSI_COLOR_MAP:
+                    self.current_color = ANSI_COLOR_MAP[code]
+                i += 1
+        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+
+    def flush_output(self):
+        pass
+
+
+def lines(n, color_every):
+    for i in range(n):
+        line = f"/home/user/projects/p{i % 997}/src/d{i % 31}/module{i}.py"
+        yield f"\033[36m{line}\033[0m\n" if i % color_every == 0 else line + "\n"
+
+
+def run(app, pane, n, chunk, color_every):
+    batch = []
+    t = time.perf_counter()
+    for line in lines(n, color_every):
+        batch.append(line)
+        if len(batch) == chunk:
+            for b in batch:
+                pane.append_colored_output(b)
+            batch = []
+            app.processEvents()
+    for b in batch:
+        pane.append_colored_output(b)
+    pane.flush_output()
+    app.processEvents()
+    return time.perf_counter() - t
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="hudt output benchmark")
+    parser.add_argument("--lines", type=int, default=50000, help="lines printed. default 50000")
+    parser.add_argument("--chunk", type=int, default=32, help="lines per stdout read. default 32")
+    parser.add_argument("--color", type=int, default=10, help="every nth line is colored. default 10")
+    parser.add_argument("--show", action="store_true", help="show the panes")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    results = []
+    for label, cls in (("line", LineText), ("queued", FastColorText)):
+        pane = cls()
+        pane.resize(900, 600)
+        if args.show:
+            pane.show()
+        el = run(app, pane, args.lines, args.chunk, args.color)
+        results.append(el)
+        print(f"{label:>7} {args.lines} lines {el:8.3f}s  {args.lines / max(el, 1e-9):10.0f} lines/s  {pane.blockCount()} blocks kept")
+        pane.close()
+    print(f"{results[0] / max(results[1], 1e-9):.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
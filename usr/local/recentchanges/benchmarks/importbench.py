@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# import time of the command line entry point                                                  10/18/2026
+#
+# python3 benchmarks/importbench.py
+# python3 benchmarks/importbench.py --budget 300 --runs 5 --top 15
+#
+# runs main.py as /usr/local/bin/recentchanges does in a fresh interpreter with -X importtime and reports the best
+# total of --runs along with the slowest modules. the arguments 5 search load the whole search but stop at
+# "Exiting not a search." before it starts. exits 1 if the total is over --budget ms or a gui only module
+# (PySide6 pyudev psutil requests) was imported so it can gate a change to the command line import graph
+# flake8: noqa: E402
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGET = ["main.py", "bench", str(ROOT), "5", "search"]
+STOP = "Exiting not a search."
+GUI_ONLY = ("PySide6", "pyudev", "psutil", "requests")
+BUDGET_MS = 300.0  # about 230 ms here. tests/test_import_budget.py holds the command line to this
+
+
+def import_times(python, target=TARGET, stop=STOP):
+    """ {module: (self us, cumulative us)} for one cold interpreter. target is what follows -X importtime and stop a
+        line it has to print. without stop it has to exit 0 """
+    proc = subprocess.run([python, "-X", "importtime", *target], cwd=ROOT, capture_output=True, text=True)
+    if (stop not in proc.stdout) if stop else proc.returncode != 0:
+        print(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"{' '.join(target)} failed")
+        return None
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative))
+    return times
+
+
+def best_total(python, runs, target=TARGET, stop=STOP):
+    """ (total us, times) of the fastest of runs cold interpreters or None """
+    best = None
+    for _ in range(max(1, runs)):
+        times = import_times(python, target, stop)
+        if times is None:
+            return None
+        total = sum(s for s, _ in times.values())
+        if best is None or total < best[0]:
+            best = (total, times)
+    return best
+
+
+def gui_modules(times):
+    return sorted(name for name in times if name.split(".")[0] in GUI_ONLY)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="command line import time benchmark")
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, help=f"max total ms. default {BUDGET_MS:.0f}")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters. best is kept. default 5")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list by self time. default 15")
+    parser.add_argument("--python", default=sys.executable, help="interpreter to time. default this one")
+    args = parser.parse_args(argv)
+
+    best = best_total(args.python, args.runs)
+    if best is None:
+        return 1
+    total, times = best
+
+    print(f"python {' '.join(TARGET)}  best of {args.runs}: {total / 1000:.1f} ms  budget {args.budget:.0f} ms")
+    print()
+    for name, (self_us, cumulative) in sorted(times.items(), key=lambda kv: kv[1][0], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.2f} ms self {cumulative / 1000:8.2f} ms cumulative  {name}")
+
+    gui = gui_modules(times)
+    if gui:
+        print()
+        print("gui only modules imported:", ", ".join(gui))
+    over = total / 1000 > args.budget
+    if over:
+        print()
+        print(f"over budget by {total / 1000 - args.budget:.1f} ms")
+    return 1 if gui or over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
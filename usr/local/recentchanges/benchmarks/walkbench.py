@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# find vs files_search single threaded vs ParallelWalk on a synthetic tree                   10/18/2026
+#
+# python3 benchmarks/walkbench.py
+# python3 benchmarks/walkbench.py --files 1000000 --dir /mnt/nvme/tmp --threads 1,4,8,16 --keep
+# sudo python3 benchmarks/walkbench.py --drop-caches
+#
+# the tree is --files empty files spread over directories --width wide and --depth deep under --dir. it is reused
+# if --keep left one from an earlier run with the same shape. find runs with the -printf the search uses. --drop-caches
+# (root) flushes the page cache before every run so the walk is cold as it is for a real search
+# flake8: noqa: E402
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.dirwalkerfunctions import files_search
+
+
+PRINTF = "%T@ %A@ %C@ %i %M %n %s %u %g %m %p\\0"
+
+
+def leaf_dirs(root, width, depth):
+    dirs = [root]
+    for _ in range(depth):
+        dirs = [os.path.join(d, f"d{i}") for d in dirs for i in range(width)]
+    return dirs
+
+
+def make_tree(root, files, width, depth):
+    marker = os.path.join(root, f".walkbench_{files}_{width}_{depth}")
+    if os.path.isfile(marker):
+        return False
+    shutil.rmtree(root, ignore_errors=True)
+    leaves = leaf_dirs(root, width, depth)
+    per_dir = max(1, files // len(leaves))
+    n = 0
+    for d in leaves:
+        os.makedirs(d, exist_ok=True)
+        for i in range(min(per_dir, files - n)):
+            open(os.path.join(d, f"f{i}.txt"), "wb").close()
+        n += per_dir
+        if n >= files:
+            break
+    open(marker, "wb").close()
+    return True
+
+
+def drop_caches():
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as f:
+        f.write("3\n")
+
+
+def run_find(root):
+    proc = subprocess.run(["find", root, "-xdev", "-not", "-type", "d", "-printf", PRINTF], capture_output=True)
+    return proc.stdout.count(b"\0")
+
+
+def run_walk(root, threads):
+    records, _ = files_search(root, datetime(1970, 1, 2), False, [], threads=threads)
+    return len(records or ())
+
+
+def timed(fn, *args, cold=False):
+    if cold:
+        drop_caches()
+    t = time.perf_counter()
+    n = fn(*args)
+    return time.perf_counter() - t, n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="directory walk benchmark")
+    parser.add_argument("--files", type=int, default=1000000, help="files in the tree. default 1000000")
+    parser.add_argument("--width", type=int, default=10, help="subdirectories per directory. default 10")
+    parser.add_argument("--depth", type=int, default=4, help="directory levels. default 4")
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="where to build the tree")
+    parser.add_argument("--threads", default="1,4,8,16", help="comma separated walker thread counts. default 1,4,8,16")
+    parser.add_argument("--drop-caches", action="store_true", help="flush the page cache before each run. needs root")
+    parser.add_argument("--keep", action="store_true", help="leave the tree for the next run")
+    args = parser.parse_args(argv)
+
+    root = os.path.join(args.dir, "walkbench")
+    t = time.perf_counter()
+    if make_tree(root, args.files, args.width, args.depth):
+        print(f"built {args.files} files in {time.perf_counter() - t:.1f}s")
+
+    try:
+        cold = args.drop_caches
+        timed(run_find, root)  # warm the dentries once when not cold so the first run isnt penalized
+        el, n = timed(run_find, root, cold=cold)
+        print(f"{'find':>12} {el:8.3f}s  {n} files  {n / el:10.0f} files/s")
+        for threads in (int(x) for x in args.threads.split(",")):
+            el, n = timed(run_walk, root, threads, cold=cold)
+            print(f"{f'walk {threads}':>12} {el:8.3f}s  {n} files  {n / el:10.0f} files/s")
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
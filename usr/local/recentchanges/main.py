@@ -10,8 +10,13 @@ import tempfile
 import threading
 import traceback
 from pathlib import Path
-from PySide6.QtCore import Qt, Slot, Signal, QThread, QTimer, QSortFilterProxyModel, QSize
-from PySide6.QtGui import QStandardItemModel, QStandardItem, QIcon, QPixmap, QImage, QPalette, QColor
+if __name__ == "__main__" and (os.environ.get("CMD_LINE") or len(sys.argv) >= 2):
+    # command line. dispatch before Qt and the gui modules are imported
+    multiprocessing.freeze_support()
+    from src.qtparser import dispatch_internal
+    dispatch_internal(sys.argv)
+from PySide6.QtCore import Qt, Slot, Signal, QThread, QTimer, QSize
+from PySide6.QtGui import QIcon, QPixmap, QImage, QPalette, QColor
 from PySide6.QtSql import QSqlQuery
 from PySide6.QtWidgets import QApplication, QFileDialog, QMessageBox, QMainWindow, QMenu, QHeaderView, QStyle
 from src.alarmclock import AlarmClock
@@ -27,7 +32,8 @@ from src.config import update_toml_setting
 from src.config import update_toml_values
 from src.configfunctions import find_gnupg_home
 from src.configfunctions import get_config
-from src.dbworkerstream import DbWorkerIncremental
+from src.dbpagemodel import PagedTableModel
+from src.dbpagemodel import superimpose_query
 from src.gpgcrypto import decr
 from src.gpgcrypto import encr
 from src.gpgcrypto import GPGStatus
@@ -47,6 +53,7 @@ from src.pyfunctions import cnc
 from src.pyfunctions import is_integer
 from src.pyfunctions import user_path
 from src.pysql import create_db
+from src.pysql import dbsync_sys_summary
 from src.pysql import dbtable_has_data
 from src.pysql import get_lifetime_throughput
 from src.pysql import get_unique_files
@@ -97,7 +104,6 @@ from src.qtfunctions import user_data_to_database
 from src.qtfunctions import valid_crest
 from src.qtfunctions import window_prompt
 from src.qtfunctions import window_message
-from src.qtparser import dispatch_internal as dispatcher
 from src.query import blank_count
 from src.rntchangesfunctions import change_perm
 from src.rntchangesfunctions import check_utility
@@ -174,6 +180,7 @@ class MainWindow(QMainWindow):
 
         self.moduleNAME = config['paths']['moduleNAME']  # diff file prefix
         self.python = config['search']['python']
+        self.nameIDX = config['search'].get('nameIDX', False)
         self.basedir = config['search']['drive']  # search target
         self.oldbasedir = self.basedir
         proteusEXTN = config['shield']['proteusEXTN']
@@ -181,6 +188,7 @@ class MainWindow(QMainWindow):
         self.proteusPATH = config['shield']['proteusPATH']
         self.checksum = config['diagnostics']['checkSUM']
         self.checkMETHOD = config['diagnostics']['checkMETHOD']
+        self.scanTIER = config['diagnostics'].get('scanTIER', 1)
         self.proteusSHIELD = config['shield']['proteusSHIELD']
         self.xzm = config['shield']['xzm']
         self.is_xzm_profile = self.xzm if self.suffix == "/" else False
@@ -308,7 +316,6 @@ class MainWindow(QMainWindow):
         self.saved_history = ""  # 07/08/2026 save history view alongside encrypted notes in extn table
 
         self.worker = None
-        self.worker2 = None  # database streamer
 
         self.worker_thread = None
         self.proc = None
@@ -413,12 +420,9 @@ class MainWindow(QMainWindow):
 
     @Slot(str)
     def append_log(self, text):
-        cursor = self.ui.hudt.textCursor()
-        cursor.movePosition(cursor.MoveOperation.End)
-
         text = text or "\n"
 
-        if text and cursor.positionInBlock() != 0 and not text.startswith(("\n", "\r")):
+        if text and not self.ui.hudt.at_line_start() and not text.startswith(("\n", "\r")):
             text = "\n" + text
 
         if not text.endswith(("\n", "\r")):
@@ -426,6 +430,14 @@ class MainWindow(QMainWindow):
 
         self.ui.hudt.append_colored_output(text)
 
+    def open_hudt_output(self):
+        """ the whole output of the session. hudt only keeps the end """
+        self.ui.hudt.flush_output()
+        if self.ui.hudt.spool_path:
+            display(self.dspEDITOR, self.ui.hudt.spool_path, self.dspPATH, True)
+        else:
+            self.ui.hudt.appendPlainText("Hudt output file unavailable")
+
     @Slot(str)
     def update_db_status(self, text):
         """ control dbmainlabel / ui elements """
@@ -438,6 +450,10 @@ class MainWindow(QMainWindow):
     def increment_progress(self, value):
         self.ui.progressBAR.setValue(value)
 
+    @Slot(str)
+    def show_stage_rate(self, text):
+        self.ui.progressBAR.setFormat(f"%p%  {text}")
+
     @Slot(int)
     def increment_db_progress(self, value):
         self.ui.dbprogressBAR.setValue(value)
@@ -483,6 +499,7 @@ class MainWindow(QMainWindow):
             "}"
         )
         layout.addWidget(self.ui.hudt, *position)
+        self.ui.hudt.set_spool(os.path.join(self.log_dir, "hudt.log"))  # all of the output. the pane keeps the end
 
         # self.ui.hudt.append_colored_output("\033[31mRed text\033[0m")  test nested ansi colors
         # self.ui.hudt.append_colored_output("\033[1;32mGreen bold\033[0m\033[31mRed text\033[0m")
@@ -588,6 +605,7 @@ class MainWindow(QMainWindow):
         # menu.addAction("Filter", lambda: display(self.dspEDITOR, self.filter_file, self.dspPATH, True))
 
         menu.addAction("Clear Hudt", lambda: self.ui.hudt.clear())
+        menu.addAction("Hudt output", self.open_hudt_output)
         menu.addAction("List fonts", lambda: available_fonts(self.ui.hudt))
         menu.addAction("Set system clock", self.set_clock)
         self.ui.tomlb.setMenu(menu)
@@ -638,6 +656,8 @@ class MainWindow(QMainWindow):
 
         self.ui.dbidxb2.clicked.connect(self.build_idx)
         self.ui.dbidxb3.clicked.connect(self.scan_idx)
+        self.ui.dbidxb3.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.ui.dbidxb3.customContextMenuRequested.connect(self.scan_idx_menu)
 
         self.ui.tableView.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.ui.tableView.customContextMenuRequested.connect(self.table_context_menu)
@@ -1055,17 +1075,13 @@ class MainWindow(QMainWindow):
 
         if getattr(self, 'isexec', False):
             self.clean_up()
-            for x, t in enumerate((getattr(self, 'worker_thread', None), getattr(self, 'worker2', None))):
-                try:
-                    if isinstance(t, QThread) and t.isRunning():
-                        if x == 1:
-                            t.requestInterruption()
-                            t.wait(3000)
-                        else:
-                            logging.debug(f"closeEvent couldnt close thread {x}")
-                except (RuntimeError, AttributeError) as e:
-                    logging.debug(f"closeEvent couldnt close thread. {e}")
-                    pass
+            t = getattr(self, 'worker_thread', None)
+            try:
+                if isinstance(t, QThread) and t.isRunning():
+                    logging.debug("closeEvent couldnt close thread 0")
+            except (RuntimeError, AttributeError) as e:
+                logging.debug(f"closeEvent couldnt close thread. {e}")
+                pass
             proc = getattr(self, 'proc', None)
             if proc:
                 try:
@@ -1082,6 +1098,7 @@ class MainWindow(QMainWindow):
         except Exception:
             logging.error("closeEvent couldnt disconnect hudt properly")
             pass
+        self.ui.hudt.close_spool()
 
         super().closeEvent(event)
         event.accept()
@@ -1114,6 +1131,8 @@ class MainWindow(QMainWindow):
                 zipPROGRAM = updated_config['compress']['zipPROGRAM'].lower()
                 checksum = updated_config['diagnostics']['checkSUM']
                 checkMETHOD = updated_config['diagnostics']['checkMETHOD']
+                scanTIER = updated_config['diagnostics'].get('scanTIER', 1)
+                nameIDX = updated_config['search'].get('nameIDX', False)
                 hudCOLOR = updated_config['display']['hudCOLOR']
                 hudSZE = updated_config['display']['hudSZE']
                 hudFNT = updated_config['display']['hudFNT']
@@ -1366,6 +1385,8 @@ class MainWindow(QMainWindow):
                 self.proteusPATH = proteusPATH
                 self.checksum = checksum
                 self.checkMETHOD = checkMETHOD
+                self.scanTIER = scanTIER
+                self.nameIDX = nameIDX
                 self.proteusSHIELD = proteusSHIELD
                 self.xzm = xzm
                 self.is_xzm_profile = xzm if self.basedir == "/" else False
@@ -2018,8 +2039,6 @@ class MainWindow(QMainWindow):
 
     def tableview_loaded(self):
         mdl = self.ui.tableView.model()
-        if isinstance(mdl, QSortFilterProxyModel):
-            mdl = mdl.sourceModel()
         return bool(self.db and mdl and mdl.rowCount())
 
     def init_page2(self):
@@ -2053,6 +2072,7 @@ class MainWindow(QMainWindow):
 
     def open_proc(self, timeout=0):
         self.ui.progressBAR.setValue(0)
+        self.ui.progressBAR.setFormat("%p%")
         self.result = None
         self.exit_result = None
 
@@ -2060,6 +2080,7 @@ class MainWindow(QMainWindow):
             self.proc_timeout_timer.start(timeout)
 
         self.proc.progress.connect(self.increment_progress)
+        self.proc.rate.connect(self.show_stage_rate)
         self.proc.log.connect(self.append_log)  # self.append_colored_output
         self.proc.error.connect(self.append_log)
         self.stop_proc_sn.connect(self.proc.stop)
@@ -2295,6 +2316,8 @@ class MainWindow(QMainWindow):
             self.tempdir,
             str(self.log_path)
         ]
+        if action == "find" and self.nameIDX and os.path.isfile(self.dbopt):
+            args[1:1] = ["--dbopt", self.dbopt]  # ahead of the positionals processhandler appends
         # cmd = os.path.join(self.lclhome, "findfile.py")  # this example would be run python on findfile.py if not using polkit  # Note: "src",  # find script source if meipath ect. qt doesnt run as root and uses polkit helper\wrapper.
         # using polkit set_recent_helper
         if not self.is_pyinstall:
@@ -2416,13 +2439,29 @@ class MainWindow(QMainWindow):
     # Moved here as database integrated. central hub for core feature system index.   QProcess start logic above. Thread start logic below
 
     # Main Scan IDX
-    def scan_idx(self):
+    def scan_idx(self, tier=None):
         if not self.job_running():
             return
-        self.run_scan_idx()
+        self.run_scan_idx(tier=tier)
+
+    # right click Scan IDX to pick the tier for one scan. a click uses scanTIER
+    def scan_idx_menu(self, pos):
+        button = self.ui.dbidxb3
+        menu = QMenu(button)
+        tiers = {
+            menu.addAction("Stat only"): 0,
+            menu.addAction("Stat and sample"): 1,
+            menu.addAction("Full rehash"): 2
+        }
+        for action, tier in tiers.items():
+            action.setCheckable(True)
+            action.setChecked(tier == self.scanTIER)
+        chosen = menu.exec(button.mapToGlobal(pos))
+        if chosen in tiers:
+            self.scan_idx(tiers[chosen])
 
     # Main Scan IDX
-    def run_scan_idx(self, show_diff=None):
+    def run_scan_idx(self, show_diff=None, tier=None):
         if not dbtable_has_data(self.dbopt, self.sys_a):
             self.isexec = False
             return  # check if a sys profile exists
@@ -2465,7 +2504,9 @@ class MainWindow(QMainWindow):
             str(showDiff),
             str(self.compLVL),
             'True',
-            'True'
+            'True',
+            '--tier',
+            str(self.scanTIER if tier is None else tier)
         ]
         if not self.is_pyinstall:
             args = [sys.executable, self.app] + args
@@ -2783,7 +2824,7 @@ class MainWindow(QMainWindow):
                 if tables:
                     tables = [
                         t for t in tables
-                        if t not in {"extn", "analytics", "scans", "scan_entries"}
+                        if t not in {"extn", "analytics", "scans", "scan_entries"} and not t.startswith(("sum_", "name_"))
                     ]
                     res = True
                     self.db = True
@@ -2791,9 +2832,7 @@ class MainWindow(QMainWindow):
 
                     if not only_combo:
                         self.table = table
-                        self.init_table_model_proxy()
-                        self.init_dbstreamer(table, batch_size=500)
-                        self.worker2.start()
+                        self.init_table_model(table)
 
                     if dybit:  # Anything to append?
                         query = QSqlQuery(db)
@@ -2826,7 +2865,7 @@ class MainWindow(QMainWindow):
                 self._status_reset_timer.stop()
             self.ui.dbmainlabel.setText("Status: Connected" if res else "Status: offline")
 
-        if not (only_combo or res) and getattr(self, 'worker2', None) is None:
+        if not (only_combo or res):
             self.isexec = False
             self.ui.combdb.setEnabled(True)
             # QApplication.restoreOverrideCursor()
@@ -2835,33 +2874,28 @@ class MainWindow(QMainWindow):
         return res
 
     # db and db Sql helpers
-    def init_dbstreamer(self, table, sys_tables=None, cache_tables=None, superimpose=False, batch_size=500):
+    # the view pages rows from sqlite as it scrolls. sorting and filtering are done in sql by the model
+    def init_table_model(self, table, sys_tables=None, cache_tables=None, superimpose=False):
 
         self.result = None
         self.exit_result = -1
-        self.worker2 = DbWorkerIncremental(self.dbopt, table, sys_tables, cache_tables, superimpose=superimpose, batch_size=batch_size)
-        self.worker2.log.connect(self.append_log)
-        self.worker2.exception.connect(
-            lambda t, v, tb: sys.excepthook(t, v, tb)
-        )
-        self.worker2.headers_ready.connect(lambda headers, tname=table: self.on_header_values(headers, tname))
-        self.worker2.batch_ready.connect(self.append_rows_to_model)
-        self.worker2.finished_loading.connect(
-            lambda code, tname=table: self.on_load_finished(tname, code)
-        )
-        self.worker2.finished.connect(self.worker2.deleteLater)
+        view = self.ui.tableView
+        old = view.model()
+
+        query = superimpose_query(sys_tables, cache_tables) if superimpose else None
+        self.model = PagedTableModel(self.dbopt, table, query)
+        view.setSortingEnabled(False)
+        view.setModel(self.model)
+        if isinstance(old, PagedTableModel):
+            old.close()
 
-    def init_table_model_proxy(self):
-        self.model = QStandardItemModel()
-        self.proxy = QSortFilterProxyModel()
-        self.proxy.setSourceModel(self.model)
-        self.proxy.setSortCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self.ui.tableView.setModel(self.proxy)
-        self.ui.tableView.setSortingEnabled(False)
+        self.on_header_values(self.model.headers, table)
+        view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)  # table order until a header is clicked
+        view.setSortingEnabled(True)
+        self.on_load_finished(table, 0)
 
     # main dn draw set appropriate sizes
     def on_header_values(self, headers, table):
-        self.model.setHorizontalHeaderLabels(headers)
         header = self.ui.tableView.horizontalHeader()
         # header.setSectionResizeMode(QHeaderView.Fixed)
         header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
@@ -2893,27 +2927,10 @@ class MainWindow(QMainWindow):
                 if i < len(headers):
                     header.resizeSection(i, w)
 
-    @Slot(list)
-    def append_rows_to_model(self, rows):
-        for row_data in rows:
-            items = []
-            for val in row_data:
-                item = QStandardItem(str(val))
-                if isinstance(val, (int, float)):
-                    item.setData(val, Qt.ItemDataRole.DisplayRole)
-                items.append(item)
-            self.model.appendRow(items)
-
     def on_load_finished(self, table, code):
-        if code != 7:
-            # if table == "logs":
-            #     self.ui.tableView.sortByColumn(0, Qt.SortOrder.AscendingOrder)
-            self.ui.tableView.setSortingEnabled(True)
-            self.proxy.sort(-1)
         self.result = code
         self.ui.combdb.setEnabled(True)
         # QApplication.restoreOverrideCursor()
-        self.worker2 = None
         self.isexec = False
 
     def reload_table(self):
@@ -2940,8 +2957,6 @@ class MainWindow(QMainWindow):
         # QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
         try:
 
-            self.init_table_model_proxy()
-
             s = self.sys_step
             prefix, key = parse_suffix(s)
 
@@ -2978,19 +2993,37 @@ class MainWindow(QMainWindow):
             # QApplication.restoreOverrideCursor()
             return
 
-        self.init_dbstreamer(table, sys_tables, cache_tables, superimpose=True, batch_size=500)
-        self.worker2.start()
+        if sys_tables and not dbsync_sys_summary(self.dbopt, sys_tables[1]):
+            self.ui.hudt.appendPlainText(f"Failed to superimpose {table}: unable to sync the change summary")
+            self.on_load_finished(table, 1)
+            return
+
+        try:
+            self.init_table_model(table, sys_tables, cache_tables, superimpose=True)
+        except sqlite3.Error as e:
+            self.ui.hudt.appendPlainText(f"Failed to superimpose {table}: {e}")
+            self.on_load_finished(table, 1)
 
     def table_context_menu(self, pos):
         view = self.ui.tableView
-        if not view.selectedIndexes():
+        model = view.model()
+        if not view.selectedIndexes() or not isinstance(model, PagedTableModel):
             return
 
         menu = QMenu(view)
         copy_action = menu.addAction("Copy")
+        filter_action = menu.addAction("Filter to this value")
+        clear_action = menu.addAction("Clear filter")
+        clear_action.setEnabled(model.filter is not None)
         chosen = menu.exec(view.viewport().mapToGlobal(pos))
         if chosen == copy_action:
             self.copy_current_cell()
+        elif chosen == filter_action:
+            idx = view.currentIndex()
+            if idx.isValid():
+                model.set_filter(idx.column(), idx.data(Qt.ItemDataRole.EditRole))
+        elif chosen == clear_action:
+            model.set_filter()
 
     def copy_current_cell(self):
         idx = self.ui.tableView.currentIndex()
@@ -3714,10 +3747,6 @@ def secure_onefile():
 
 
 if __name__ == "__main__":
-    caller = os.environ.get("CMD_LINE")
+    # secure_onefile()
     multiprocessing.freeze_support()
-    if caller or len(sys.argv) >= 2:
-        # secure_onefile()
-
-        dispatcher(sys.argv)
     sys.exit(start_main_window())
@@ -1,7 +1,6 @@
 import logging
 import os
 import psutil
-import re
 import sys
 import time
 import threading
@@ -22,7 +21,7 @@ from src.dirwalkerlinux import get_config_data
 from src.logs import emit_log
 from src.logs import init_process_worker
 from src.logs import setup_logger
-from src.pyfunctions import suppress_list
+from src.patternset import PatternSet
 from src.rntchangesfunctions import get_runtime_exclude_list
 from src.rntchangesfunctions import is_excluded
 from src.rntchangesfunctions import name_of
@@ -66,7 +65,6 @@ class CreatedHandler(FileSystemEventHandler):
         localappdata = inclusions[0]
         usrDIR = inclusions[1]
         temp_dir = inclusions[2]
-        escaped_user = re.escape(inclusions[3])
         flth = inclusions[4]
         dbtarget = inclusions[5]
         cache_f = inclusions[6]
@@ -97,18 +95,14 @@ class CreatedHandler(FileSystemEventHandler):
         self.executor = None
         self.log_queue = None
 
-        self.webb = suppress_list(escaped_user, supbrwLIST)  # regexes
-
         # eg os.path.join(localappdata, f"{moduleNAME}_MDY_*") folders that get files moved some time after this script is started by qt main app
         # eg /tmp/rntfiles_MDY_07-05-26-TIME_20_30_40/rntfilesxSystemDiffFromLastSearch5.txt
-
-        pattern = f"{moduleNAME}_MDY_[^/]*/{moduleNAME}x.+$"
-        self.webb.append(pattern)
-
         # eg the db is extracted to /tmp/*/dbopt.db
         dbopt = name_of(dbtarget, '.db')
-        pattern = rf"^/tmp/[^/]+/{dbopt}$"
-        self.webb.append(pattern)
+        self.webb = PatternSet(
+            regex=[f"{moduleNAME}_MDY_[^/]*/{moduleNAME}x.+$", rf"^/tmp/[^/]+/{dbopt}$"],
+            literal=supbrwLIST
+        )  # browser paths and regexes
 
         # add other regexes
 
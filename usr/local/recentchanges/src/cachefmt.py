@@ -0,0 +1,468 @@
+# binary columnar format for ctimecache.gpg and systimeche.gpg                               10/18/2026
+#
+# header  b"RCCF" version kind groups rows columns
+# keys    the roots sorted. a string column
+# offsets groups + 1 row offsets. a ctimecache root has a row per modified_ep. a systimeche root has one
+# columns name typecode payload. q int64 d float64 s string column
+#
+# a string column is its utf-8 blob and rows + 1 byte offsets so one value can be decoded without the rest.
+# None is stored as -2**63 for q, nan for d and '' for s which is what the pipe delimited csv gave back.
+# load is a few copies. the LazyCache it returns binary searches the sorted roots and builds a root's dict
+# on first use. csv files from before are still read and are written back in this format on the next save
+import csv
+import math
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from itertools import accumulate
+from io import StringIO
+
+
+MAGIC = b"RCCF"
+VERSION = 1
+CTIME = 1
+SYS = 2
+
+HEADER = struct.Struct("<4sBBIIH")
+INT_NONE = -2 ** 63
+
+
+CTIME_FIELDS = (
+    ("modified_ep", "q"),
+    ("checksum", "s"),
+    ("entropy", "d"),
+    ("mime", "s"),
+    ("size", "q"),
+    ("modified_time", "s"),
+)
+
+SYS_FIELDS = (
+    ("modified_time", "s"),
+    ("modified_ep", "d"),
+    ("file_count", "s"),
+    ("idx_count", "s"),
+    ("idx_bytes", "s"),
+    ("max_depth", "s"),
+    ("type", "s"),
+    ("target", "s"),
+)
+
+
+LEN = struct.Struct("<Q")
+
+
+def is_binary(data):
+    return isinstance(data, (bytes, bytearray)) and data[:4] == MAGIC
+
+
+def _s(v):
+    return '' if v is None else str(v)
+
+
+def _q(v):
+    try:
+        return INT_NONE if v is None or v == '' else int(v)
+    except (TypeError, ValueError):
+        return INT_NONE
+
+
+def _d(v):
+    try:
+        return math.nan if v is None or v == '' else float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def ctime_rows(versions):
+    for modified_ep, meta in versions.items():
+        ep = _q(modified_ep)
+        if ep == INT_NONE:
+            continue
+        yield (
+            ep,
+            meta.get("checksum") or '',
+            _d(meta.get("entropy")),
+            _s(meta.get("mime")),
+            _q(meta.get("size")),
+            _s(meta.get("modified_time")),
+        )
+
+
+def ctime_value(columns, start, end):
+    eps, checksums, entropies, mimes, sizes, modified_times = columns
+    versions = {}
+    for r in range(start, end):
+        entropy = entropies[r]
+        size = sizes[r]
+        versions[eps[r]] = {
+            "checksum": checksums[r],
+            "entropy": None if entropy != entropy else entropy,
+            "mime": mimes[r],
+            "size": None if size == INT_NONE else size,
+            "modified_time": modified_times[r],
+            "owner": None,
+            "domain": None
+        }
+    return versions
+
+
+def sys_rows(meta):
+    modified_ep = _d(meta.get("modified_ep"))
+    if modified_ep != modified_ep:
+        return
+    yield (
+        _s(meta.get("modified_time")),
+        modified_ep,
+        _s(meta.get("file_count", '0')),
+        _s(meta.get("idx_count", '0')),
+        _s(meta.get("idx_bytes", '0')),
+        _s(meta.get("max_depth", '0')),
+        _s(meta.get("type")),
+        _s(meta.get("target")),
+    )
+
+
+def sys_value(columns, start, end):
+    return {name: columns[c][start] for c, (name, _) in enumerate(SYS_FIELDS)}
+
+
+SCHEMAS = {
+    CTIME: (CTIME_FIELDS, ctime_value, ctime_rows),
+    SYS: (SYS_FIELDS, sys_value, sys_rows),
+}
+
+
+def shifted(arr, a, b, base):
+    """ arr[a:b] + base. numpy when it is there as runs can be the whole cache """
+    if not base:
+        return arr[a:b]
+    try:
+        import numpy as np  # only a rewrite needs it. gpgcrypto imports this module on every run
+    except ImportError:
+        np = None
+    if np is not None:
+        return array("q", (np.frombuffer(arr, dtype=np.int64)[a:b] + base).tobytes())
+    return array("q", (o + base for o in arr[a:b]))
+
+
+class StrColumn:
+    """ utf-8 blob + offsets. indexing decodes the one value """
+    __slots__ = ("parts", "blob", "offsets")
+
+    def __init__(self, blob=b"", offsets=None):
+        self.parts = []
+        self.blob = blob  # bytes or a memoryview into the decrypted file
+        self.offsets = offsets if offsets is not None else array("q", [0])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8", "surrogateescape")
+
+    def extend(self, values):
+        encoded = [v.encode("utf-8", "surrogateescape") for v in values]
+        self.parts.extend(encoded)
+        ends = accumulate(map(len, encoded), initial=self.offsets[-1])
+        next(ends)
+        self.offsets.extend(ends)
+
+    def extend_from(self, src, r0, r1):
+        """ copy rows r0:r1 of another column without decoding them """
+        start = src.offsets[r0]
+        self.parts.append(src.blob[start:src.offsets[r1]])
+        self.offsets.extend(shifted(src.offsets, r0 + 1, r1 + 1, self.offsets[-1] - start))
+
+    def pack(self):
+        blob = b"".join([self.blob, *self.parts])
+        return LEN.pack(len(blob)) + blob + _pack_array(self.offsets)
+
+
+class LazyCache(MutableMapping):
+    """ {root: value} over the decoded columns. a root's value is built on first access and kept """
+
+    def __init__(self, kind, keys, offsets, columns):
+        self.kind = kind
+        self._keys = keys
+        self._offsets = offsets
+        self._columns = columns
+        self._value = SCHEMAS[kind][1]
+        self._data = {}
+        self._deleted = set()
+
+    def _find(self, key):
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and i not in self._deleted and self._keys[i] == key:
+            return i
+        return None
+
+    def __getitem__(self, key):
+        try:
+            return self._data[key]
+        except KeyError:
+            pass
+        i = self._find(key)
+        if i is None:
+            raise KeyError(key)
+        value = self._value(self._columns, self._offsets[i], self._offsets[i + 1])
+        self._data[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        i = self._find(key)
+        if i is not None:
+            self._deleted.add(i)
+        if self._data.pop(key, None) is None and i is None:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._data or self._find(key) is not None
+
+    def _added(self):
+        return [key for key in self._data if self._find(key) is None]
+
+    def __iter__(self):
+        keys = self._keys
+        yield from (keys[i] for i in range(len(keys)) if i not in self._deleted)
+        yield from self._added()
+
+    def __len__(self):
+        return len(self._keys) - len(self._deleted) + len(self._added())
+
+
+def _new_column(typecode):
+    return StrColumn() if typecode == "s" else array(typecode)
+
+
+def _pack_array(arr):
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpack_array(typecode, blob):
+    arr = array(typecode)
+    arr.frombytes(blob)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def dump(kind, cache):
+    fields, _, rows = SCHEMAS[kind]
+    keys = StrColumn()
+    offsets = array("q", [0])
+    columns = [_new_column(t) for _, t in fields]
+
+    # rows from dicts are batched and added a column at a time
+    pending_keys, pending_sizes, pending_rows = [], [], []
+
+    def emit(key, value):
+        n = len(pending_rows)
+        pending_rows.extend(rows(value))
+        if len(pending_rows) > n:
+            pending_keys.append(key)
+            pending_sizes.append(len(pending_rows) - n)
+
+    def flush():
+        if not pending_keys:
+            return
+        keys.extend(pending_keys)
+        ends = accumulate(pending_sizes, initial=offsets[-1])
+        next(ends)
+        offsets.extend(ends)
+        for column, values in zip(columns, zip(*pending_rows)):
+            column.extend(values)
+        pending_keys.clear()
+        pending_sizes.clear()
+        pending_rows.clear()
+
+    if isinstance(cache, LazyCache) and cache.kind == kind:
+        # unchanged roots are copied across in runs. read or replaced roots are written from their dict in
+        # sorted position
+        src = cache
+        excluded = set(src._deleted)
+        events = []
+        for key in src._data:
+            i = src._find(key)
+            if i is None:
+                events.append((bisect_left(src._keys, key), 0, key))
+            else:
+                events.append((i, 1, key))
+                excluded.add(i)
+        events.sort()
+        excluded = sorted(excluded)
+        pos = e = 0
+
+        def copy_to(stop):
+            nonlocal pos, e
+            while pos < stop:
+                while e < len(excluded) and excluded[e] < pos:
+                    e += 1
+                if e < len(excluded) and excluded[e] == pos:
+                    pos += 1
+                    continue
+                end = min(stop, excluded[e]) if e < len(excluded) else stop
+                flush()
+                r0, r1 = src._offsets[pos], src._offsets[end]
+                keys.extend_from(src._keys, pos, end)
+                offsets.extend(shifted(src._offsets, pos + 1, end + 1, offsets[-1] - r0))
+                for c, column in enumerate(columns):
+                    if isinstance(column, StrColumn):
+                        column.extend_from(src._columns[c], r0, r1)
+                    else:
+                        column.extend(src._columns[c][r0:r1])
+                pos = end
+
+        for p, _, key in events:
+            copy_to(p)
+            emit(key, src._data[key])
+        copy_to(len(src._keys))
+    else:
+        for key in sorted(cache):
+            emit(key, cache[key])
+    flush()
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, kind, len(keys), offsets[-1], len(fields)),
+        keys.pack(),
+        _pack_array(offsets),
+    ]
+    for (name, typecode), column in zip(fields, columns):
+        bname = name.encode("ascii")
+        parts.append(struct.pack("<B", len(bname)) + bname)
+        parts.append(struct.pack("<B", ord(typecode)))
+        parts.append(column.pack() if typecode == "s" else _pack_array(column))
+    return b"".join(parts)
+
+
+def load(data):
+    """ LazyCache from dump output. ValueError if it isnt one """
+    try:
+        return _load(data)
+    except struct.error as e:
+        raise ValueError(f"cache file is corrupt {e}") from e
+
+
+def _load(data):
+    magic, version, kind, groups, nrows, ncols = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or kind not in SCHEMAS:
+        raise ValueError(f"unsupported cache format {magic!r} version {version} kind {kind}")
+    fields = SCHEMAS[kind][0]
+    view = memoryview(data)
+    pos = HEADER.size
+
+    def take(length):
+        nonlocal pos
+        blob = view[pos:pos + length]
+        if len(blob) != length:
+            raise ValueError("cache file is truncated")
+        pos += length
+        return blob
+
+    def take_strings(n):
+        blob = take(LEN.unpack(take(LEN.size))[0])
+        return StrColumn(blob, _unpack_array("q", take(8 * (n + 1))))
+
+    keys = take_strings(groups)
+    offsets = _unpack_array("q", take(8 * (groups + 1)))
+
+    named = {}
+    for _ in range(ncols):
+        name = bytes(take(take(1)[0])).decode("ascii")
+        typecode = chr(take(1)[0])
+        if typecode == "s":
+            named[name] = take_strings(nrows)
+        else:
+            named[name] = _unpack_array(typecode, take(8 * nrows))
+
+    columns = []
+    for name, _ in fields:
+        if name not in named:
+            raise ValueError(f"cache file is missing column {name}")
+        columns.append(named[name])
+    return LazyCache(kind, keys, offsets, columns)
+
+
+def load_ctime_csv(text):
+    """ ctimecache csv from before the binary format """
+    cfr_src = {}
+    reader = csv.DictReader(StringIO(text), delimiter='|')
+
+    for row in reader:
+        root = row.get('root')
+        if not root:
+            continue
+
+        # normalize types
+        try:
+            entropy = float(row['entropy']) if row.get('entropy') else None
+        except ValueError:
+            entropy = None
+        try:
+            size = int(row['size']) if row.get('size') else None
+        except ValueError:
+            size = None
+        try:
+            modified_ep = int(row['modified_ep']) if row.get('modified_ep') else None
+        except ValueError:
+            modified_ep = None
+        if modified_ep is None:
+            continue
+        cfr_src.setdefault(root, {})[modified_ep] = {
+            "checksum": row.get('checksum', None),
+            "entropy": entropy,
+            "mime": row.get('mime', None),
+            "size": size,
+            "modified_time": row.get('modified_time', None),
+            "owner": row.get('owner', None),
+            "domain": row.get('domain', None)
+        }
+
+    return cfr_src
+
+
+def load_sys_csv(text):
+    """ systimeche csv from before the binary format """
+    cfr_src = {}
+    reader = csv.DictReader(StringIO(text), delimiter='|')
+
+    for row in reader:
+        root = row.get('root')
+        if not root:
+            continue
+
+        modified_ep_s = row.get('modified_ep') or ''
+        try:
+            modified_ep = float(modified_ep_s) if modified_ep_s else None
+        except ValueError:
+            modified_ep = None
+        if modified_ep is None:
+            continue
+
+        cfr_src[root] = {
+            'modified_time': str(row.get('modified_time', '')),
+            'modified_ep': modified_ep,
+            'file_count': str(row.get('file_count', '0')),
+            'idx_count': str(row.get('idx_count', '0')),
+            'idx_bytes': str(row.get('idx_bytes', '0')),
+            'max_depth': str(row.get('max_depth', '0')),
+            'type': str(row.get('type', '')),
+            'target': str(row.get('target', ''))
+        }
+
+    return cfr_src
+
+
+def read(kind, raw):
+    """ decrypted cache bytes in either format. the csv is migrated when the cache is next saved """
+    if is_binary(raw):
+        return load(raw)
+    text = raw.decode("utf-8")
+    return load_ctime_csv(text) if kind == CTIME else load_sys_csv(text)
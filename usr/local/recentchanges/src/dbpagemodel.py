@@ -0,0 +1,216 @@
+# lazy paging table model for the database viewer                                             10/18/2026
+#
+# the viewer streamed a whole table into a QStandardItemModel with a QStandardItem per cell. PagedTableModel reads
+# PAGE_SIZE rows at a time as the view scrolls (canFetchMore / fetchMore) and keeps the last CACHE_PAGES pages. pages
+# are keyset reads on (sort key, rowid) so a page at the end of logs costs the same as the first. sorting and the
+# filter are ORDER BY and WHERE so only the pages in the cache are ever held no matter how big the table is
+import sqlite3
+from collections import OrderedDict
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from .pysql import summary_table
+from .pysql import OLD_US_COLUMNS
+from .pysql import US_COLUMNS
+
+
+PAGE_SIZE = 500
+CACHE_PAGES = 8
+NULL_KEY = "-9e999"  # -inf. NULL sorts first as it does in sqlite and the keyset row values never compare a NULL
+SOURCE = "page_source"
+HIDDEN = {*(name for name, _ in US_COLUMNS), *OLD_US_COLUMNS}  # generated integer copies of timestamp and changetime
+
+
+def superimpose_query(sys_tables=None, cache_tables=None):
+    """ profile rows next to their changes. sys_a rows with sys_b changes or cache rows whose systimeche differs.
+        the sys_b summary has to be synced first. see pysql.sync_sys_summary """
+
+    if sys_tables:
+        sys_a, sys_b = sys_tables
+        sys_sum = summary_table(sys_b)
+
+        return f"""
+        SELECT a.*, 0 AS sort_order, s.changes AS num_changes
+        FROM {sys_sum} s
+        JOIN {sys_a} a ON a.filename = s.filename
+
+        UNION ALL
+
+        SELECT b.*, 1 AS sort_order, s.changes AS num_changes
+        FROM {sys_sum} s
+        JOIN {sys_b} b ON b.filename = s.filename
+
+        ORDER BY num_changes DESC, filename, sort_order, count
+        """
+    elif cache_tables:
+        cache_table, systimeche = cache_tables
+        return f"""
+        WITH changed AS (
+            SELECT DISTINCT c.filename
+            FROM {cache_table} c
+            JOIN {systimeche} s ON s.filename = c.filename
+            WHERE c.modified_time <> s.modified_time
+        )
+        SELECT c.*, 0 AS sort_order, 1 AS num_changes
+        FROM {cache_table} c
+        WHERE EXISTS (
+            SELECT 1 FROM changed ch WHERE ch.filename = c.filename
+        )
+
+        UNION ALL
+
+        SELECT s.*, 1 AS sort_order, 1 AS num_changes
+        FROM {systimeche} s
+        WHERE EXISTS (
+            SELECT 1 FROM changed ch WHERE ch.filename = s.filename
+        )
+
+        ORDER BY filename, sort_order, idx_count
+        """
+    return None
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class PagedTableModel(QAbstractTableModel):
+    """ read only model over a table or a query. a query is run once into a temp table so it pages the same way.
+        raises sqlite3.Error if the database or table cant be read """
+
+    def __init__(self, db_path, table=None, query=None, parent=None):
+        super().__init__(parent)
+
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            if query:
+                self.conn.execute(f"CREATE TEMP TABLE {SOURCE} AS {query.strip().rstrip(';')}")
+                self.source = f"temp.{SOURCE}"
+            else:
+                self.source = quote(table)
+            cur = self.conn.execute(f"SELECT * FROM {self.source} LIMIT 0")
+        except sqlite3.Error:
+            self.conn.close()
+            raise
+        self.headers = [d[0] for d in cur.description if d[0] not in HIDDEN]
+        self.columns = ", ".join(quote(name) for name in self.headers)
+
+        self.order_col = None
+        self.descending = False
+        self.filter = None  # (column, value)
+        self._reset_pages()
+
+    def _reset_pages(self):
+        self._bounds = [None]  # key of the last row before each page
+        self._pages = OrderedDict()  # page number -> rows. least recently used first
+        self._loaded = 0
+        self._done = False
+
+    def close(self):
+        self.conn.close()
+
+    # sql
+
+    def _read(self, page):
+        """ one page from its bound. the first one or two values of each row are the keyset and are split off """
+        after = self._bounds[page]
+        keys = ["rowid"]
+        if self.order_col is not None:
+            # the view sorted case insensitively. the keyset compares with the same collation so pages stay in order
+            keys.insert(0, f"ifnull({quote(self.headers[self.order_col])}, {NULL_KEY}) COLLATE NOCASE")
+        key_cols = ", ".join(keys)
+        op, direction = ("<", " DESC") if self.descending else (">", "")
+
+        where = []
+        params = []
+        if self.filter:
+            column, value = self.filter
+            if value is None:
+                where.append(f"{quote(column)} IS NULL")
+            else:
+                where.append(f"{quote(column)} = ?")
+                params.append(value)
+        if after is not None:
+            where.append(f"({key_cols}) {op} ({', '.join('?' * len(after))})")
+            params.extend(after)
+
+        sql = f"SELECT {key_cols}, {self.columns} FROM {self.source}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY " + ", ".join(k + direction for k in keys) + f" LIMIT {PAGE_SIZE}"
+
+        rows = self.conn.execute(sql, params).fetchall()
+        n = len(keys)
+        if rows and page + 1 == len(self._bounds) and len(rows) == PAGE_SIZE:
+            self._bounds.append(rows[-1][:n])
+        return [row[n:] for row in rows]
+
+    def _page(self, page):
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self._read(page)
+            self._pages[page] = rows
+            if len(self._pages) > CACHE_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return rows
+
+    # Qt
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._done
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._done:
+            return
+        page = len(self._bounds) - 1
+        rows = self._page(page)
+        if len(rows) < PAGE_SIZE:
+            self._done = True
+        if rows:
+            self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + len(rows) - 1)
+            self._loaded += len(rows)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+        page, i = divmod(index.row(), PAGE_SIZE)
+        rows = self._page(page)
+        if i >= len(rows):
+            return None
+        val = rows[i][index.column()]
+        if role == Qt.ItemDataRole.EditRole or isinstance(val, (int, float)):
+            return val
+        return str(val)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return section + 1
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """ -1 is table order """
+        order_col = column if 0 <= column < len(self.headers) else None
+        descending = order_col is not None and order == Qt.SortOrder.DescendingOrder
+        if (order_col, descending) == (self.order_col, self.descending):
+            return
+        self.beginResetModel()
+        self.order_col = order_col
+        self.descending = descending
+        self._reset_pages()
+        self.endResetModel()
+
+    def set_filter(self, column=None, value=None):
+        """ only rows where column = value. no column clears it """
+        self.beginResetModel()
+        self.filter = (self.headers[column], value) if column is not None else None
+        self._reset_pages()
+        self.endResetModel()
@@ -0,0 +1,165 @@
+# keep the decrypted recent.gpg in XDG_RUNTIME_DIR between command line runs                 10/18/2026
+#
+# back to back searches and queries reuse one decrypted copy for sessionTTL seconds instead of a gpg round trip
+# each time. the copy is checked against recent.gpg and its delta segments so any full encr or new segment
+# from elsewhere (gui, scan, reset) makes the session stale and it is decrypted again.
+#
+# a run marks the session dirty before it writes and clean once its changes are encrypted. a session left dirty
+# by a failed or interrupted run is re-encrypted once when it next opens or expires. XDG_RUNTIME_DIR is a tmpfs
+# removed on logout
+import fcntl
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from .gpgcrypto import decr
+from .gpgcrypto import encr
+from .gpgcrypto import segment_files
+from .pyfunctions import cnc
+
+
+SESSION_DB = "recent.session.db"
+SESSION_STATE = "recent.session.json"
+SESSION_LOCK = "recent.session.lock"
+
+
+def gpg_signature(dbtarget):
+    """ name mtime and size of recent.gpg and each segment. changes whenever the encrypted database does """
+    sig = []
+    for p in (dbtarget, *segment_files(dbtarget)):
+        try:
+            st = os.stat(p)
+        except FileNotFoundError:
+            continue
+        sig.append([os.path.basename(p), st.st_mtime_ns, st.st_size])
+    return sig
+
+
+@contextmanager
+def session_lock(xdg_runtime):
+    fd = os.open(os.path.join(xdg_runtime, SESSION_LOCK), os.O_CREAT | os.O_RDWR, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def load_state(xdg_runtime):
+    try:
+        with open(os.path.join(xdg_runtime, SESSION_STATE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(xdg_runtime, state):
+    state_file = os.path.join(xdg_runtime, SESSION_STATE)
+    tmp = state_file + ".tmp"
+    fd = os.open(tmp, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, state_file)
+
+
+def close_session(xdg_runtime, dbtarget, email=None, user=None, compLVL=200):
+    """ re-encrypt a dirty session if recent.gpg hasnt moved on without it then remove the decrypted copy """
+    session_db = os.path.join(xdg_runtime, SESSION_DB)
+    state = load_state(xdg_runtime)
+
+    if os.path.isfile(session_db) and state.get("dirty"):
+        if email and state.get("gpg") == gpg_signature(dbtarget):
+            nc = cnc(session_db, compLVL)
+            if not encr(session_db, dbtarget, email, user=user, no_compression=nc, dcr=True):
+                print(f"Failed to encrypt session database. leaving {session_db} in place")
+                return False
+        else:
+            print("recent.gpg changed while the session had unsaved changes. discarding the session copy")
+
+    for f in (session_db, session_db + "-journal", os.path.join(xdg_runtime, SESSION_STATE)):
+        try:
+            os.remove(f)
+        except FileNotFoundError:
+            pass
+    return True
+
+
+def open_session(xdg_runtime, dbtarget, staging, ttl, email=None, user=None, compLVL=200):
+    """ path to a current decrypted copy of dbtarget or None. staging is where the caller would normally
+    decrypt to. gpg runs as user and the runtime dir may not be writable by them """
+    if ttl <= 0 or not os.path.isfile(dbtarget):
+        return None
+
+    session_db = os.path.join(xdg_runtime, SESSION_DB)
+    now = time.time()
+
+    with session_lock(xdg_runtime):
+        state = load_state(xdg_runtime)
+        if os.path.isfile(session_db) and state:
+            if not state.get("dirty") and state.get("expires", 0) > now and state.get("gpg") == gpg_signature(dbtarget):
+                state["expires"] = now + ttl
+                save_state(xdg_runtime, state)
+                return session_db
+
+        if not close_session(xdg_runtime, dbtarget, email, user, compLVL):
+            return None
+
+        res, err = decr(dbtarget, staging, user)
+        if not res:
+            print(err)
+            return None
+        shutil.move(staging, session_db)
+        os.chmod(session_db, 0o600)
+
+        save_state(xdg_runtime, {"expires": now + ttl, "gpg": gpg_signature(dbtarget), "dirty": False})
+    return session_db
+
+
+def mark_session(xdg_runtime, dbtarget, dirty):
+    """ dirty before a run writes. clean after its changes are encrypted so the signature is current again """
+    with session_lock(xdg_runtime):
+        state = load_state(xdg_runtime)
+        if not state:
+            return
+        state["dirty"] = dirty
+        if not dirty:
+            state["gpg"] = gpg_signature(dbtarget)
+        save_state(xdg_runtime, state)
+
+
+def prepare_db(xdg_runtime, dbtarget, dbopt, ttl, email=None, user=None, compLVL=200):
+    """ (path, session, err, seconds). the session copy when there is one else recent.gpg decrypted to dbopt """
+    start = time.perf_counter()
+    try:
+        session = open_session(xdg_runtime, dbtarget, dbopt, ttl, email, user, compLVL)
+        if session:
+            return session, True, None, time.perf_counter() - start
+        res, err = decr(dbtarget, dbopt, user)
+    except Exception as e:
+        res, err = False, f"prepare_db failed {type(e).__name__} {e}"
+    return (dbopt if res else None), False, err, time.perf_counter() - start
+
+
+def prefetch_db(xdg_runtime, dbtarget, dbopt, ttl, email=None, user=None, compLVL=200):
+    """ run prepare_db on a thread so gpg works while the search walks and hashes. the caller takes the future
+    result before pst_srg or passes it to discard_db if pst_srg isnt reached """
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(prepare_db, xdg_runtime, dbtarget, dbopt, ttl, email, user, compLVL)
+    executor.shutdown(wait=False)
+    return future
+
+
+def discard_db(future):
+    """ remove a prefetched copy that wasnt used. a session copy is left for the next run """
+    if future is None:
+        return
+    path, session, _, _ = future.result()
+    if path and not session:
+        for f in (path, path + "-journal"):
+            try:
+                os.remove(f)
+            except FileNotFoundError:
+                pass
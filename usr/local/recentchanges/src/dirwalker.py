@@ -10,7 +10,6 @@
 #
 import logging
 import gc
-import multiprocessing
 import os
 import queue
 import random
@@ -19,10 +18,11 @@ import sys
 import time
 import threading
 import traceback
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import as_completed
 from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
+from . import cachefmt
 from .buildindex import build_index
 from .config import dump_toml
 from .config import set_json_settings
@@ -44,8 +44,8 @@ from .dirwalkersrg import differences_db
 from .dirwalkersrg import hardlinks
 from .dirwalkersrg import save_db
 from .dirwalkersrg import sync_db
-from .gpgcrypto import dict_string
-from .gpgcrypto import dict_to_list_sys
+from .fileops import set_entropy_sample
+from .fileops import set_read_size
 from .gpgcrypto import encr
 from .gpgcrypto import encrm
 from .logs import emit_log
@@ -65,7 +65,13 @@ from .rntchangesfunctions import change_perm
 from .rntchangesfunctions import name_of
 from .rntchangesfunctions import porteus_linux_check
 from .scancreated import scan_created
+from .sharedcache import share_cache
 from .scanindex import scan_index
+from .scanindex import TIER_FULL
+from .scanindex import TIER_SAMPLE
+from .scanindex import TIER_STAT
+from .workerpool import borrow_pool
+from .workerpool import worker_pool
 from .xzmprofile import XzmProfile
 
 # Globals
@@ -101,6 +107,7 @@ def find_created(appdata_local, dbopt, dbtarget, basedir, user, dtype, tempdir,
     filterout_list = config_data.filterout_list
     ll_level = config_data.ll_level
     moduleNAME = config['paths']['moduleNAME']
+    name_index = config['search'].get('nameIDX', False)
 
     excldirs += nogo
 
@@ -197,40 +204,45 @@ def find_created(appdata_local, dbopt, dbtarget, basedir, user, dtype, tempdir,
 
         start = time.time()
 
-        with ProcessPoolExecutor(max_workers=num_chunks) as executor:
+        shared = share_cache(cfr_src)  # workers get the path of the mmap'd cache not a pickled copy
+        try:
+            with borrow_pool() as pool, pool.stage(logger=logroot):
 
-            futures = [
-                executor.submit(
-                    scan_created, chunk, basedir, exclDIRS_fullpath, filter_tup, cfr_src, root_count, i, num_chunks, False
-                )
-                for i, chunk in enumerate(chunks)
-            ]
-            for future in as_completed(futures):  # for future in futures:
-                try:
-                    sys_data, dirl, log_, r = future.result()
-                    if sys_data:
-                        all_sys.extend(sys_data)
-                    if dirl:
-                        systime_results.extend(dirl)
-                    if log_:
-                        all_logs.extend(log_)
+                futures = [
+                    pool.submit(
+                        scan_created, chunk, basedir, exclDIRS_fullpath, filter_tup, shared, root_count, i, num_chunks, False
+                    )
+                    for i, chunk in enumerate(chunks)
+                ]
+                for future in as_completed(futures):  # for future in futures:
+                    try:
+                        sys_data, dirl, log_, r = future.result()
+                        if sys_data:
+                            all_sys.extend(sys_data)
+                        if dirl:
+                            systime_results.extend(dirl)
+                        if log_:
+                            all_logs.extend(log_)
 
-                    done += r
-                    percent = done / len_basefolders
-                    prog_v = round(strt + percent * (deltav), 2)
+                        done += r
+                        percent = done / len_basefolders
+                        prog_v = round(strt + percent * (deltav), 2)
 
-                    print(f"Progress: {prog_v:.2f}%", flush=True)
-                except BrokenProcessPool as e:
-                    print("find created failed in mc")
-                    logroot.error("unable to build IDX. %s", e, exc_info=True)
-                    rlt = 1
-                    break
-                except Exception as e:
-                    emsg = f"find_created Worker error: {e} {type(e).__name__}"
-                    print(emsg)
-                    logroot.error(emsg, exc_info=True)
-                    rlt = 1
-                    break
+                        print(f"Progress: {prog_v:.2f}%", flush=True)
+                    except BrokenProcessPool as e:
+                        print("find created failed in mc")
+                        logroot.error("unable to build IDX. %s", e, exc_info=True)
+                        rlt = 1
+                        break
+                    except Exception as e:
+                        emsg = f"find_created Worker error: {e} {type(e).__name__}"
+                        print(emsg)
+                        logroot.error(emsg, exc_info=True)
+                        rlt = 1
+                        break
+        finally:
+            if shared is not cfr_src:
+                shared.release()
 
         write_logs_to_logger(all_logs, logroot)  # logs_to_queue(logs, queue)
     prog_v += incr
@@ -270,13 +282,7 @@ def find_created(appdata_local, dbopt, dbtarget, basedir, user, dtype, tempdir,
                     for root, data in cfr_data.items():
                         cfr_src[root] = data
 
-                    data_to_write = dict_to_list_sys(cfr_src)
-
-                    for row in data_to_write:
-                        for k, v in row.items():
-                            if not isinstance(v, str):
-                                row[k] = str(v)
-                    ctarget = dict_string(data_to_write)
+                    ctarget = cachefmt.dump(cachefmt.SYS, cfr_src)
 
                     print(f"Progress: {prog_v:.2f}%")
                     prog_v += incr
@@ -295,7 +301,7 @@ def find_created(appdata_local, dbopt, dbtarget, basedir, user, dtype, tempdir,
                         ))
                     # insert/update database
                     # del_keys is to remove db entries for deleted folders if wanting to maintain but no need
-                    if sync_db(dbopt, basedir, cache_s, None, None, None, None, key_upt, from_idx=True):
+                    if sync_db(dbopt, basedir, cache_s, None, None, None, None, key_upt, from_idx=True, name_index=name_index):
                         nc = cnc(dbopt, compLVL)
                         if encr(dbopt, dbtarget, email, user=user, no_compression=nc, dcr=True):
                             nc = cnc(cache_s, compLVL)
@@ -388,6 +394,9 @@ def index_system(appdata_local, dbopt, dbtarget, basedir, user, cache_s, email,
     driveTYPE = config_data.driveTYPE
     ll_level = config_data.ll_level
     checkMETHOD = config['diagnostics']['checkMETHOD']
+    sampleSIZE = config['diagnostics'].get('sampleSIZE', 0)
+    sampleWINDOWS = config['diagnostics'].get('sampleWINDOWS', 64)
+    name_index = config['search'].get('nameIDX', False)
     is_xzm_profile = config['shield']['xzm']
     extension = config['shield']['proteusEXTN']
     configured_paths = config['shield']['proteusPATH']
@@ -590,7 +599,7 @@ def index_system(appdata_local, dbopt, dbtarget, basedir, user, cache_s, email,
     if idx_drive:
         res = create_new_index(
             dbopt, dbtarget, basedir, cache_s, email, user, None, dir_data, idx_drive=idx_drive, compLVL=compLVL,
-            dcr=True, error_message="Reencryption failed drive idxcache not saved."
+            dcr=True, error_message="Reencryption failed drive idxcache not saved.", name_index=name_index
         )  # weigh is 60%
         prog_v = deltav * .60 + proval  # 75%
         if iqt:
@@ -628,6 +637,8 @@ def index_system(appdata_local, dbopt, dbtarget, basedir, user, cache_s, email,
         # queue = LoggingQueue(logger)
         log_q = queue.SimpleQueue()
         init_process_worker(log_q)
+        set_read_size(driveTYPE)
+        set_entropy_sample(sampleSIZE, sampleWINDOWS)
         try:
             i = num_chunks = 1
 
@@ -651,7 +662,6 @@ def index_system(appdata_local, dbopt, dbtarget, basedir, user, cache_s, email,
 
         chunks = chunk_split(all_files, total, batch_size=batch_size)
         num_chunks = len(chunks)
-        max_workers = max(1, min(8, multiprocessing.cpu_count() or 1, num_chunks))
 
         sys_data = []
 
@@ -662,55 +672,41 @@ def index_system(appdata_local, dbopt, dbtarget, basedir, user, cache_s, email,
         # logging_thread = threading.Thread(target=logging_worker, args=(queue, logger))
         # logging_thread.start()
 
-        ctx = multiprocessing.get_context()
-        log_q = ctx.Queue(maxsize=4096)
-        log_t = threading.Thread(target=logging_worker, args=(log_q, total, prog_v, endval, show_progress, rootlogger), daemon=True)
-        log_t.start()
-
-        try:
-            with ProcessPoolExecutor(
-                max_workers=max_workers,
-                mp_context=ctx,
-                initializer=init_process_worker,
-                initargs=(log_q,)
-            ) as executor:
-                futures = [
-                    executor.submit(
-                        build_index, chunk, i, num_chunks, show_progress, checkMETHOD
-                    )
-                    for i, chunk in enumerate(chunks)
-                ]
+        settings = (driveTYPE, sampleSIZE, sampleWINDOWS)
+        with borrow_pool() as pool, pool.stage(total, prog_v, endval, show_progress, rootlogger):
+            log_q = pool.log_q
+            futures = [
+                pool.submit(
+                    build_index, chunk, i, num_chunks, show_progress, checkMETHOD, settings=settings
+                )
+                for i, chunk in enumerate(chunks)
+            ]
 
-                for future in as_completed(futures):
-                    try:
-                        sys_data, logs, _ = future.result()
+            for future in as_completed(futures):
+                try:
+                    sys_data, logs, _ = future.result()
 
-                        if sys_data:
-                            parsedsys.extend(sys_data)
-                        if logs:
-                            logs_to_queue(logs, log_q)
-
-                        # done += processed
-                        # if iqt:
-                        #     percent = prog_v + round((deltav) * done / total)
-                        #     print(f"Progress: {percent}%", flush=True)
-                    except BrokenProcessPool as e:
-                        print("build IDX failed in mc")
-                        emit_log("ERROR", f"unable to build IDX. {e} \n{traceback.format_exc()}", log_q)
-                        rlt = 1
-                        break
-                    except Exception as e:
-                        emsg = f"Worker error occurred index_system: {type(e).__name__} : {e}"
-                        print(emsg)
-                        emit_log("ERROR", f"{emsg} \n{traceback.format_exc()}", log_q)
-                        rlt = 1
-                        break
+                    if sys_data:
+                        parsedsys.extend(sys_data)
+                    if logs:
+                        logs_to_queue(logs, log_q)
+
+                    # done += processed
+                    # if iqt:
+                    #     percent = prog_v + round((deltav) * done / total)
+                    #     print(f"Progress: {percent}%", flush=True)
+                except BrokenProcessPool as e:
+                    print("build IDX failed in mc")
+                    emit_log("ERROR", f"unable to build IDX. {e} \n{traceback.format_exc()}", log_q)
+                    rlt = 1
+                    break
+                except Exception as e:
+                    emsg = f"Worker error occurred index_system: {type(e).__name__} : {e}"
+                    print(emsg)
+                    emit_log("ERROR", f"{emsg} \n{traceback.format_exc()}", log_q)
+                    rlt = 1
+                    break
 
-        finally:
-            log_q.put(None)
-            log_t.join()
-            log_q.close()
-            log_q.join_thread()
         # finally:
         #     queue.put(('STOP', None))
         #     logging_thread.join()
@@ -728,7 +724,7 @@ def index_system(appdata_local, dbopt, dbtarget, basedir, user, cache_s, email,
             # flatten dict of dicts and store. save cache file and store in db
             rlt = create_new_index(
                 dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, dir_data, idx_drive=False, compLVL=compLVL,
-                dcr=True, error_message="Reencryption failed sys idxcache not saved."
+                dcr=True, error_message="Reencryption failed sys idxcache not saved.", name_index=name_index
             )
             if rlt == 0:
 
@@ -761,7 +757,7 @@ def index_system(appdata_local, dbopt, dbtarget, basedir, user, cache_s, email,
 # get the index from sys table recent.db and find differences
 
 
-def scan_system(appdata_local, dbopt, dbtarget, basedir, user, diff_file, cache_s, email, analytics=True, showDiff=False, compLVL=200, dcr=False, iqt=False, strt=0, endp=100):
+def scan_system(appdata_local, dbopt, dbtarget, basedir, user, diff_file, cache_s, email, analytics=True, showDiff=False, compLVL=200, dcr=False, iqt=False, strt=0, endp=100, tier=None):
 
     scan_start_dt = datetime.now()
 
@@ -786,7 +782,15 @@ def scan_system(appdata_local, dbopt, dbtarget, basedir, user, diff_file, cache_
 
     config = config_data.config
     checkMETHOD = config['diagnostics']['checkMETHOD']
+    sampleSIZE = config['diagnostics'].get('sampleSIZE', 0)
+    sampleWINDOWS = config['diagnostics'].get('sampleWINDOWS', 64)
     is_sym = config['shield']['sym']
+    if tier is None:
+        tier = config['diagnostics'].get('scanTIER', TIER_SAMPLE)
+    if tier not in (TIER_STAT, TIER_SAMPLE, TIER_FULL):
+        print(f"Unknown scan tier {tier} running a full rehash")
+        tier = TIER_FULL
+    scan_sample = config['diagnostics'].get('scanSAMPLE', 5)
 
     sys_tables, cache_table, _ = get_idx_tables(basedir, cache_s)
 
@@ -804,7 +808,7 @@ def scan_system(appdata_local, dbopt, dbtarget, basedir, user, diff_file, cache_
         print(f"No results querying {', '.join(sys_tables)} from db_sys_changes in scan_system")
         return 0
 
-    print("Finding differences running checksum.", flush=True)
+    print(f"Finding differences running checksum. tier {tier}", flush=True)
 
     all_sys = []  # changed file info\meta
     link_change = []  # symlink target changes
@@ -813,6 +817,7 @@ def scan_system(appdata_local, dbopt, dbtarget, basedir, user, diff_file, cache_
     nfs_records = []  # files that no longer exist
     x = 0
     y = 0
+    tiers = [0, 0, 0]  # unchanged by stat, sampled, checked
 
     logging_values = (appdata_local, ll_level)
     logger = setup_logger(log_file, logging_values[1], "SCANIDX")
@@ -831,6 +836,8 @@ def scan_system(appdata_local, dbopt, dbtarget, basedir, user, diff_file, cache_
 
         log_q = queue.SimpleQueue()
         init_process_worker(log_q)
+        set_read_size(driveTYPE)
+        set_entropy_sample(sampleSIZE, sampleWINDOWS)
 
         start = time.time()
         try:
@@ -839,7 +846,7 @@ def scan_system(appdata_local, dbopt, dbtarget, basedir, user, diff_file, cache_
             tlog = threading.Thread(target=logging_worker, args=(log_q, total, strt, endval, show_progress, logger), daemon=True)
             tlog.start()
 
-            all_sys, link_change, ent_change, mime_change, nfs_records, log_entries, x, y, _ = scan_index(recent_sys, id_to_mime, is_sym, i, num_chunks, show_progress, checkMETHOD, strt, endval)
+            all_sys, link_change, ent_change, mime_change, nfs_records, log_entries, x, y, _, tiers = scan_index(recent_sys, id_to_mime, is_sym, i, num_chunks, show_progress, checkMETHOD, strt, endval, tier, scan_sample)
             if log_entries:
                 logs_to_queue(log_entries, log_q)
 
@@ -856,68 +863,53 @@ def scan_system(appdata_local, dbopt, dbtarget, basedir, user, diff_file, cache_
 
         chunks = chunk_split(recent_sys, total, batch_size=batch_size)
         num_chunks = len(chunks)
-        max_workers = max(1, min(8, multiprocessing.cpu_count() or 1, num_chunks))
 
         start = time.time()
         # deltav = endval - strt
 
-        ctx = multiprocessing.get_context()
-        log_q = ctx.Queue(maxsize=4096)
-        log_t = threading.Thread(target=logging_worker, args=(log_q, total, strt, endval, show_progress, logger), daemon=True)
-        log_t.start()
+        settings = (driveTYPE, sampleSIZE, sampleWINDOWS)
+        with borrow_pool() as pool, pool.stage(total, strt, endval, show_progress, logger):
+            log_q = pool.log_q
 
-        try:
-            with ProcessPoolExecutor(
-                max_workers=max_workers,
-                mp_context=ctx,
-                initializer=init_process_worker,
-                initargs=(log_q,)
-            ) as executor:
-
-                futures = [
-                    executor.submit(scan_index, chunk, id_to_mime, is_sym, i, num_chunks, show_progress, checkMETHOD)
-                    for i, chunk in enumerate(chunks)
-                ]
-
-                for future in as_completed(futures):
+            futures = [
+                pool.submit(scan_index, chunk, id_to_mime, is_sym, i, num_chunks, show_progress, checkMETHOD, tier=tier, sample=scan_sample, settings=settings)
+                for i, chunk in enumerate(chunks)
+            ]
 
-                    try:
-                        sys_data, link_data, ent_data, mime_data, results, log_entries, x_c, y_c, _ = future.result()
-                        if sys_data:
-                            all_sys.extend(sys_data)
-                        if link_data:
-                            link_change.extend(link_data)
-                        if ent_data:
-                            ent_change.extend(ent_data)
-                        if mime_data:
-                            mime_change.extend(mime_data)
-                        if results:
-                            nfs_records.extend(results)
-                        if log_entries:
-                            logs_to_queue(log_entries, log_q)
-                        x += x_c
-                        y += y_c
-
-                        # if iqt:
-                        #     percent = strt + round((deltav) * done / total)
-                        #     print(f"Progress: {percent}%", flush=True)
+            for future in as_completed(futures):
 
-                    except BrokenProcessPool as e:
-                        emit_log("ERROR", f"fault while scanning idx. aborted {e} \n{traceback.format_exc()}", log_q)
-                        rlt = 1
-                        break
-                    except Exception as e:
-                        emsg = f"scan_system Worker error: {type(e).__name__} {e}"
-                        print(emsg)
-                        emit_log("ERROR", f"{emsg} \n{traceback.format_exc()}", log_q)
-                        rlt = 1
-                        break
+                try:
+                    sys_data, link_data, ent_data, mime_data, results, log_entries, x_c, y_c, _, tier_c = future.result()
+                    if sys_data:
+                        all_sys.extend(sys_data)
+                    if link_data:
+                        link_change.extend(link_data)
+                    if ent_data:
+                        ent_change.extend(ent_data)
+                    if mime_data:
+                        mime_change.extend(mime_data)
+                    if results:
+                        nfs_records.extend(results)
+                    if log_entries:
+                        logs_to_queue(log_entries, log_q)
+                    x += x_c
+                    y += y_c
+                    tiers = [a + b for a, b in zip(tiers, tier_c)]
+
+                    # if iqt:
+                    #     percent = strt + round((deltav) * done / total)
+                    #     print(f"Progress: {percent}%", flush=True)
 
-        finally:
-            log_q.put(None)
-            log_t.join()
-            log_q.close()
-            log_q.join_thread()
+                except BrokenProcessPool as e:
+                    emit_log("ERROR", f"fault while scanning idx. aborted {e} \n{traceback.format_exc()}", log_q)
+                    rlt = 1
+                    break
+                except Exception as e:
+                    emsg = f"scan_system Worker error: {type(e).__name__} {e}"
+                    print(emsg)
+                    emit_log("ERROR", f"{emsg} \n{traceback.format_exc()}", log_q)
+                    rlt = 1
+                    break
 
     end = time.time()
 
@@ -952,10 +944,12 @@ def scan_system(appdata_local, dbopt, dbtarget, basedir, user, diff_file, cache_
         if analytics:
             el = end - start
             print(f'Search took {el:.3f} seconds\n')
+        unchanged, sampled, checked = tiers
+        cmsg = f"\nScan tier {tier}: {checked} checked {sampled} sampled {unchanged} unchanged by stat"
         if x != 0:
             p = (y / x) * 100
             if p > 30:
-                cmsg = f"\nThe sys index had over 30% miss rate recommend rebuild index: {p:.2f}%"
+                cmsg += f"\nThe sys index had over 30% miss rate recommend rebuild index: {p:.2f}%"
 
         if all_sys:
             prev_scans[scan_start] = [tuple(row) for row in all_sys]  # add current scan to previous
@@ -979,6 +973,8 @@ def scan_system(appdata_local, dbopt, dbtarget, basedir, user, diff_file, cache_
                         ent_change, mime_change, link_diff, ent_diff, mime_diff, nfs_records,
                         dir_diff, new_diff, cmsg, are_symmetrics, showDiff, scan_start)
             change_perm(diff_file, uid, gid)
+        else:
+            print(cmsg)
 
     else:
         print("Scan index failed scan_system dirwalker.py.")
@@ -1035,26 +1031,37 @@ def main_entry(argv):
         ]
         sys.exit(set_hardlinks(*calling_args))
 
-    if args.action == "scan":
-        calling_args = [
-            args.appdata, args.dbopt, args.dbtarget, args.basedir, args.user, args.diff_file, args.cache_s,
-            args.email, args.analytics, args.showDiff, args.compLVL, args.dcr, args.iqt, args.strt,
-            args.endp
-        ]
-        sys.exit(scan_system(*calling_args))
+    # the stages borrow one worker pool. it only starts if a stage goes parallel
+    with worker_pool() as pool:
 
-    elif args.action == "build":
-        calling_args = [
-            args.appdata, args.dbopt, args.dbtarget, args.basedir, args.user, args.cache_s, args.email,
-            args.analytics, args.idx_drive, args.gnupghome, args.compLVL, args.iqt,
-            args.strt, args.endp
-        ]
-        sys.exit(index_system(*calling_args))
+        if args.action == "scan":
+            calling_args = [
+                args.appdata, args.dbopt, args.dbtarget, args.basedir, args.user, args.diff_file, args.cache_s,
+                args.email, args.analytics, args.showDiff, args.compLVL, args.dcr, args.iqt, args.strt,
+                args.endp
+            ]
+            rlt = scan_system(*calling_args, tier=args.tier)
 
-    elif args.action == "downloads":
-        calling_args = [
-            args.appdata, args.dbopt, args.dbtarget, args.basedir, args.user, args.dtype, args.tempdir,
-            args.gnupghome, args.cache_s, args.dspEDITOR, args.dspPATH, args.email,
-            args.analytics, args.compLVL
-        ]
-        sys.exit(find_created(*calling_args))
+        elif args.action == "build":
+            calling_args = [
+                args.appdata, args.dbopt, args.dbtarget, args.basedir, args.user, args.cache_s, args.email,
+                args.analytics, args.idx_drive, args.gnupghome, args.compLVL, args.iqt,
+                args.strt, args.endp
+            ]
+            rlt = index_system(*calling_args)
+
+        elif args.action == "downloads":
+            calling_args = [
+                args.appdata, args.dbopt, args.dbtarget, args.basedir, args.user, args.dtype, args.tempdir,
+                args.gnupghome, args.cache_s, args.dspEDITOR, args.dspPATH, args.email,
+                args.analytics, args.compLVL
+            ]
+            rlt = find_created(*calling_args)
+
+        else:
+            return
+
+        if args.analytics and pool.startup is not None:
+            print(f"Worker pool started in {pool.startup:.3f} seconds. {pool.workers} workers {pool.stages} stages")
+
+    sys.exit(rlt)
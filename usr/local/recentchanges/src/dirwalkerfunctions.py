@@ -1,17 +1,19 @@
-import csv
 import logging
 import os
 import stat
 from datetime import datetime
-from io import StringIO
+from . import cachefmt
 from .dirwalkerlinux import return_info
+from .dirwalkerparallel import ParallelWalk
+from .dirwalkerparallel import walk_threads
 from .fileops import calculate_checksum
 from .fileops import find_dir_link_target
 from .fileops import find_link_target
 from .fileops import set_stat
-from .fsearchfunctions import file_owner
 from .gpgcrypto import decrm
 from .logs import emit_log
+from .pyfunctions import entropy_delta
+from .pyfunctions import entropy_str
 from .pyfunctions import epoch_to_str
 # 07/24/2026
 
@@ -32,39 +34,15 @@ def decr_cache(cache_s, user=None):
     if not cache_s or not os.path.isfile(cache_s):
         return None
 
-    csv_path = decrm(cache_s, user=user)
-    if not csv_path:
+    raw = decrm(cache_s, user=user, binary=True)
+    if not raw:
         return None
 
-    cfr_src = {}
-    reader = csv.DictReader(StringIO(csv_path), delimiter='|')
-
-    for row in reader:
-        root = row.get('root')
-        if not root:
-            continue
-
-        modified_ep_s = row.get('modified_ep') or ''
-        try:
-            modified_ep = float(modified_ep_s) if modified_ep_s else None
-        except ValueError:
-            modified_ep = None
-        if modified_ep is None:
-            continue
-
-        modified_ep_s = row.get('modified_ep') or ''
-        cfr_src[root] = {
-            'modified_time': str(row.get('modified_time', '')),
-            'modified_ep': modified_ep,
-            'file_count': str(row.get('file_count', '0')),
-            'idx_count': str(row.get('idx_count', '0')),
-            'idx_bytes': str(row.get('idx_bytes', '0')),
-            'max_depth': str(row.get('max_depth', '0')),
-            'type': str(row.get('type', '')),
-            'target': str(row.get('target', ''))
-        }
-
-    return cfr_src
+    try:
+        return cachefmt.read(cachefmt.SYS, raw)
+    except ValueError as e:
+        print(f"Unable to read cache file {cache_s}: {e}")
+        return None
 
 
 def chunk_split(recent_sys, list_length, batch_size=25):  # , max_workers=8
@@ -268,7 +246,10 @@ def get_base_folders(basedir, exclDIRS_fullpath):
 
 
 # os.scandir find
-def files_search(base_dir, search_start_dt, feedback, exclDIRS: list, exclDIRS_fullpath=None, filename=None, extension=None, mode=None, iqt=False, logger=None, strt=0, endp=100):
+def files_search(base_dir, search_start_dt, feedback, exclDIRS: list, exclDIRS_fullpath=None, filename=None, extension=None, mode=None, iqt=False, logger=None, strt=0, endp=100, threads=None, stream=False):
+    """ threads 1 walks recursively on this thread. otherwise ParallelWalk with threads or walk_threads() threads.
+        stream returns the process_scan tuples as an iterator so process_lines can hash while the walk goes on. progress
+        is then left to process_lines """
     if exclDIRS_fullpath is not None and not isinstance(exclDIRS_fullpath, list):
         raise TypeError("exclDIRS_fullpath is not a list")
     logger = logger if logger else logging
@@ -326,6 +307,41 @@ def files_search(base_dir, search_start_dt, feedback, exclDIRS: list, exclDIRS_f
         print(f"Unable to read base folders of drive {base_dir} the drive could be empty or check permissions")
         return None, 0
 
+    threads = walk_threads() if threads is None else max(1, threads)
+    if stream and (mode or threads == 1):
+        stream = False
+
+    # the visits run on the walking threads. printing stays on the calling thread
+
+    def search_entry(entry, symlink):
+
+        # filename = entry.name
+        file_lower = entry.name.lower()
+
+        if matcher(file_lower, filename, extension):
+            if cutoff:
+                stat_info = get_stat(entry, logger=logger)
+                if not stat_info:
+                    return None
+                mtime = stat_info.st_mtime
+                c_time = stat_info.st_birthtime
+                if (mtime < cutoff and c_time < cutoff):
+                    return None
+            return entry.path
+        return None
+
+    def scan_entry(entry, symlink):
+        return scan_record(entry, symlink, cutoff, logger)
+
+    def show(results):
+        if not feedback:
+            return
+        for result in results:
+            if len(buffer) >= BATCH_SIZE:
+                print("\n".join(buffer), flush=True)
+                buffer.clear()
+            buffer.append(result if mode else result[-1])
+
     try:
 
         def process_search(root, matcher, current_depth=0, max_depth=0):
@@ -366,26 +382,10 @@ def files_search(base_dir, search_start_dt, feedback, exclDIRS: list, exclDIRS_f
 
                             elif entry.is_file():
 
-                                # filename = entry.name
-                                file_lower = entry.name.lower()
-
-                                if matcher(file_lower, filename, extension):
-                                    if cutoff:
-                                        stat_info = get_stat(entry, logger=logger)
-                                        if not stat_info:
-                                            continue
-                                        mtime = stat_info.st_mtime
-                                        c_time = stat_info.st_birthtime
-                                        if (mtime < cutoff and c_time < cutoff):
-                                            continue
-
-                                    if len(buffer) >= BATCH_SIZE:
-                                        print("\n".join(buffer), flush=True)
-                                        buffer.clear()
-                                    if feedback:
-                                        buffer.append(full_path)
-
-                                    all_entries.append(full_path)
+                                result = search_entry(entry, symlink)
+                                if result:
+                                    show((result,))
+                                    all_entries.append(result)
 
                         except OSError as e:
                             logger.error(f"files search process_search Exception scanning {'symlink' if symlink else ''} {full_path}: {type(e).__name__} {e}", exc_info=True)
@@ -434,33 +434,10 @@ def files_search(base_dir, search_start_dt, feedback, exclDIRS: list, exclDIRS_f
 
                             elif entry.is_file():
 
-                                # filename = entry.name
-                                stat_info = get_stat(entry, logger=logger)
-                                if not stat_info:
-                                    continue
-
-                                mtime = stat_info.st_mtime
-                                c_time = stat_info.st_ctime
-
-                                if (mtime >= cutoff or c_time >= cutoff):
-                                    if len(buffer) >= BATCH_SIZE:
-                                        print("\n".join(buffer), flush=True)
-                                        buffer.clear()
-                                    if feedback:
-                                        buffer.append(full_path)
-
-                                    mtime_us = stat_info.st_mtime_ns // 1_000
-                                    ino = stat_info.st_ino
-
-                                    atime = stat_info.st_atime
-
-                                    hardlink = stat_info.st_nlink
-                                    size = stat_info.st_size
-
-                                    mode = oct(stat.S_IMODE(stat_info.st_mode))[2:]
-                                    owner, domain = file_owner(full_path, stat_info, logger=logger)
-
-                                    all_entries.append((mtime, mtime_us, atime, c_time, ino, symlink, hardlink, size, owner, domain, mode, full_path))
+                                result = scan_entry(entry, symlink)
+                                if result:
+                                    show((result,))
+                                    all_entries.append(result)
 
                         except OSError as e:
                             logger.error(f"files search process_scan Exception scanning {'symlink' if symlink else ''} {full_path}: {type(e).__name__} {e}", exc_info=True)
@@ -476,17 +453,51 @@ def files_search(base_dir, search_start_dt, feedback, exclDIRS: list, exclDIRS_f
         prog_v = 0
         scale = current_step = 0
         steps = step_len = 0
+        dir_path = base_dir
 
-        if iqt:
+        show_progress = iqt and not stream
+        if show_progress:
             scale = (endp - strt) / root_count
             n = min(10, root_count)
             steps = sorted(set(int(i * root_count / n) for i in range(n + 1)))
             step_len = len(steps)
 
+        def root_done(_=None):
+            nonlocal f, prog_v, current_step
+            f += 1
+            if show_progress:
+                if current_step < step_len and f >= steps[current_step]:
+                    prog_v = strt + (f * scale)
+                    print(f"Progress: {prog_v:.2f}%", flush=True)
+
+                    current_step += 1
+
+        def walk_entries(walker):
+            """ matches as the threads find them. feedback is printed here a directory at a time """
+            try:
+                for results in walker:
+                    show(results)
+                    yield from results
+            except Exception as e:
+                print(f"files_search Exception: {type(e).__name__} {e}")
+                emit_log("ERROR", f"files_search parallel walk error {f}\\{root_count}: {type(e).__name__} {e}", logger=logger)
+                raise
+            if buffer:
+                print("\n".join(buffer))
+                buffer.clear()
+
+        if threads > 1:
+            walker = ParallelWalk(base_folders, search_entry if mode else scan_entry, exclDIRS_fullpath, base_dir, threads, root_done, logger)
+            if stream:
+                return walk_entries(walker), 0
+            all_entries.extend(walk_entries(walker))
+            if show_progress and current_step <= len(steps) - 1:
+                print(f"Progress: {endp:.2f}%", flush=True)
+            return all_entries, walker.max_depth
+
         max_depth = 0
         for dir_path in base_folders:
 
-            f += 1
             try:
 
                 if not mode:
@@ -498,20 +509,16 @@ def files_search(base_dir, search_start_dt, feedback, exclDIRS: list, exclDIRS_f
                 if d > max_depth:
                     max_depth = d
 
-                if iqt:
-                    if current_step < step_len and f >= steps[current_step]:
-                        prog_v = strt + (f * scale)
-                        print(f"Progress: {prog_v:.2f}%", flush=True)
-
-                        current_step += 1
+                root_done()
             except OSError as e:
+                f += 1
                 emsg = f"Couldnt stat path {dir_path}: {type(e).__name__} err: {e}"
                 print(emsg)
                 logger.debug(emsg)
                 continue
         if buffer:
             print("\n".join(buffer))
-        if iqt and current_step <= len(steps) - 1:
+        if show_progress and current_step <= len(steps) - 1:
             print(f"Progress: {endp:.2f}%", flush=True)
 
         return all_entries, max_depth
@@ -920,11 +927,10 @@ def meta_sys(file_path, previous_md5, previous_entropy, previous_mime_id, previo
 
                             mime_data.append((*all_sys, previous_mime_id))
 
-                    if entropy is not None and previous_entropy is not None:
-                        entropy_delta = abs(entropy - previous_entropy)
-                        if entropy_delta >= 0.50:
+                    delta_e = entropy_delta(entropy, previous_entropy)
+                    if delta_e is not None and delta_e >= 0.50:
 
-                            ent_data.append((*all_sys, previous_entropy, entropy_delta))
+                        ent_data.append((*all_sys, previous_entropy, delta_e))
 
                     if previous_symlink == "y":
                         symlink_to_file = True
@@ -984,6 +990,34 @@ def get_stat(entry, log_q=None, log_entries=None, logger=None):
         return None
 
 
+def scan_record(entry, symlink, cutoff, logger=None):
+    """ the process_scan tuple for a file modified or changed since cutoff. None if it wasnt """
+
+    # filename = entry.name
+    stat_info = get_stat(entry, logger=logger)
+    if not stat_info:
+        return None
+
+    mtime = stat_info.st_mtime
+    c_time = stat_info.st_ctime
+
+    if (mtime >= cutoff or c_time >= cutoff):
+
+        mtime_us = stat_info.st_mtime_ns // 1_000
+        ino = stat_info.st_ino
+
+        atime = stat_info.st_atime
+
+        hardlink = stat_info.st_nlink
+        size = stat_info.st_size
+
+        mode = oct(stat.S_IMODE(stat_info.st_mode))[2:]
+
+        # uid gid stay ints. process_scan names them from the worker's cache
+        return (mtime, mtime_us, atime, c_time, ino, symlink, hardlink, size, stat_info.st_uid, stat_info.st_gid, mode, entry.path)
+    return None
+
+
 # if stat.S_IXUSR & stat_info.st_mode:
 # return (st.st_mode & 0o111) != 0
 # return os.access(file_path, os.X_OK)
@@ -1157,7 +1191,7 @@ def output_diff(diff_file, prev_scans, all_sys, mime_hashmap, id_to_mime, link_c
             delta = ent[-1]
 
             tup_str = timestamp + " " + file_name
-            str_end = f"change from {previous_entropy:.2f} to {entropy:.2f} with a delta of {delta:.2f}"
+            str_end = f"change from {entropy_str(previous_entropy)} to {entropy_str(entropy)} with a delta of {delta:.2f}"
             if delta >= 1.00:
                 warn.append(tup_str + " Warning file high entropy" + str_end)
             else:
@@ -0,0 +1,160 @@
+# threaded os.scandir walk for files_search                                                   10/18/2026
+#
+# scandir and stat release the gil so a handful of threads keep an nvme busy where the recursive walk left the other
+# cores idle. each thread works its own stack of directories depth first and hands subdirectories to a bounded shared
+# queue whenever the queue is running low or its own stack is over LOCAL_MAX. idle threads take from the shared queue.
+# visit runs on the walking thread so stat and the owner lookup are spread over the threads as well. results come back
+# to the caller one directory at a time in the order the threads finish them
+import os
+import queue
+import threading
+
+
+LOCAL_MAX = 64  # directories a thread keeps on its own stack before sharing
+SHARED_MAX = 4096  # shared queue bound. when full the thread keeps the directory
+IDLE_WAIT = 0.05
+
+FOUND, ROOT_DONE, FAILED, FINISHED = range(4)
+
+
+def walk_threads(drive_type=None):
+    """ default thread count. 1 on a hdd where more threads only add seeks """
+    if drive_type and drive_type.lower() == "hdd":
+        return 1
+    return min(16, (os.cpu_count() or 1) * 2)
+
+
+class ParallelWalk:
+    """ iterate for lists of visit results. one list per directory with matches
+
+        roots       directories to walk. base_dir itself is scanned for files but not descended as in files_search
+        visit       visit(entry, symlink) -> result or None for every entry where entry.is_file()
+        exclude     full paths of directories to skip
+        root_done   called on the iterating thread with the index of a root once its whole tree is walked
+    """
+
+    def __init__(self, roots, visit, exclude, base_dir=None, threads=None, root_done=None, logger=None):
+        self.roots = list(dict.fromkeys(roots))
+        self.visit = visit
+        self.exclude = exclude
+        self.base_dir = base_dir
+        self.threads = max(1, threads or walk_threads())
+        self.root_done = root_done
+        self.logger = logger
+        self.max_depth = 0
+
+        self._shared = queue.Queue(maxsize=SHARED_MAX)
+        self._out = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pending = 0  # directories queued or being scanned
+        self._per_root = [1] * len(self.roots)
+
+    def __iter__(self):
+        if not self.roots:
+            return
+        self._pending = len(self.roots)
+        for r, root in enumerate(self.roots):
+            self._shared.put((root, 0, r))
+
+        workers = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.threads)]
+        for t in workers:
+            t.start()
+        try:
+            while True:
+                kind, payload = self._out.get()
+                if kind == FOUND:
+                    yield payload
+                elif kind == ROOT_DONE:
+                    if self.root_done:
+                        self.root_done(payload)
+                elif kind == FAILED:
+                    raise payload
+                else:
+                    break
+        finally:
+            self._stop.set()
+            for t in workers:
+                t.join()
+
+    def _worker(self):
+        local = []
+        depth_seen = 0
+        try:
+            while not self._stop.is_set():
+                if local:
+                    item = local.pop()
+                else:
+                    try:
+                        item = self._shared.get(timeout=IDLE_WAIT)
+                    except queue.Empty:
+                        continue
+
+                path, depth, r = item
+                depth_seen = max(depth_seen, depth)
+                subdirs = self._scan(path, depth, r)
+
+                for sub in subdirs:
+                    if len(local) < LOCAL_MAX and self._shared.qsize() >= self.threads:
+                        local.append(sub)
+                        continue
+                    try:
+                        self._shared.put_nowait(sub)
+                    except queue.Full:
+                        local.append(sub)
+
+                with self._lock:
+                    self._pending += len(subdirs) - 1
+                    self._per_root[r] += len(subdirs) - 1
+                    if self._per_root[r] == 0:
+                        self._out.put((ROOT_DONE, r))
+                    if self._pending == 0:
+                        self._out.put((FINISHED, None))
+        except Exception as e:
+            self._out.put((FAILED, e))
+        finally:
+            with self._lock:
+                self.max_depth = max(self.max_depth, depth_seen)
+
+    def _scan(self, root, depth, r):
+        """ visit the files of one directory and return its subdirectories to walk """
+        subdirs = []
+        found = []
+        logger = self.logger
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+
+                    symlink = False
+                    full_path = entry.path
+
+                    try:
+                        if entry.is_symlink():
+                            symlink = True
+
+                        if entry.is_dir():
+
+                            if full_path in self.exclude or symlink:
+                                continue
+                            if root != self.base_dir:
+                                subdirs.append((full_path, depth + 1, r))
+
+                        elif entry.is_file():
+                            result = self.visit(entry, symlink)
+                            if result is not None:
+                                found.append(result)
+
+                    except OSError as e:
+                        if logger:
+                            logger.error(f"parallel walk Exception scanning {'symlink' if symlink else ''} {full_path}: {type(e).__name__} {e}", exc_info=True)
+
+        except PermissionError:
+            if logger:
+                logger.debug(f"parallel walk Permission denied scanning: {root}")
+        except OSError as e:
+            if logger:
+                logger.error(f"parallel walk Exception scanning {root}: {type(e).__name__} {e}", exc_info=True)
+
+        if found:
+            self._out.put((FOUND, found))
+        return subdirs
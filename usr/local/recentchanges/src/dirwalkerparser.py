@@ -41,6 +41,7 @@ def build_dwalk_parser():
     scan_p.add_argument("iqt", nargs="?", type=to_bool, default=False, help="iqt boolean from Qt app show progress (default: False)")
     scan_p.add_argument("strt", nargs="?", type=int, default=0, help="strt integer where to start progress (default: 0)")
     scan_p.add_argument("endp", nargs="?", type=int, default=100, help="endp integer where to end progress (default: 100)")
+    scan_p.add_argument("--tier", type=int, choices=(0, 1, 2), default=None, help="0 hash on stat change, 1 also a random sample, 2 rehash all (default: scanTIER from config)")
 
     # BUILD SUBCOMMAND
     build_p = subparsers.add_parser("build", help="Build IDX or drive index")
@@ -0,0 +1,100 @@
+# directory mtime pruned search                                                               10/18/2026
+#
+# creating, deleting or renaming a file bumps the mtime of its directory. the directory cache from build IDX or find
+# downloads (systimeche) already lists every directory of the drive with its mtime. so the pruned search lstats each
+# cached directory instead of reading it:
+#   - it reads the files of the ones whose mtime or ctime falls in the search window
+#   - it only lists the ones whose mtime moved since the cache, looking for new subdirectories
+#   - it walks whole any directory the cache doesnt know
+# a file edited in place doesnt touch its directory. so the always scan roots (pruneROOTS) are walked whole like the
+# regular search
+import os
+from .dirwalkerfunctions import scan_record
+
+
+def pruned_search(base_dir, search_start_dt, cache, exclDIRS_fullpath, always_roots=(), logger=None):
+    """ process_scan tuples for the search window and the directory counts for analytics
+
+        cache           decr_cache dict of directory -> metadata. reparse points (type) are skipped
+        always_roots    full paths walked whole
+    """
+    cutoff = search_start_dt.timestamp()
+
+    exclude = set(exclDIRS_fullpath)
+    excl_prefix = tuple(e.rstrip("/") + "/" for e in exclude)
+
+    def excluded(path):
+        return path in exclude or path.startswith(excl_prefix)
+
+    records = []
+    seen = set()
+    counts = {"dirs": 0, "skipped": 0, "scanned": 0, "new": 0}
+
+    def read(root, scan_files, all_dirs=False):
+        """ scan the files of root when scan_files. returns the subdirectories to walk. only the ones the cache doesnt
+            know unless all_dirs """
+        subdirs = []
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    symlink = False
+                    try:
+                        if entry.is_symlink():
+                            symlink = True
+                        if entry.is_dir():
+                            if not symlink and (all_dirs or entry.path not in cache) and not excluded(entry.path):
+                                subdirs.append(entry.path)
+                        elif scan_files and entry.is_file():
+                            result = scan_record(entry, symlink, cutoff, logger)
+                            if result:
+                                records.append(result)
+                    except OSError as e:
+                        if logger:
+                            logger.error(f"pruned search Exception scanning {'symlink' if symlink else ''} {entry.path}: {type(e).__name__} {e}", exc_info=True)
+        except PermissionError:
+            if logger:
+                logger.debug(f"pruned search Permission denied scanning: {root}")
+        except OSError as e:
+            if logger:
+                logger.error(f"pruned search Exception scanning {root}: {type(e).__name__} {e}", exc_info=True)
+        return subdirs
+
+    def walk(roots, all_dirs):
+        """ every file below roots. without all_dirs it stops at directories the cache has as those are checked by mtime """
+        stack = list(roots)
+        while stack:
+            root = stack.pop()
+            if root in seen:
+                continue
+            seen.add(root)
+            counts["scanned"] += 1
+            if not all_dirs:
+                counts["new"] += 1
+            stack.extend(read(root, True, all_dirs))
+
+    walk((r for r in always_roots if os.path.isdir(r) and not excluded(r)), True)
+
+    new_roots = []
+    for root, meta in cache.items():
+        if root in seen or (meta and meta.get("type")) or excluded(root):
+            continue
+        if root != base_dir and not root.startswith(base_dir.rstrip("/") + "/"):
+            continue
+        counts["dirs"] += 1
+        try:
+            st = os.stat(root, follow_symlinks=False)
+        except OSError:
+            continue  # removed since the cache. its files went with it
+
+        previous = meta.get("modified_ep") if meta else None
+        if st.st_mtime >= cutoff or st.st_ctime >= cutoff:
+            seen.add(root)
+            counts["scanned"] += 1
+            new_roots.extend(read(root, True))
+        elif previous is None or st.st_mtime > previous:
+            new_roots.extend(read(root, False))  # only to find directories made since the cache
+        else:
+            counts["skipped"] += 1
+
+    walk(new_roots, False)
+    return records, counts
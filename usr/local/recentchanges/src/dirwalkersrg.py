@@ -5,10 +5,13 @@ import subprocess
 import traceback
 from collections import defaultdict
 from .dirwalkerfunctions import flatten_dict
+from .filenameindex import build_name_index
+from .filenameindex import refresh_name_index
 from .gpgcrypto import encr
 from .gpgcrypto import encr_sys_cache
 from .pyfunctions import cnc
 from .pyfunctions import convert_mime_to_int
+from .pyfunctions import SAMPLED_ENTROPY
 from .pysql import clear_conn
 from .pysql import clear_table
 from .pysql import create_sys_tables
@@ -18,6 +21,9 @@ from .pysql import get_sys_changes
 from .pysql import increment_f
 from .pysql import insert_mimes
 from .pysql import insert_cache
+from .pysql import stored_columns
+from .pysql import summary_table
+from .pysql import sync_sys_summary
 from .pysql import table_has_data
 from .pysql import update_cache
 from .qtdrivefunctions import get_idx_tables
@@ -118,7 +124,7 @@ def hardlinks(basedir, database, target, conn, cur, email, user, compLVL, logger
 # insert changes into sys2 or sys2_sda table. sys or sys_sda table have originals.
 # ie for / sys2, sys
 # for /mnt/nvme0n1p1 sys2_nvme0n1p1, sys_nvme0n1p1
-def sync_db(dbopt, basedir, cache_s, parsedsys, parsedidx, sys_records, new_mime_rows, keys=None, from_idx=False):
+def sync_db(dbopt, basedir, cache_s, parsedsys, parsedidx, sys_records, new_mime_rows, keys=None, from_idx=False, name_index=False):
 
     systimeche, suffix = parse_systimeche(basedir, cache_s)
 
@@ -152,6 +158,7 @@ def sync_db(dbopt, basedir, cache_s, parsedsys, parsedidx, sys_records, new_mime
             # 06/15/2026 remove scan history for the profile
             cur.execute(f"DROP TABLE IF EXISTS {drive_sys_table}")
             cur.execute(f"DROP TABLE IF EXISTS {drive_sys_changes_table}")
+            cur.execute(f"DROP TABLE IF EXISTS {summary_table(drive_sys_changes_table)}")
             conn.commit()
 
             create_sys_tables(conn, sys_tables)
@@ -199,6 +206,9 @@ def sync_db(dbopt, basedir, cache_s, parsedsys, parsedidx, sys_records, new_mime
                             idx_bytes, max_depth, type, target
                         FROM {cache_table}
                     """)
+
+                    if name_index:
+                        build_name_index(conn, basedir, index_paths(parsedidx))
                 res = True
 
         # Find downloads add index
@@ -210,6 +220,9 @@ def sync_db(dbopt, basedir, cache_s, parsedsys, parsedidx, sys_records, new_mime
 
             if insert_cache(parsedidx, systimeche, conn):
                 res = True
+                if name_index:
+                    build_name_index(conn, basedir, index_paths(parsedidx))
+                    conn.commit()
 
             else:
                 print(f"Failed to insert parsedidx for table {systimeche} drive {basedir} re sync_db")
@@ -220,6 +233,10 @@ def sync_db(dbopt, basedir, cache_s, parsedsys, parsedidx, sys_records, new_mime
             res = update_cache(keys, conn, systimeche)
             if not res:
                 print(f"failed to update {systimeche} table for drive index for drive {basedir} in sync_db. dirwalkersrg.py")
+            elif name_index:
+                # relist the folders whose mtime changed
+                if refresh_name_index(conn, basedir, [key[1] for key in keys]):
+                    conn.commit()
 
             # if maintaining a full index can add remove but chance of desync
             # cur.executemany("DELETE FROM sys WHERE filepath = ?", del_keys)
@@ -242,21 +259,26 @@ def sync_db(dbopt, basedir, cache_s, parsedsys, parsedidx, sys_records, new_mime
     return False
 
 
-def create_new_index(dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, dir_data, idx_drive=False, compLVL=200, dcr=True, error_message=None):
+def index_paths(parsedidx):
+    """ folders of a flattened cache for the filename index. reparse points have a type and are a name not a folder """
+    return [row[1] for row in parsedidx if not row[6]]
+
+
+def create_new_index(dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, dir_data, idx_drive=False, compLVL=200, dcr=True, error_message=None, name_index=False):
 
     if dir_data:
         parsedidx = flatten_dict(dir_data)
 
         # encrypt the cache and then save in database
-        return index_drive(dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, parsedidx, dir_data, idx_drive, compLVL, dcr, error_message)
+        return index_drive(dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, parsedidx, dir_data, idx_drive, compLVL, dcr, error_message, name_index)
     else:
         print("No directories to cache. the cache file was empty")
 
     return 1
 
 
-def save_db(dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, parsedidx, sys_records, new_mime_rows, keys=None, idx_drive=False, compLVL=200, dcr=True):
-    if sync_db(dbopt, basedir, cache_s, parsedsys, parsedidx, sys_records, new_mime_rows, keys, idx_drive):
+def save_db(dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, parsedidx, sys_records, new_mime_rows, keys=None, idx_drive=False, compLVL=200, dcr=True, name_index=False):
+    if sync_db(dbopt, basedir, cache_s, parsedsys, parsedidx, sys_records, new_mime_rows, keys, idx_drive, name_index):
 
         nc = cnc(dbopt, compLVL)
         if encr(dbopt, dbtarget, email, user=user, no_compression=nc, dcr=dcr):
@@ -266,9 +288,9 @@ def save_db(dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, parsedidx
     return False
 
 
-def index_drive(dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, parsedidx, dir_data, idx_drive, compLVL, dcr, error_message):
+def index_drive(dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, parsedidx, dir_data, idx_drive, compLVL, dcr, error_message, name_index=False):
 
-    if save_db(dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, parsedidx, None, None, idx_drive, compLVL, dcr):
+    if save_db(dbopt, dbtarget, basedir, cache_s, email, user, parsedsys, parsedidx, None, None, idx_drive, compLVL, dcr, name_index):
         if dir_data:
 
             if encr_sys_cache(dir_data, cache_s, email, user=user):
@@ -407,40 +429,38 @@ def differences_db(dbopt, basedir, all_sys, sys_tables, cache_table, systimeche,
         if showDiff:
 
             sys_a, sys_b = sys_tables
+            sys_sum = summary_table(sys_b)
             table = sys_a + " " + sys_b
 
+            # the latest change of each file is the last_id row of the summary
+            sync_sys_summary(cur, sys_b)
+            conn.commit()
+            b_cols = stored_columns(cur, sys_b, "b")  # b.* would add the generated US columns to the diff rows
+
             query = f"""
-                SELECT b.* FROM {sys_b} b
-                JOIN {sys_a} a ON a.filename = b.filename
-                WHERE b.target <> a.target
-                AND b.timestamp = (
-                    SELECT MAX(timestamp) FROM {sys_b} b2
-                    WHERE b2.filename = b.filename
-                )
+                SELECT {b_cols} FROM {sys_sum} s
+                JOIN {sys_a} a ON a.filename = s.filename
+                JOIN {sys_b} b ON b.id = s.last_id
+                WHERE s.target <> a.target
                 ORDER BY b.timestamp
             """
             cur.execute(query)
             link_diff = cur.fetchall()
             query = f"""
-                SELECT b.* FROM {sys_b} b
-                JOIN {sys_a} a ON a.filename = b.filename
-                WHERE ABS(b.entropy - a.entropy) >= 0.5
-                AND b.timestamp = (
-                    SELECT MAX(timestamp) FROM {sys_b} b2
-                    WHERE b2.filename = b.filename
-                )
+                SELECT {b_cols} FROM {sys_sum} s
+                JOIN {sys_a} a ON a.filename = s.filename
+                JOIN {sys_b} b ON b.id = s.last_id
+                WHERE ABS(s.entropy - a.entropy) >= 0.5
+                AND (s.entropy >= {SAMPLED_ENTROPY}) = (a.entropy >= {SAMPLED_ENTROPY})
                 ORDER BY b.timestamp
             """
             cur.execute(query)
             ent_diff = cur.fetchall()
             query = f"""
-                SELECT b.* FROM {sys_b} b
-                JOIN {sys_a} a ON a.filename = b.filename
-                WHERE b.mime_id <> a.mime_id
-                AND b.timestamp = (
-                    SELECT MAX(timestamp) FROM {sys_b} b2
-                    WHERE b2.filename = b.filename
-                )
+                SELECT {b_cols} FROM {sys_sum} s
+                JOIN {sys_a} a ON a.filename = s.filename
+                JOIN {sys_b} b ON b.id = s.last_id
+                WHERE s.mime_id <> a.mime_id
                 ORDER BY b.timestamp
             """
             cur.execute(query)
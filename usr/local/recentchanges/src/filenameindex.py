@@ -0,0 +1,269 @@
+# filename index for Find File                                                                10/18/2026
+#
+# find walks the whole drive for every Find File request. with nameIDX on, the drive index also keeps the names of the
+# files in each directory it caches. they go in an fts5 trigram table with the directory mtime beside them. index_system
+# builds it and find_created relists the directories whose mtime changed. a query reads only the names that can match.
+# it relists live any directory whose mtime changed since the index and walks any directory the index doesnt cover so
+# the result is what find prints. a drive without an index or a sqlite without fts5 trigram falls back to find
+import fnmatch
+import os
+import re
+import sqlite3
+
+
+DIRS = "name_dirs"
+FILES = "name_files"
+FTS = "name_fts"
+MIN_TRIGRAM = 3  # shorter literals cant use the trigram index
+
+# glob wildcards and the LIKE ones. fts5 only hands a LIKE to the trigram index without an ESCAPE so % and _ split a run
+GLOB_SPLIT = re.compile(r"[*?%_]|\[[^\]]*\]")
+
+
+def has_trigram(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.trigram_probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp.trigram_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def create_name_index(c):
+    c.execute(f'''
+    CREATE TABLE IF NOT EXISTS {DIRS} (
+      id INTEGER PRIMARY KEY,
+      basedir TEXT NOT NULL,
+      path TEXT NOT NULL,
+      mtime_ns INTEGER,
+      UNIQUE(basedir, path)
+    )
+    ''')
+    c.execute(f'''
+    CREATE TABLE IF NOT EXISTS {FILES} (
+      id INTEGER PRIMARY KEY,
+      dir_id INTEGER NOT NULL,
+      name TEXT NOT NULL
+    )
+    ''')
+    c.execute(f'CREATE INDEX IF NOT EXISTS idx_{FILES}_dir_id ON {FILES} (dir_id)')
+    c.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS} USING fts5(name, content='{FILES}', content_rowid='id', tokenize='trigram')")
+
+    # external content. the triggers keep the trigram index in step with name_files
+    c.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS {FILES}_ai AFTER INSERT ON {FILES} BEGIN
+      INSERT INTO {FTS} (rowid, name) VALUES (new.id, new.name);
+    END
+    ''')
+    c.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS {FILES}_ad AFTER DELETE ON {FILES} BEGIN
+      INSERT INTO {FTS} ({FTS}, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    ''')
+
+
+def drop_name_index(c):
+    for table in (FTS, FILES, DIRS):
+        c.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+def has_name_index(c, basedir):
+    try:
+        return c.execute(f"SELECT 1 FROM {DIRS} WHERE basedir = ? LIMIT 1", (basedir,)).fetchone() is not None
+    except sqlite3.OperationalError:
+        return False
+
+
+def read_dir(path):
+    """ (mtime_ns, file names, subdirectories) or None if it cant be read. the mtime is taken first so a change during
+        the listing shows as stale on the next query. anything that isnt a real directory is a name as it is for find """
+    try:
+        mtime_ns = os.stat(path, follow_symlinks=False).st_mtime_ns
+        names = []
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    else:
+                        names.append(entry.name)
+                except OSError:
+                    names.append(entry.name)
+        return mtime_ns, names, subdirs
+    except OSError:
+        return None
+
+
+def index_dirs(c, basedir, paths):
+    """ list the files of each directory into the index replacing what was there. a directory thats gone is dropped """
+    for path in paths:
+        row = c.execute(f"SELECT id FROM {DIRS} WHERE basedir = ? AND path = ?", (basedir, path)).fetchone()
+        if row:
+            c.execute(f"DELETE FROM {FILES} WHERE dir_id = ?", (row[0],))
+
+        listing = read_dir(path)
+        if listing is None:
+            if row:
+                c.execute(f"DELETE FROM {DIRS} WHERE id = ?", (row[0],))
+            continue
+        mtime_ns, names, _ = listing
+
+        if row:
+            dir_id = row[0]
+            c.execute(f"UPDATE {DIRS} SET mtime_ns = ? WHERE id = ?", (mtime_ns, dir_id))
+        else:
+            c.execute(f"INSERT INTO {DIRS} (basedir, path, mtime_ns) VALUES (?, ?, ?)", (basedir, path, mtime_ns))
+            dir_id = c.lastrowid
+        c.executemany(f"INSERT INTO {FILES} (dir_id, name) VALUES (?, ?)", ((dir_id, name) for name in names))
+
+
+def build_name_index(conn, basedir, paths):
+    """ index the files of paths for basedir from scratch. False if this sqlite has no fts5 trigram """
+    if not has_trigram(conn):
+        print("sqlite has no fts5 trigram tokenizer. Find File will use find")
+        return False
+    c = conn.cursor()
+    others = False
+    try:
+        others = c.execute(f"SELECT 1 FROM {DIRS} WHERE basedir <> ? LIMIT 1", (basedir,)).fetchone() is not None
+    except sqlite3.OperationalError:
+        pass
+    if others:
+        c.execute(f"DELETE FROM {FILES} WHERE dir_id IN (SELECT id FROM {DIRS} WHERE basedir = ?)", (basedir,))
+        c.execute(f"DELETE FROM {DIRS} WHERE basedir = ?", (basedir,))
+    else:
+        drop_name_index(c)  # much faster than a delete trigger per row
+    create_name_index(c)
+    index_dirs(c, basedir, paths)
+    return True
+
+
+def refresh_name_index(conn, basedir, paths):
+    """ relist the directories whose mtime changed. nothing if basedir has no index """
+    c = conn.cursor()
+    if not has_name_index(c, basedir):
+        return False
+    index_dirs(c, basedir, paths)
+    return True
+
+
+# query
+
+
+def find_pattern(filename, extension):
+    """ the -iname or -name pattern findfile gives find. (pattern, casefold) """
+    if filename and not extension:
+        return filename + "*", True
+    if extension and not filename:
+        return "*" + extension, False
+    return f"{filename}*{extension}", True
+
+
+def trigram_terms(pattern, casefold):
+    """ the literal runs of the glob long enough for the trigram index. LIKE only folds ascii so -iname skips the rest """
+    return [
+        run for run in GLOB_SPLIT.split(pattern)
+        if len(run) >= MIN_TRIGRAM and (run.isascii() or not casefold)
+    ]
+
+
+def search_name_index(dbopt, basedir, filename, extension, exclude, cutoff=None):
+    """ full paths find would print for the pattern or None if basedir has no index. cutoff is an epoch mtime """
+    conn = None
+    try:
+        conn = sqlite3.connect(f"file:{dbopt}?mode=ro", uri=True)
+        c = conn.cursor()
+        if not has_name_index(c, basedir):
+            return None
+
+        pattern, casefold = find_pattern(filename, extension)
+        regex = re.compile(fnmatch.translate(pattern.lower() if casefold else pattern))
+
+        def match(name):
+            return regex.match(name.lower() if casefold else name) is not None
+
+        exclude = set(exclude)
+        excl_prefix = tuple(e.rstrip("/") + "/" for e in exclude)
+
+        def excluded(path):
+            return path in exclude or path.startswith(excl_prefix)
+
+        known = {}
+        stale = set()
+        for dir_id, path, mtime_ns in c.execute(f"SELECT id, path, mtime_ns FROM {DIRS} WHERE basedir = ?", (basedir,)):
+            known[path] = dir_id
+            try:
+                if os.stat(path, follow_symlinks=False).st_mtime_ns != mtime_ns:
+                    stale.add(dir_id)
+            except OSError:
+                stale.add(dir_id)
+
+        terms = trigram_terms(pattern, casefold)
+        if terms:
+            # CROSS JOIN keeps the trigram match as the outer loop
+            sql = f"""
+                SELECT f.dir_id, d.path, f.name
+                FROM {FTS} n
+                CROSS JOIN {FILES} f ON f.id = n.rowid
+                CROSS JOIN {DIRS} d ON d.id = f.dir_id
+                WHERE d.basedir = ?
+                AND {" AND ".join(["n.name LIKE ?"] * len(terms))}
+            """
+            params = [basedir, *(f"%{t}%" for t in terms)]
+        else:
+            sql = f"""
+                SELECT f.dir_id, d.path, f.name
+                FROM {FILES} f
+                JOIN {DIRS} d ON d.id = f.dir_id
+                WHERE d.basedir = ?
+            """
+            params = [basedir]
+
+        hits = []
+        for dir_id, path, name in c.execute(sql, params):
+            if dir_id not in stale and match(name) and not excluded(path):
+                hits.append(os.path.join(path, name))
+
+        # changed directories are listed live and anything below them the index hasnt seen is walked
+        walk = []
+        for path, dir_id in known.items():
+            if dir_id in stale and not excluded(path):
+                walk.append(path)
+        listing = read_dir(basedir)
+        if listing and basedir not in known:
+            walk.append(basedir)
+        elif listing:
+            walk.extend(d for d in listing[2] if d not in known)
+
+        seen = set()
+        while walk:
+            path = walk.pop()
+            if path in seen or excluded(path):
+                continue
+            seen.add(path)
+            listing = read_dir(path)
+            if listing is None:
+                continue
+            _, names, subdirs = listing
+            hits.extend(os.path.join(path, name) for name in names if match(name))
+            walk.extend(d for d in subdirs if d not in known)
+
+        if cutoff:
+            recent = []
+            for path in hits:
+                try:
+                    if os.stat(path, follow_symlinks=False).st_mtime >= cutoff:
+                        recent.append(path)
+                except OSError:
+                    continue
+            hits = recent
+
+        hits.sort()
+        return hits
+    except sqlite3.Error as e:
+        print(f"filename index unavailable for {basedir} using find. {type(e).__name__} {e}")
+        return None
+    finally:
+        if conn:
+            conn.close()
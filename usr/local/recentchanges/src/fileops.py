@@ -4,12 +4,32 @@ import magic
 import math
 import multiprocessing
 import os
-from collections import Counter
+import threading
+from .fsearchfunctions import warm_owner_cache
+from .histogram import new_histogram
 from .logs import emit_log
+from .logs import init_process_worker
 from .pyfunctions import epoch_to_date
+from .pyfunctions import SAMPLED_ENTROPY
 # 07/24/2026
 
 
+# hash reader. block size by drive type from driveTYPE
+READ_SIZES = {"SSD": 1048576, "HDD": 2097152}
+DEFAULT_READ_SIZE = 262144
+READ_SIZE = DEFAULT_READ_SIZE
+
+FADVISE_MIN = 1048576  # advise files this size or larger
+DROP_WINDOW = 33554432  # release read pages from the page cache every 32MB
+
+_read_local = threading.local()
+
+# sampled entropy. files of SAMPLE_SIZE or larger only count SAMPLE_WINDOWS evenly spaced windows into the histogram. 0 is off
+SAMPLE_SIZE = 0
+SAMPLE_WINDOWS = 64
+SAMPLE_WINDOW = 1048576
+
+
 def find_link_target(file_path, log_q=None, log_entries=None, logger=None):
 
     target = resolve_target(file_path, log_q, log_entries, logger)
@@ -71,7 +91,8 @@ def save_header(chunk: bytes, header: bytearray):
         header.extend(chunk[:8192 - len(header)])
 
 
-def file_shannon(counts: Counter, total_size: int) -> float:
+def file_shannon(counts, total_size: int) -> float:
+    """ counts is a Counter or histogram from new_histogram. only the nonzero byte counts are used """
     entropy = 0.0
 
     for c in counts.values():
@@ -80,8 +101,8 @@ def file_shannon(counts: Counter, total_size: int) -> float:
     return round(entropy, 2)
 
 
-def magic_entropy(file_path: str, header: bytearray, counts: Counter, total_size: int, log_q: multiprocessing.Queue, logger: logging.Logger) -> tuple[str, float]:
-    """ use current bytes from the file to get the mime type and file shannon """
+def magic_entropy(file_path: str, header: bytearray, counts, total_size: int, log_q: multiprocessing.Queue, logger: logging.Logger, sampled_size: int | None = None) -> tuple[str, float]:
+    """ use current bytes from the file to get the mime type and file shannon. sampled entropy is offset by SAMPLED_ENTROPY """
     entropy = mime = None
 
     if total_size:
@@ -91,10 +112,111 @@ def magic_entropy(file_path: str, header: bytearray, counts: Counter, total_size
             emit_log("ERROR", f"calculate_checksum was unable to resolve mime type for file: {file_path} err: {e}", log_q, logger=logger)
             pass
 
-        entropy = file_shannon(counts, total_size)
+        if sampled_size is None:
+            entropy = file_shannon(counts, total_size)
+        elif sampled_size:
+            entropy = round(file_shannon(counts, sampled_size) + SAMPLED_ENTROPY, 2)
     return mime, entropy
 
 
+def set_read_size(drive_type=None):
+    global READ_SIZE
+    READ_SIZE = READ_SIZES.get(str(drive_type).upper(), DEFAULT_READ_SIZE)
+    return READ_SIZE
+
+
+def set_entropy_sample(size_mb=0, windows=64):
+    """ [diagnostics] sampleSIZE in MB and sampleWINDOWS """
+    global SAMPLE_SIZE, SAMPLE_WINDOWS
+    SAMPLE_SIZE = max(0, int(size_mb or 0)) * 1048576
+    SAMPLE_WINDOWS = max(1, int(windows or 1))
+
+
+def init_hash_worker(log_q, drive_type=None, sample_size=0, sample_windows=64):
+    """ pool initializer. log queue, read size for the drive, entropy sampling and the owner names """
+    init_process_worker(log_q)
+    warm_owner_cache()
+    set_read_size(drive_type)
+    set_entropy_sample(sample_size, sample_windows)
+
+
+def sample_windows(size_int):
+    """ start, end offsets of the sample windows. None counts every byte """
+    if not SAMPLE_SIZE or not size_int or size_int < SAMPLE_SIZE:
+        return None
+    if SAMPLE_WINDOWS * SAMPLE_WINDOW >= size_int:
+        return None
+    stride = size_int // SAMPLE_WINDOWS
+    return [(i * stride, i * stride + SAMPLE_WINDOW) for i in range(SAMPLE_WINDOWS)]
+
+
+def sample_chunk(counts, chunk, pos, windows, w):
+    """ count the part of a chunk at offset pos that falls in the windows. return the next window and bytes counted """
+    end = pos + len(chunk)
+    n = 0
+    while w < len(windows):
+        start, stop = windows[w]
+        if start >= end:
+            break
+        lo = max(start, pos)
+        hi = min(stop, end)
+        if hi > lo:
+            counts.update(chunk[lo - pos:hi - pos])
+            n += hi - lo
+        if stop > end:
+            break
+        w += 1
+    return w, n
+
+
+def read_buffer(size):
+    """ one reusable buffer per thread """
+    buf = getattr(_read_local, "buf", None)
+    if buf is None or len(buf) != size:
+        buf = bytearray(size)
+        _read_local.buf = buf
+    return buf
+
+
+def fadvise(fd, offset, length, advice):
+    if advice is None:
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except (AttributeError, OSError):
+        pass
+
+
+def read_chunks(f, block_size=None):
+    """ readinto a reusable buffer and yield memoryview chunks. a chunk is only valid until the next one is read.
+        larger files are read sequential and dropped from the page cache behind the read so indexing / doesnt evict it """
+    block_size = block_size or READ_SIZE
+    buf = read_buffer(block_size)
+    view = memoryview(buf)
+    fd = f.fileno()
+
+    try:
+        advise = os.fstat(fd).st_size >= FADVISE_MIN
+    except OSError:
+        advise = False
+    if advise:
+        fadvise(fd, 0, 0, getattr(os, "POSIX_FADV_SEQUENTIAL", None))
+    dontneed = getattr(os, "POSIX_FADV_DONTNEED", None)
+
+    pos = dropped = 0
+    try:
+        while n := f.readinto(buf):
+            yield view[:n]
+            pos += n
+            if advise and pos - dropped >= DROP_WINDOW:
+                fadvise(fd, dropped, pos - dropped, dontneed)
+                dropped = pos
+        if advise and pos > dropped:
+            fadvise(fd, dropped, pos - dropped, dontneed)
+    finally:
+        view.release()
+
+
 def get_hash_func(algo="md5"):
     if algo == "blake2":
         return hashlib.blake2b(digest_size=32)
@@ -106,26 +228,33 @@ def calculate_checksum(file_path, mtime, mod_time, inode, size_int, prev_hash=No
     if max_retry is None:
         max_retry = retry
 
-    counts = Counter()
+    counts = new_histogram()
     header = bytearray()
     entropy = None
     mime = None
     total_size = 0
+    windows = sample_windows(size_int)
+    w = sampled = 0
     try:
         hash_func = get_hash_func(algo)
-        with open(file_path, 'rb') as f:
-            while chunk := f.read(8192):
+        with open(file_path, 'rb', buffering=0) as f:
+            for chunk in read_chunks(f):
                 hash_func.update(chunk)
-                counts.update(chunk)
+                if windows is None:
+                    counts.update(chunk)
+                else:
+                    w, n = sample_chunk(counts, chunk, total_size, windows, w)
+                    sampled += n
                 save_header(chunk, header)
 
                 total_size += len(chunk)
 
         checks = hash_func.hexdigest()
+        sampled_size = sampled if windows is not None else None
 
         if prev_hash is not None:
             if checks == prev_hash:
-                mime, entropy = magic_entropy(file_path, header, counts, total_size, log_q, logger)
+                mime, entropy = magic_entropy(file_path, header, counts, total_size, log_q, logger, sampled_size)
                 return checks, entropy, mime, mtime, mod_time, st, "Retried"
 
         if retry > 0:
@@ -146,7 +275,7 @@ def calculate_checksum(file_path, mtime, mod_time, inode, size_int, prev_hash=No
 
                 if total_size == size_int and mod_time == a_mod and inode and int(inode) == a_ino:
                     status = "Returned"
-                    mime, entropy = magic_entropy(file_path, header, counts, total_size, log_q, logger)
+                    mime, entropy = magic_entropy(file_path, header, counts, total_size, log_q, logger, sampled_size)
 
                     if prev_hash:
                         mtime = epoch_to_date(re_st.st_mtime)
@@ -180,8 +309,8 @@ def calculate_checksum(file_path, mtime, mod_time, inode, size_int, prev_hash=No
 
 def sha256_sum(path):
     h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
+    with open(path, "rb", buffering=0) as f:
+        for chunk in read_chunks(f):
             h.update(chunk)
     return h.hexdigest()
 
@@ -189,8 +318,8 @@ def sha256_sum(path):
 def get_md5(file_path):
     try:
         hash_func = hashlib.md5()
-        with open(file_path, 'rb') as f:
-            while chunk := f.read(8192):
+        with open(file_path, 'rb', buffering=0) as f:
+            for chunk in read_chunks(f):
                 hash_func.update(chunk)
         return hash_func.hexdigest()
     except Exception:
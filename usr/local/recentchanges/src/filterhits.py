@@ -1,8 +1,8 @@
 import csv
-import re
 import importlib.util
 from collections import defaultdict
 from .configfunctions import find_install
+from .patternset import PatternSet
 install_root = find_install()
 filter_patterns_path = install_root / "filter.py"
 spec = importlib.util.spec_from_file_location("user_filter", filter_patterns_path)
@@ -26,13 +26,10 @@ def update_filter_csv(recent, csv_file, escaped_user):
 
     patterns = user_filter._filter
 
-    for pattern_literal in patterns:
-
-        pattern = pattern_literal.replace("{{user}}", escaped_user)
-
-        regex = re.compile(pattern)
-
-        count = sum(1 for line in recent if len(line) >= 2 and regex.search(line[1]))
+    # one pass over recent. only the lines a filter hits are tried filter by filter
+    matcher = PatternSet(regex=[p.replace("{{user}}", escaped_user) for p in patterns])
+    counts = matcher.counts([line[1] for line in recent if len(line) >= 2])
+    for pattern_literal, count in zip(patterns, counts):
         hits_dict[pattern_literal] += count
 
     # add patterns not matched to csv
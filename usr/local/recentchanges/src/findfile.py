@@ -13,8 +13,11 @@ from .config import load_toml
 from .configfunctions import get_config
 from .dirwalkerfunctions import files_search
 from .dirwalkerfunctions import get_base_folders
+from .dirwalkerfunctions import get_mount_excludes
 from .dirwalkerfunctions import get_relavant_mounts
 from .dirwalkerfunctions import MOUNT_FOLDERS
+from .dirwalkerparallel import walk_threads
+from .filenameindex import search_name_index
 from .findfileparser import build_parser
 from .logs import setup_logger
 from .pyfunctions import cprint
@@ -302,7 +305,7 @@ def comp_archive(target_files, archive, temp_dir, downloads, arch_exclude, usr,
     return res
 
 
-def main(localappdata, action, filename, extension, basedir, usr, dspEDITOR, dspPATH, temp_dir, log_path, cutoffTIME=None, zipPROGRAM=None, zipPATH=None, usrDIR=None, downloads=None):
+def main(localappdata, action, filename, extension, basedir, usr, dspEDITOR, dspPATH, temp_dir, log_path, cutoffTIME=None, zipPROGRAM=None, zipPATH=None, usrDIR=None, downloads=None, dbopt=None):
 
     if not (filename or extension):
         print("Invalid input. exiting.")
@@ -317,6 +320,8 @@ def main(localappdata, action, filename, extension, basedir, usr, dspEDITOR, dsp
     if not config:
         return 1
     exclDIRS = user_path(config['search']['exclDIRS'], usr)
+    driveTYPE = config['search'].get('driveTYPE')
+    walkTHREADS = config['search'].get('walkTHREADS') or walk_threads(driveTYPE)
     moduleNAME = config['paths']['moduleNAME']
     ll_level = config['logs']['logLEVEL']
     root_log_file = config['logs']['rootLOG']
@@ -347,7 +352,31 @@ def main(localappdata, action, filename, extension, basedir, usr, dspEDITOR, dsp
     try:
         exclDIRS_fullpath = [os.path.join(basedir, d) for d in exclDIRS]
 
-        if action == "find":
+        # filename index from the drive index. None if the drive has none and find runs as before
+        if action == "find" and dbopt and os.path.isfile(dbopt):
+            cutoff = None
+            if cutoffTIME is not None and cutoffTIME != '0':
+                cutoff = current_time.timestamp() - float(tmn) * 60
+            index_exclude = get_mount_excludes(basedir, list(exclDIRS_fullpath))
+            target_files = search_name_index(dbopt, basedir, filename, extension, index_exclude, cutoff)
+            if target_files is not None:
+                action = "index"
+
+        if action == "index":
+
+            print(f"Searching the filename index for {basedir}\n", flush=True)
+            result_inclusion = ".txt" in filename or ".txt" in extension
+            found = []
+            with open(recent_files, "w", encoding="utf-8") as f1:
+                for otline in target_files:
+                    if result_inclusion and otline == recent_files:
+                        continue
+                    found.append(escf_py(otline))
+                    f1.write(otline + '\n')
+                    print(otline, flush=True)
+            target_files = found
+
+        elif action == "find":
             arge = []
 
             F = ["find", basedir, "-xdev"]
@@ -543,7 +572,7 @@ def main(localappdata, action, filename, extension, basedir, usr, dspEDITOR, dsp
             feedback = True
             iqt = True
 
-            target_files, _ = files_search(basedir, search_start_dt, feedback, exclDIRS, exclDIRS_fullpath, filename, extension, mode, iqt, logger, strt=0, endp=100)
+            target_files, _ = files_search(basedir, search_start_dt, feedback, exclDIRS, exclDIRS_fullpath, filename, extension, mode, iqt, logger, strt=0, endp=100, threads=walkTHREADS)
 
             if target_files:
                 with open(recent_files, "w", encoding="utf-8") as f1:
@@ -618,7 +647,8 @@ def main_entry(argv):
         args.zipPROGRAM,
         args.zipPATH,
         args.usrDIR,
-        args.downloads
+        args.downloads,
+        args.dbopt
     ]
     result = main(*calling_args)
     sys.exit(result)
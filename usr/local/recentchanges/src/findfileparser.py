@@ -23,6 +23,8 @@ def parse_recent_args(parser):
                         help="user desktop path used for exclusions for the compressed archive (default: None)")
     parser.add_argument("downloads", nargs="?", default=None,
                         help="where to save the archive if default not wanted (default: None)")
+    parser.add_argument("--dbopt", default=None,
+                        help="database with a filename index to search before falling back to find (default: None)")
 
     return parser
 
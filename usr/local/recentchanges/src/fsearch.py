@@ -7,9 +7,11 @@ from .fileops import calculate_checksum
 from .fileops import find_link_target
 from .fileops import set_stat
 from .fsearchfunctions import get_cached
-from .fsearchfunctions import normalize_timestamp
 from .pyfunctions import epoch_to_date
 from .pyfunctions import escf_py
+from .timecodec import FMT
+from .timecodec import dt_text
+from .timecodec import epoch_us
 
 # Find Parallel sortcomplete search and  ctime hashing
 
@@ -17,7 +19,6 @@ from .pyfunctions import escf_py
 def process_line(line, checksum, search_start_dt, cache_f, algo="md5", logger=None):
 
     label = "Sortcomplete"
-    fmt = "%Y-%m-%d %H:%M:%S"
     CSZE = 1048576
 
     log_entries = []
@@ -39,7 +40,7 @@ def process_line(line, checksum, search_start_dt, cache_f, algo="md5", logger=No
     mtime = epoch_to_date(mod_time)
     if not os.path.isfile(file_path):
         if not mtime:
-            mt = datetime.now().strftime(fmt)
+            mt = datetime.now().strftime(FMT)
         else:
             mt = mtime.replace(microsecond=0)
         return ("Nosuchfile", mt, mt, escf_path), log_entries
@@ -60,7 +61,7 @@ def process_line(line, checksum, search_start_dt, cache_f, algo="md5", logger=No
 
     sym = "y" if isinstance(symlink, str) and symlink.startswith("l") else None
 
-    mtime_us = normalize_timestamp(mod_time)
+    mtime_us = epoch_us(mod_time)
     if sym != "y" and size and checksum:
 
         if size > CSZE:
@@ -115,9 +116,9 @@ def process_line(line, checksum, search_start_dt, cache_f, algo="md5", logger=No
         label,
         mtime.replace(microsecond=0),
         file_path,
-        ctime.strftime(fmt) if ctime is not None else None,
+        dt_text(ctime),
         inode,
-        atime.strftime(fmt) if atime is not None else None,
+        dt_text(atime),
         checks,
         entropy,
         mime,
@@ -128,7 +129,7 @@ def process_line(line, checksum, search_start_dt, cache_f, algo="md5", logger=No
         mode,
         cam,
         target,
-        lastmodified.strftime(fmt) if lastmodified is not None else None,
+        dt_text(lastmodified),
         hardlink,
         mtime_us,
         escf_path
@@ -1,9 +1,16 @@
 import grp
 import pwd
+from collections.abc import Mapping
 from .logs import emit_log
+from .sharedcache import SharedCache
 # 03/15/2026
 
 
+USER_NAMES = {}  # uid -> name for the life of the process. see owner_names
+GROUP_NAMES = {}
+NAMES_WARM = False
+
+
 def upt_cache(cfr, checks, entropy, mime, file_size, time_stamp, modified_ep, file_path):
 
     if not checks:
@@ -24,7 +31,7 @@ def upt_cache(cfr, checks, entropy, mime, file_size, time_stamp, modified_ep, fi
 
 
 def get_cached(cfr, file_size, modified_ep, file_path):
-    if not isinstance(cfr, dict):
+    if not isinstance(cfr, (Mapping, SharedCache)):
         return None
 
     versions = cfr.get(file_path)
@@ -52,7 +59,7 @@ def get_cached(cfr, file_size, modified_ep, file_path):
 
 # return the last known modified_ep
 def get_last_mtime(cfr, file_path, latest_ep):
-    if not isinstance(cfr, dict):
+    if not isinstance(cfr, (Mapping, SharedCache)):
         return None
 
     versions = cfr.get(file_path)
@@ -66,25 +73,43 @@ def get_last_mtime(cfr, file_path, latest_ep):
     return max(candidates)
 
 
-def normalize_timestamp(mod_time: str) -> int:
-    sec, dot, frac = mod_time.partition(".")
-    if not dot:
-        frac = "0"
-    frac = (frac + "000000")[:6]
-    return int(sec) * 1_000_000 + int(frac)
-
-
-def file_owner(file_path, st, log_q=None, logger=None):
-
-    try:
-        owner = pwd.getpwuid(st.st_uid).pw_name
-    except KeyError:
-        emit_log("DEBUG", f"file_owner failed to convert uid to user name for file: {file_path}", log_q, logger=logger)
-        owner = str(st.st_uid)
+def warm_owner_cache():
+    """ fill the name caches from one pass over passwd and group. called from the pool initializer so a worker
+        doesnt go through nss for each new uid. first entry wins as with getpwuid """
+    global NAMES_WARM
+    if NAMES_WARM:
+        return
+    NAMES_WARM = True
     try:
-        group = grp.getgrgid(st.st_gid).gr_name
-    except KeyError:
-        emit_log("DEBUG", f"file_owner failed to convert gid to group name for file: {file_path}", log_q, logger=logger)
-        group = str(st.st_gid)
+        for pw in pwd.getpwall():
+            USER_NAMES.setdefault(pw.pw_uid, pw.pw_name)
+        for gr in grp.getgrall():
+            GROUP_NAMES.setdefault(gr.gr_gid, gr.gr_name)
+    except OSError:
+        pass
+
+
+def owner_names(uid, gid, file_path=None, log_q=None, logger=None):
+    """ memoized uid gid to names. an id without a name is kept as its number and logged once """
+    owner = USER_NAMES.get(uid)
+    if owner is None:
+        try:
+            owner = pwd.getpwuid(uid).pw_name
+        except KeyError:
+            emit_log("DEBUG", f"file_owner failed to convert uid to user name for file: {file_path}", log_q, logger=logger)
+            owner = str(uid)
+        USER_NAMES[uid] = owner
+    group = GROUP_NAMES.get(gid)
+    if group is None:
+        try:
+            group = grp.getgrgid(gid).gr_name
+        except KeyError:
+            emit_log("DEBUG", f"file_owner failed to convert gid to group name for file: {file_path}", log_q, logger=logger)
+            group = str(gid)
+        GROUP_NAMES[gid] = group
 
     return owner, group
+
+
+def file_owner(file_path, st, log_q=None, logger=None):
+    return owner_names(st.st_uid, st.st_gid, file_path, log_q, logger)
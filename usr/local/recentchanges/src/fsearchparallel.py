@@ -1,20 +1,35 @@
 import logging
 import math
-import multiprocessing as mp
-import os
-import threading
+import time
 import traceback
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import chain
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import as_completed
+from concurrent.futures import wait
 from concurrent.futures.process import BrokenProcessPool
+from .fileops import set_entropy_sample
+from .fileops import set_read_size
 from .fsearchfunctions import upt_cache
 from . import logs
 from .logs import emit_log
 from .logs import init_process_worker
 from .logs import logs_to_queue
-from .logs import logging_worker
+from .sharedcache import share_cache
+from .workerpool import borrow_pool
+from .workerpool import note_rate
 # Get metadata hash of files and return array 07/20/2026
 
 
+STREAM_CHUNK = 1000  # records per pool submit when lines is a stream from find
+STREAM_AHEAD = 2  # chunks per worker queued ahead of the pool. find waits beyond that
+
+
+def stream_chunks(lines, size=STREAM_CHUNK):
+    while chunk := list(islice(lines, size)):
+        yield chunk
+
+
 def process_line_worker(search_fn, chunk, checksum, search_start_dt, cache_f, show_progress=False, algo="md5", logger=None, strt=20, endp=60):
 
     results = []
@@ -79,19 +94,34 @@ def process_lines(search_fn, lines, search_start_dt, process_label, user_setting
     drive_type = user_setting['driveTYPE']
     checksum = user_setting['checksum']
     algo = user_setting['checkMETHOD']
+    sample_size = user_setting.get('sampleSIZE', 0)
+    sample_windows = user_setting.get('sampleWINDOWS', 64)
 
     ck_results = []
 
     logger = logging.getLogger(process_label)
-    len_lines = len(lines)
-    if len_lines == 0:
-        return [], []
 
     show_progress = False
     if iqt:
         show_progress = True
 
-    if len_lines < 80 or drive_type.lower() == "hdd":
+    # lines can be an iterator from find_stream. the first chunks are hashed while find is still walking. short
+    # results and hdd are collected first as before. walking and hashing at once on a hdd only adds seeks
+    streamed = not isinstance(lines, list)
+    if streamed:
+        lines = iter(lines)
+        head = list(islice(lines, STREAM_CHUNK))
+        if len(head) < STREAM_CHUNK or drive_type.lower() == "hdd":
+            head.extend(lines)
+            lines = head
+            streamed = False
+
+    len_lines = 0 if streamed else len(lines)
+    if not streamed and len_lines == 0:
+        return [], []
+
+    t_hash = time.perf_counter()
+    if not streamed and (len_lines < 80 or drive_type.lower() == "hdd"):
 
         # log_q = queue.SimpleQueue()
         # init_process_worker(log_q)
@@ -103,6 +133,8 @@ def process_lines(search_fn, lines, search_start_dt, process_label, user_setting
             # tlog = threading.Thread(target=logging_worker, args=(log_q, len_lines, strt, endp, show_progress, logger), daemon=True)
             # tlog.start()
             init_process_worker(None)
+            set_read_size(drive_type)
+            set_entropy_sample(sample_size, sample_windows)
             ck_results, _, _ = process_line_worker(search_fn, lines, checksum, search_start_dt, cache_f, show_progress, algo, logger, strt, endp)
             # if log_entries:
             #     logs_to_queue(log_entries, log_q)
@@ -119,55 +151,80 @@ def process_lines(search_fn, lines, search_start_dt, process_label, user_setting
 
         # min_chunk_size = 10
         # max_workers = max(1, min(8, os.cpu_count() or 4, len(lines) // min_chunk_size))
-        max_workers = min(8, os.cpu_count() or 1, len_lines)
-        chunk_size = max(1, (len_lines + max_workers - 1) // max_workers)
-        chunks = [lines[i:i + chunk_size] for i in range(0, len_lines, chunk_size)]
 
-        ctx = mp.get_context()
-        log_q = ctx.Queue(maxsize=4096)
-        log_t = threading.Thread(target=logging_worker, args=(log_q, len_lines, strt, endp, show_progress, logger), daemon=True)
-        log_t.start()
+        # the total isnt known until find is done so streamed progress is counted here from the returned r
+        worker_progress = show_progress and not streamed
+        done = 0
+        t_walk = time.perf_counter()
+        settings = (drive_type, sample_size, sample_windows)
 
+        shared = share_cache(cache_f)  # workers get the path of the mmap'd cache not a pickled copy
         try:
-            with ProcessPoolExecutor(
-                max_workers=max_workers,
-                mp_context=ctx,
-                initializer=init_process_worker,
-                initargs=(log_q,)
-            ) as executor:
-                futures = [
-                    executor.submit(
-                        process_line_worker, search_fn, chunk, checksum, search_start_dt, cache_f, show_progress,  algo
-
-                    )
-                    for idx, chunk in enumerate(chunks)
-                ]
-                for future in as_completed(futures):
-                    try:
-                        results, log_entries, _ = future.result()
-                        if results:
-                            ck_results.extend(results)
-                        if log_entries:
-                            logs_to_queue(log_entries, log_q)
-                        # done += r
-                        # if show_progress:
-                        #     print(f"Progress: {strt + round((endp - strt) * done / len_lines)}%", flush=True)
-
-                    except BrokenProcessPool as e:
-                        print("search failed in mc")
-                        emit_log("ERROR", f"fsearch error {e} \n{traceback.format_exc()}", log_q)
-                        return None, None
-                    except Exception as e:
-                        emsg = f"Worker error occurred: {type(e).__name__} : {e}"
-                        print(emsg)
-                        emit_log("ERROR", f"{emsg} \n{traceback.format_exc()}", log_q)
-                        return None, None
+            with borrow_pool() as pool, pool.stage(len_lines, strt, endp, worker_progress, logger):
+                log_q = pool.log_q
+                if streamed:
+                    chunks = chain((head,), stream_chunks(lines))
+                else:
+                    max_workers = min(pool.workers, len_lines)
+                    chunk_size = max(1, (len_lines + max_workers - 1) // max_workers)
+                    chunks = [lines[i:i + chunk_size] for i in range(0, len_lines, chunk_size)]
+
+                def collect(finished):
+                    """ results of finished chunks. False if a worker failed """
+                    nonlocal done
+                    for future in finished:
+                        try:
+                            results, log_entries, r = future.result()
+                            if results:
+                                ck_results.extend(results)
+                            if log_entries:
+                                logs_to_queue(log_entries, log_q)
+                            done += r
+                            if streamed and show_progress and walked:
+                                rate = done / max(time.perf_counter() - t_walk, 1e-6)
+                                print(f"Progress: {strt + round((endp - strt) * done / len_lines)}% hash {done} files {rate:.0f} files/s", flush=True)
+
+                        except BrokenProcessPool as e:
+                            print("search failed in mc")
+                            emit_log("ERROR", f"fsearch error {e} \n{traceback.format_exc()}", log_q)
+                            return False
+                        except Exception as e:
+                            emsg = f"Worker error occurred: {type(e).__name__} : {e}"
+                            print(emsg)
+                            emit_log("ERROR", f"{emsg} \n{traceback.format_exc()}", log_q)
+                            return False
+                    return True
+
+                # a bounded hand off. once STREAM_AHEAD chunks per worker are waiting find is only read again as
+                # chunks finish so a fast walk doesnt pile up records the pool hasnt reached
+                ahead = STREAM_AHEAD * pool.workers
+                pending = set()
+                walked = False  # the percent of a stream is only known once find is done
+                for chunk in chunks:  # pulls from find as the pool works on earlier chunks
+                    if streamed and len(pending) >= ahead:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        if not collect(finished):
+                            return None, None
+                    pending.add(pool.submit(
+                        process_line_worker, search_fn, chunk, checksum, search_start_dt, shared, worker_progress, algo, settings=settings
+                    ))
+                    if streamed:
+                        len_lines += len(chunk)
+                        if show_progress:
+                            rate = len_lines / max(time.perf_counter() - t_walk, 1e-6)
+                            print(f"Progress: {strt}% walk {len_lines} files {rate:.0f} files/s", flush=True)
+
+                walked = True
+                if streamed:
+                    note_rate("walk", len_lines, time.perf_counter() - t_walk)
+                if not collect(as_completed(pending)):
+                    return None, None
 
         finally:
-            log_q.put(None)
-            log_t.join()
-            log_q.close()
-            log_q.join_thread()
+            if shared is not cache_f:
+                shared.release()
+
+    note_rate("hash", len_lines, time.perf_counter() - t_hash)
 
     results = [item for item in ck_results if item is not None]  # results = [item for sublist in ck_results if sublist is not None for item in sublist]  # flatten the list
 
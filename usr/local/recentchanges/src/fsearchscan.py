@@ -7,6 +7,7 @@ from .fileops import calculate_checksum
 from .fileops import find_link_target
 from .fileops import set_stat
 from .fsearchfunctions import get_cached
+from .fsearchfunctions import owner_names
 from .pyfunctions import epoch_to_date
 from .pyfunctions import escf_py
 
@@ -30,7 +31,7 @@ def process_scan(line, checksum, search_start_dt, cache_f, algo="md5", logger=No
         emit_log("DEBUG", f"process_line record length less than required 11. skipping: {line}", logs.WORKER_LOG_Q, logger=logger)
         return None, log_entries
 
-    mod_time, mtime_us, access_time, change_time, inode, symlink, hardlink, size, user, group, mode, file_path = line
+    mod_time, mtime_us, access_time, change_time, inode, symlink, hardlink, size, uid, gid, mode, file_path = line
 
     escf_path = escf_py(file_path)
     if not os.path.exists(file_path):
@@ -99,6 +100,7 @@ def process_scan(line, checksum, search_start_dt, cache_f, algo="md5", logger=No
         return None, log_entries
 
     atime = epoch_to_date(access_time)
+    user, group = owner_names(uid, gid, file_path, logs.WORKER_LOG_Q, logger)
 
     return (
         label,
@@ -1,13 +1,17 @@
 import csv
+import json
 import os
 import re
 import shlex
+import sqlite3
 import subprocess
 import sys
 import traceback
 from enum import IntEnum
 from io import StringIO
+from pathlib import Path
 from typing import Any
+from . import cachefmt
 from .configfunctions import user_info
 from .pyfunctions import cnc
 
@@ -21,8 +25,7 @@ class GPGStatus(IntEnum):
 
 
 def encr_cache(cfr, cache_f, email, user, compLVL):
-    data_to_write = dict_to_list(cfr)
-    ctarget = dict_string(data_to_write)
+    ctarget = cachefmt.dump(cachefmt.CTIME, cfr)
 
     nc = cnc(cache_f, compLVL)
 
@@ -38,8 +41,7 @@ def encr_cache(cfr, cache_f, email, user, compLVL):
 
 
 def encr_sys_cache(dir_data, cache_s, email, user=None):
-    data_to_write = dict_to_list_sys(dir_data)
-    ctarget = dict_string(data_to_write)
+    ctarget = cachefmt.dump(cachefmt.SYS, dir_data)
     if encrm(ctarget, cache_s, email, user=user, no_compression=False, armor=False):
         return True
     return False
@@ -54,7 +56,7 @@ def set_cmd(user):
 
 
 # enc mem
-def encrm(c_data: str, opt: str, r_email: str, user=None, no_compression=False, armor=False) -> bool:
+def encrm(c_data: str | bytes, opt: str, r_email: str, user=None, no_compression=False, armor=False) -> bool:
     # user = None  # force root gpg agent
     try:
         cmd = set_cmd(user)
@@ -68,7 +70,7 @@ def encrm(c_data: str, opt: str, r_email: str, user=None, no_compression=False,
 
         subprocess.run(
             cmd,
-            input=c_data.encode("utf-8"),
+            input=c_data if isinstance(c_data, bytes) else c_data.encode("utf-8"),
             check=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -82,13 +84,15 @@ def encrm(c_data: str, opt: str, r_email: str, user=None, no_compression=False,
 
 
 # dec mem
-def decrm(src: str, user=None) -> str | None:
+def decrm(src: str, user=None, quiet=False, binary=False) -> str | bytes | None:
     # user = None
     cmd = set_cmd(user)
     cmd += ["gpg", "--decrypt", src]
-    ret = subprocess.run(cmd, stdout=subprocess.PIPE)
+    ret = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE if quiet else None)
     if ret.returncode != 0:
         return None
+    if binary:
+        return ret.stdout
     return ret.stdout.decode("utf-8")
 
 
@@ -101,6 +105,7 @@ def encr(database, opt, email, user=None, no_compression=False, dcr=False):
             cmd.extend(["--compress-level", "0"])
         cmd.append(database)
         subprocess.run(cmd, capture_output=True, text=True, check=True)
+        clear_segments(opt)  # the new base has everything the segments did
         if not dcr:
             os.remove(database)
         return True
@@ -122,11 +127,132 @@ def decr(src, opt, user=None):
         cmd = set_cmd(user)
         cmd += ["gpg", "--yes", "--decrypt", "-o", opt, src]
         result = subprocess.run(cmd, capture_output=True, text=True)  #
-        return result.returncode == 0, result.stderr
+        if result.returncode != 0:
+            return False, result.stderr
+        return apply_segments(src, opt, user)
 
     return False, f"[ERROR] File {src} not found. Ensure the .gpg file exists."
 
 
+# incremental database. a search appends a small encrypted delta segment beside recent.gpg instead of
+# re-encrypting the whole database. decr applies the segments in order and a full encr folds them into
+# the base. recent.gpg -> recent.0001.seg.gpg, recent.0002.seg.gpg ...
+SEGMENT_APPEND = ("logs", "stats", "mime_types")  # + sys_b. rows only ever inserted during a search
+SEGMENT_SNAPSHOT = ("analytics",)  # single row upsert stored whole
+
+
+def segment_number(seg, stem):
+    try:
+        return int(Path(seg).name[len(stem) + 1:].split('.')[0])
+    except ValueError:
+        return None
+
+
+def segment_files(dbtarget):
+    """ delta segments for dbtarget oldest first """
+    base = Path(dbtarget)
+    segs = []
+    for p in base.parent.glob(f"{base.stem}.*.seg.gpg"):
+        n = segment_number(p, base.stem)
+        if n is not None:
+            segs.append((n, str(p)))
+    return [p for _, p in sorted(segs)]
+
+
+def clear_segments(dbtarget):
+    for seg in segment_files(dbtarget):
+        try:
+            os.remove(seg)
+        except FileNotFoundError:
+            pass
+
+
+def segment_marks(conn, tables):
+    """ highest rowid per table at the start of a run. rows above the mark go in the next segment """
+    marks = {}
+    cur = conn.cursor()
+    for table in tables:
+        try:
+            marks[table] = cur.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+        except sqlite3.OperationalError:
+            continue
+    return marks
+
+
+def stored_columns(cur, table):
+    """ quoted column names without the generated ones. those cant be inserted on replay """
+    return ", ".join(f'"{row[1]}"' for row in cur.execute(f"PRAGMA table_xinfo({table})") if row[6] == 0)
+
+
+def segment_delta(conn, marks, snapshot=SEGMENT_SNAPSHOT):
+    delta = {}
+    cur = conn.cursor()
+    for table, mark in marks.items():
+        col_str = stored_columns(cur, table)
+        if not col_str:
+            continue
+        cur.execute(f"SELECT {col_str} FROM {table} WHERE rowid > ?", (mark,))
+        rows = cur.fetchall()
+        if rows:
+            delta[table] = {"columns": [d[0] for d in cur.description], "rows": rows}
+    for table in snapshot:
+        col_str = stored_columns(cur, table)
+        if not col_str:
+            continue
+        cur.execute(f"SELECT {col_str} FROM {table}")
+        rows = cur.fetchall()
+        if rows:
+            delta[table] = {"columns": [d[0] for d in cur.description], "rows": rows}
+    return delta
+
+
+def encr_segment(conn, marks, dbtarget, email, user=None):
+    """ encrypt the rows added since segment_marks to the next segment. False the caller does a full encr """
+    delta = segment_delta(conn, marks)
+    if not delta:
+        return True
+
+    base = Path(dbtarget)
+    segs = segment_files(dbtarget)
+    n = segment_number(segs[-1], base.stem) + 1 if segs else 1
+    opt = str(base.parent / f"{base.stem}.{n:04d}.seg.gpg")
+
+    payload = json.dumps({"version": 1, "tables": delta}, separators=(",", ":"))
+    if encrm(payload, opt, email, user=user):
+        return True
+    try:
+        os.remove(opt)  # never leave a partial segment for decr to trip on
+    except FileNotFoundError:
+        pass
+    return False
+
+
+def apply_segments(dbtarget, opt, user=None):
+    """ replay the delta segments of dbtarget onto the freshly decrypted opt """
+    segs = segment_files(dbtarget)
+    if not segs:
+        return True, ""
+
+    conn = sqlite3.connect(opt)
+    try:
+        with conn:
+            c = conn.cursor()
+            for seg in segs:
+                text = decrm(seg, user, quiet=True)  # passphrase is cached from the base
+                if text is None:
+                    raise ValueError(f"unable to decrypt segment {seg}")
+                for table, delta in json.loads(text).get("tables", {}).items():
+                    columns = delta["columns"]
+                    col_str = ", ".join(f'"{col}"' for col in columns)
+                    placeholders = ", ".join(["?"] * len(columns))
+                    c.executemany(f"INSERT OR REPLACE INTO {table} ({col_str}) VALUES ({placeholders})", delta["rows"])
+        return True, ""
+    except (ValueError, KeyError, sqlite3.Error) as e:
+        return False, f"[ERROR] Failed to apply database segments to {opt}: {e}"
+    finally:
+        conn.close()
+
+
 def decr_ctime(cache_f: str, user: str, iqt: bool) -> dict:
     if not cache_f or not os.path.isfile(cache_f):
         return {}
@@ -137,47 +263,18 @@ def decr_ctime(cache_f: str, user: str, iqt: bool) -> dict:
     #       print(f"there may be no key for {cache_f} delete the file to reset")
     #       sys.exit(res)
 
-    csv_path = decrm(cache_f, user)
-    if not csv_path:
-        if csv_path is None:
+    raw = decrm(cache_f, user, binary=True)
+    if not raw:
+        if raw is None:
             print("if having problems run recentchanges reset to clear .gpg files and keys")
         print(f"Unable to retrieve cache file {cache_f}. cache file might be corrupt removing the file may resolve issue. quitting.")
         sys.exit(1)
 
-    cfr_src = {}
-    reader = csv.DictReader(StringIO(csv_path), delimiter='|')
-
-    for row in reader:
-        root = row.get('root')
-        if not root:
-            continue
-
-        # normalize types
-        try:
-            entropy = float(row['entropy'] if row.get('entropy') else None)
-        except ValueError:
-            entropy = None
-        try:
-            size = int(row['size']) if row.get('size') else None
-        except ValueError:
-            size = None
-        try:
-            modified_ep = int(row['modified_ep']) if row.get('modified_ep') else None
-        except ValueError:
-            modified_ep = None
-        if modified_ep is None:
-            continue
-        cfr_src.setdefault(root, {})[modified_ep] = {
-            "checksum": row.get('checksum', None),
-            "entropy": entropy,
-            "mime": row.get('mime', None),
-            "size": size,
-            "modified_time": row.get('modified_time', None),
-            "owner": row.get('owner', None),
-            "domain": row.get('domain', None)
-        }
-
-    return cfr_src
+    try:
+        return cachefmt.read(cachefmt.CTIME, raw)
+    except ValueError as e:
+        print(f"Unable to read cache file {cache_f}: {e}. removing the file may resolve issue. quitting.")
+        sys.exit(1)
 
 
 # commandline start the users gpg agent before decrypting the cache file above ***
@@ -255,6 +255,7 @@ def get_key_fingerprint(email, root_target=None):
 def clear_gpg(usr, dbtarget, cache_f, cache_s, flth, toml_file=None, json_file=None):
     """ delete ctimecache & db .gpg & profile .gpgs
         if toml_file it is called from delete_gpg_keys and prompt to reset config files """
+    from .gpgcrypto import segment_files
     from .rntchangesfunctions import name_of
 
     systimeche = name_of(cache_s)
@@ -277,7 +278,7 @@ def clear_gpg(usr, dbtarget, cache_f, cache_s, flth, toml_file=None, json_file=N
                 print("Invalid input, please enter 'Y' or 'N'.")
     
     # gpgs
-    for r in (cache_f, dbopt, dbtarget, flth, *glob.glob(pattern)):
+    for r in (cache_f, dbopt, dbtarget, *segment_files(dbtarget), flth, *glob.glob(pattern)):
         p = Path(r)
         try:
             is_root_owned = p.exists() and p.stat().st_uid == 0
@@ -1,19 +1,25 @@
 import math
 import os
 import sqlite3
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from pathlib import Path
 from .logs import emit_log
 from . import logs
+from .pyfunctions import entropy_delta
+from .pyfunctions import entropy_str
 from .pyfunctions import is_integer
 from .pyfunctions import insert_sys_entry
-from .pyfunctions import is_valid_datetime
-from .pyfunctions import matches_any_pattern
 from .pyfunctions import new_meta
-from .pyfunctions import parse_datetime
 from .pysql import clear_conn
 from .pysql import get_recent_changes
+from .pysql import get_recent_changes_batch
 from .pysql import get_recent_sys
+from .pysql import get_recent_sys_batch
+from .pysql import load_recent_batch
+from .timecodec import DAY_US
+from .timecodec import text_us
+from .timecodec import wall_us
 # hybrid analysis 11/19/2025 updated 07/24/2026 linux Qt
 
 
@@ -55,21 +61,20 @@ def stealth(filename, label, entry, recent_size, previous_size, recent_entropy,
                         f'File type for file: {label} changed {previous_type} → {recent_type}'
                     )
 
-            if recent_entropy is not None and previous_entropy is not None:
+            delta_e = entropy_delta(recent_entropy, previous_entropy)
+            if delta_e is not None:
 
-                entropy_delta = abs(recent_entropy - previous_entropy)
-
-                if entropy_delta >= 1.00:
+                if delta_e >= 1.00:
                     entry["cerr"].append(
-                        f'Warning high entropy change file: {label} delta {entropy_delta:.2f} ({previous_entropy:.2f} → {recent_entropy:.2f})'
+                        f'Warning high entropy change file: {label} delta {delta_e:.2f} ({entropy_str(previous_entropy)} → {entropy_str(recent_entropy)})'
                     )
-                elif entropy_delta >= 0.50:
+                elif delta_e >= 0.50:
                     entry["scr"].append(
-                        f'Entropy delta of .5 or more file: {label} delta {entropy_delta:.2f} ({previous_entropy:.2f} → {recent_entropy:.2f})'
+                        f'Entropy delta of .5 or more file: {label} delta {delta_e:.2f} ({entropy_str(previous_entropy)} → {entropy_str(recent_entropy)})'
                     )
 
 
-def hanly(parsed_chunk, checksum, cdiag, dbopt, ps, usr, logging_values, sys_tables, id_to_mime, cachermPATTERNS, show_progress=False, logger=None, strt=65, endp=90):
+def hanly(parsed_chunk, checksum, cdiag, dbopt, ps, usr, logging_values, sys_tables, id_to_mime, cachermPATTERNS, show_progress=False, logger=None, strt=65, endp=90, batched=True):
 
     results, sys_records, log_entries = [], [], []
     if logger:
@@ -77,11 +82,16 @@ def hanly(parsed_chunk, checksum, cdiag, dbopt, ps, usr, logging_values, sys_tab
     if not ps:
         sys_tables = ()
 
-    fmt = "%Y-%m-%d %H:%M:%S"
     time_period = 5  # days for a file that isnt regularly updated. 5 default
+    # times are compared as timestamp_wall_us / changetime_wall_us integers. see timecodec. previous rows carry them at 16 17
+    logs_cols = ['mtime_us', 'timestamp_wall_us', 'changetime_wall_us']
+    sys_cols = ['mtime_us', 'timestamp_wall_us', 'changetime_wall_us', 'count']  # count last for insert_sys_entry
+    stale_us = wall_us(datetime.now()) - time_period * DAY_US
 
     dbit = False
     csum = False
+    lookup_time = 0.0
+    batch_logs, batch_sys = {}, {}
 
     conn = sqlite3.connect(dbopt)
     cur = None
@@ -89,6 +99,16 @@ def hanly(parsed_chunk, checksum, cdiag, dbopt, ps, usr, logging_values, sys_tab
         with conn:
             cur = conn.cursor()
 
+            if batched:
+                # latest logs and sys rows for the whole chunk in one pass instead of a query or two per record
+                lookup_start = time.perf_counter()
+                load_recent_batch(cur, (record[1] for record in parsed_chunk if len(record) > 1))
+                batch_logs = get_recent_changes_batch(cur, 'logs', logs_cols)
+                if ps:
+                    batch_sys = get_recent_sys_batch(cur, sys_tables, sys_cols)
+                conn.commit()
+                lookup_time = time.perf_counter() - lookup_start
+
             r = x = 0
             delta_v = 0
             current_step = 0
@@ -123,7 +143,7 @@ def hanly(parsed_chunk, checksum, cdiag, dbopt, ps, usr, logging_values, sys_tab
 
                 entry = {"cerr": [], "flag": [], "scr": [], "sys": [], "dcp": []}
 
-                recent_timestamp = parse_datetime(record[0], fmt)
+                recent_timestamp = text_us(record[0])
                 if not recent_timestamp:
                     emit_log("DEBUG", f"missing timestamp on parsed entry: {record}", logs.WORKER_LOG_Q, logger=logger)
                     continue
@@ -131,8 +151,14 @@ def hanly(parsed_chunk, checksum, cdiag, dbopt, ps, usr, logging_values, sys_tab
                 filename = record[1]
                 label = record[18]  # escaped
 
-                recent_entries = get_recent_changes(filename, cur, 'logs', ['mtime_us'])
-                recent_sys = get_recent_sys(filename, cur, sys_tables, ['mtime_us', 'count']) if ps else None
+                if batched:
+                    recent_entries = batch_logs.get(filename)
+                    recent_sys = batch_sys.get(filename) if ps else None
+                else:
+                    lookup_start = time.perf_counter()
+                    recent_entries = get_recent_changes(filename, cur, 'logs', logs_cols)
+                    recent_sys = get_recent_sys(filename, cur, sys_tables, sys_cols) if ps else None
+                    lookup_time += time.perf_counter() - lookup_start
 
                 if not recent_entries and not recent_sys and checksum:
                     entry["dcp"].append(record)  # is copy?
@@ -143,15 +169,15 @@ def hanly(parsed_chunk, checksum, cdiag, dbopt, ps, usr, logging_values, sys_tab
 
                 if ps and recent_sys and len(recent_sys) > 16:
 
-                    previous_timestamp = parse_datetime(recent_sys[0], fmt)
+                    previous_timestamp = recent_sys[16]
 
                     if previous_timestamp:
 
                         is_sys = True
                         previous = recent_sys
 
-                        previous_sysctime = parse_datetime(recent_sys[2], fmt)
-                        recent_ctime = parse_datetime(record[2], fmt)
+                        previous_sysctime = recent_sys[17]
+                        recent_ctime = text_us(record[2])
 
                         if (
                             (recent_timestamp > previous_timestamp)
@@ -200,7 +226,7 @@ def hanly(parsed_chunk, checksum, cdiag, dbopt, ps, usr, logging_values, sys_tab
                     #         emit_log("DEBUG", f"invalid format detected size not an integer record: {record} and previous: {previous}", logs.WORKER_LOG_Q, logger=logger)
 
                 if not is_sys:
-                    previous_timestamp = parse_datetime(previous[0], fmt)
+                    previous_timestamp = previous[16]
 
                 if (
                     (is_integer(record[3]) and is_integer(previous[3]))
@@ -242,7 +268,7 @@ def hanly(parsed_chunk, checksum, cdiag, dbopt, ps, usr, logging_values, sys_tab
                             # aperm = stat.filemode(st.st_mode) # '-rw-r--r--'
                             # a_ctime = st.st_ctime
                             # ctime_str = epoch_to_date(a_ctime).replace(microsecond=0)
-                            if is_valid_datetime(record[4], fmt):  # access time format check
+                            if text_us(record[4]) is not None:  # access time format check
                                 previous_mtime_us = previous[15]
                                 if isinstance(previous_mtime_us, int) and mtime_usec_zero == previous_mtime_us:
                                     if not cam_file and recent_sym != "y":
@@ -326,14 +352,12 @@ def hanly(parsed_chunk, checksum, cdiag, dbopt, ps, usr, logging_values, sys_tab
                                     entry["flag"].append(f'Modified {record[0]} {record[2]} {label}')
 
                         if not cam_file:
-                            time_delta = datetime.now() - timedelta(days=time_period)
-                            if previous_timestamp < time_delta:
+                            if previous_timestamp < stale_us:
                                 message = f'File that isnt regularly updated {label}.'
                                 if is_sys:
                                     entry["scr"].append(f'{message} and is a system file.')
                                 else:
-                                    screen = cachermPATTERNS
-                                    if not matches_any_pattern(label, screen):
+                                    if not cachermPATTERNS.matches(label):
                                         entry["scr"].append(message)
 
                     if entry["cerr"] or entry["flag"] or entry["scr"] or entry["sys"]:
@@ -353,4 +377,4 @@ def hanly(parsed_chunk, checksum, cdiag, dbopt, ps, usr, logging_values, sys_tab
         else:
             emit_log("prog", x, logs.WORKER_LOG_Q)
 
-    return results, sys_records, log_entries, csum
+    return results, sys_records, log_entries, csum, lookup_time
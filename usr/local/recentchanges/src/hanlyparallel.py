@@ -1,21 +1,20 @@
 import gc
 import logging
-import multiprocessing as mp
-import os
 import sqlite3
-import threading
 import time
 import traceback
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import as_completed
 from concurrent.futures.process import BrokenProcessPool
 from .hanlymc import hanly
 from .logs import emit_log
 from .logs import init_process_worker
 from .logs import logs_to_queue
-from .logs import logging_worker
+from .patternset import PatternSet
 from .pyfunctions import cprint
-from .pysql import detect_copy
+from .pysql import detect_copies
 from .pysql import increment_f
+from .workerpool import borrow_pool
+from .workerpool import note_rate
 # 07/24/2026
 
 
@@ -37,6 +36,7 @@ def logger_process(results, sys_records, sys_tables, rout, scr, cerr, created, d
         c = conn.cursor()
 
         file_messages = {}
+        dcp_records = []  # new files to check for copies in one pass
 
         for entry in results:
 
@@ -57,45 +57,51 @@ def logger_process(results, sys_records, sys_tables, rout, scr, cerr, created, d
                 if not isinstance(dcp_messages, list):
                     dcp_messages = [dcp_messages]
 
-                if dcp_messages:
-
-                    try:
-                        for msg in dcp_messages:
-
-                            if msg is not None and len(msg) > 6:
-                                filesize = msg[6]
-                                if filesize:
-                                    timestamp = msg[0]
-                                    filepath = msg[1]
-                                    changetime = msg[2]
-                                    inode = msg[3]
-                                    checksum = msg[5]
-
-                                    # label = escf_py(filepath)
-                                    label = msg[18]
-                                    result = detect_copy(filepath, inode, checksum, sys_tables, c, ps)
-                                    if result:
-                                        rout.append(f'Copy {timestamp} {changetime} {label}')
-
-                                    # windows if creation time is greater than modified time it could be a copy, a download or a created file
-                                    # this differs from linux that has no creation time but casmod or change as mod can be put instead
-                                    # change as modified means it is significant in that it could be a downloaded file with preserved metadata
-                                    if label in created:
-                                        rout.append(f'Created {timestamp} {changetime} {label}')
-                                    else:
-                                        # mod_time = timestamp  # if not datetime
-                                        mod_time = timestamp.strftime(fmt)
-                                        # lexographic compare
-                                        if changetime and changetime > mod_time:
-                                            rout.append(f'Casmod {timestamp} {changetime} {label}')
-
-                            else:
-                                log.debug("Skipping dcp message due to insufficient length: %s", msg)
-
-                    except Exception as e:
-                        em = "Error checking for copies"
-                        print(f"{em} {e} {type(e).__name__}")
-                        log.error(em, exc_info=True)
+                for msg in dcp_messages:
+
+                    if msg is not None and len(msg) > 6:
+                        if msg[6]:  # filesize
+                            dcp_records.append(msg)
+                    else:
+                        log.debug("Skipping dcp message due to insufficient length: %s", msg)
+
+        if dcp_records:
+
+            try:
+                copies = detect_copies(c, ((i, msg[3], msg[5]) for i, msg in enumerate(dcp_records)), sys_tables, ps)
+            except Exception as e:
+                copies = set()
+                em = "Error checking for copies"
+                print(f"{em} {e} {type(e).__name__}")
+                log.error(em, exc_info=True)
+
+            for i, msg in enumerate(dcp_records):
+
+                try:
+                    timestamp = msg[0]
+                    changetime = msg[2]
+
+                    # label = escf_py(filepath)
+                    label = msg[18]
+                    if i in copies:
+                        rout.append(f'Copy {timestamp} {changetime} {label}')
+
+                    # windows if creation time is greater than modified time it could be a copy, a download or a created file
+                    # this differs from linux that has no creation time but casmod or change as mod can be put instead
+                    # change as modified means it is significant in that it could be a downloaded file with preserved metadata
+                    if label in created:
+                        rout.append(f'Created {timestamp} {changetime} {label}')
+                    else:
+                        # mod_time = timestamp  # if not datetime
+                        mod_time = timestamp.strftime(fmt)
+                        # lexographic compare
+                        if changetime and changetime > mod_time:
+                            rout.append(f'Casmod {timestamp} {changetime} {label}')
+
+                except Exception as e:
+                    em = "Error checking for copies"
+                    print(f"{em} {e} {type(e).__name__}")
+                    log.error(em, exc_info=True)
 
         # update sys changes in one batch
         if sys_records:
@@ -123,7 +129,7 @@ def logger_process(results, sys_records, sys_tables, rout, scr, cerr, created, d
                     log.error(em, exc_info=True)
 
 
-def hanly_parallel(drive_type, rout, created, scr, cerr, parsed, id_to_mime, cachermPATTERNS, checksum, cdiag, dbopt, ps, user, logging_values, sys_tables, iqt=False, strt=65, endp=90):
+def hanly_parallel(drive_type, rout, created, scr, cerr, parsed, id_to_mime, cachermPATTERNS, checksum, cdiag, dbopt, ps, user, logging_values, sys_tables, iqt=False, strt=65, endp=90, batched=True):
 
     all_results = []
     batch_incr = []
@@ -137,9 +143,13 @@ def hanly_parallel(drive_type, rout, created, scr, cerr, parsed, id_to_mime, cac
     csum = False
 
     ha_total_time = 0
+    lookup_time = 0.0
 
     logger = logging.getLogger("HANLY")
 
+    # compiled once. it goes to each chunk with the task
+    cachermPATTERNS = PatternSet(glob=cachermPATTERNS)
+
     show_progress = False
     if iqt:
         show_progress = True
@@ -157,7 +167,7 @@ def hanly_parallel(drive_type, rout, created, scr, cerr, parsed, id_to_mime, cac
         # tlog.start()
 
         init_process_worker(None)
-        all_results, batch_incr, log_entries, csum = hanly(parsed, checksum, cdiag, dbopt, ps, user, logging_values, sys_tables, id_to_mime, cachermPATTERNS, show_progress, logger, strt, endp)
+        all_results, batch_incr, log_entries, csum, lookup_time = hanly(parsed, checksum, cdiag, dbopt, ps, user, logging_values, sys_tables, id_to_mime, cachermPATTERNS, show_progress, logger, strt, endp, batched)
         # if log_entries:
         #     logs_to_queue(log_entries, log_q)
 
@@ -167,62 +177,51 @@ def hanly_parallel(drive_type, rout, created, scr, cerr, parsed, id_to_mime, cac
 
     else:
 
-        max_workers = min(8, os.cpu_count() or 1, len_parsed)
-        chunk_size = max(1, (len_parsed + max_workers - 1) // max_workers)
-        chunks = [parsed[i:i + chunk_size] for i in range(0, len_parsed, chunk_size)]
-
-        ctx = mp.get_context()
-        log_q = ctx.Queue(maxsize=4096)
-        log_t = threading.Thread(target=logging_worker, args=(log_q, len_parsed, strt, endp, show_progress, logger), daemon=True)
-        log_t.start()
-        try:
-            with ProcessPoolExecutor(
-                max_workers=max_workers,
-                mp_context=ctx,
-                initializer=init_process_worker,
-                initargs=(log_q,)
-            ) as executor:
-                futures = [
-                    executor.submit(
-                        hanly, chunk, checksum, cdiag, dbopt, ps, user, logging_values, sys_tables, id_to_mime, cachermPATTERNS, show_progress, None, strt, endp
-                    )
-                    for chunk in chunks
-                ]
-
-                for future in as_completed(futures):
-                    try:
-                        results, sys_records, log_entries, is_csum = future.result()
-                        if results:
-                            all_results.extend(results)
-                        if sys_records:
-                            batch_incr.extend(sys_records)
-                        if log_entries:
-                            logs_to_queue(log_entries, log_q)
-                        if is_csum:
-                            csum = True
-
-                        # done += 1
-
-                        # if show_progress:
-                        #     prog = strt + ((endp - strt) * (done / num_chunks))
-                        #     print(f"Progress: {prog:.2f}%", flush=True)
-
-                    except BrokenProcessPool as e:
-                        print("hanly encountered an error")
-                        emit_log("ERROR", f"unable to run hanly an error occured {e} \n{traceback.format_exc()}", log_q)
-                        break
-                    except Exception as e:
-                        em = f"Worker error from hanly multiprocessing: {type(e).__name__} {e}"
-                        print(em)
-                        emit_log("ERROR", f"{em} \n {traceback.format_exc()}", log_q)
-                        break
-        finally:
-            log_q.put(None)
-            log_t.join()
-            log_q.close()
-            log_q.join_thread()
+        with borrow_pool() as pool, pool.stage(len_parsed, strt, endp, show_progress, logger):
+            log_q = pool.log_q
+
+            max_workers = min(pool.workers, len_parsed)
+            chunk_size = max(1, (len_parsed + max_workers - 1) // max_workers)
+            chunks = [parsed[i:i + chunk_size] for i in range(0, len_parsed, chunk_size)]
+
+            futures = [
+                pool.submit(
+                    hanly, chunk, checksum, cdiag, dbopt, ps, user, logging_values, sys_tables, id_to_mime, cachermPATTERNS, show_progress, None, strt, endp, batched
+                )
+                for chunk in chunks
+            ]
+
+            for future in as_completed(futures):
+                try:
+                    results, sys_records, log_entries, is_csum, chunk_lookup = future.result()
+                    lookup_time += chunk_lookup
+                    if results:
+                        all_results.extend(results)
+                    if sys_records:
+                        batch_incr.extend(sys_records)
+                    if log_entries:
+                        logs_to_queue(log_entries, log_q)
+                    if is_csum:
+                        csum = True
+
+                    # done += 1
+
+                    # if show_progress:
+                    #     prog = strt + ((endp - strt) * (done / num_chunks))
+                    #     print(f"Progress: {prog:.2f}%", flush=True)
+
+                except BrokenProcessPool as e:
+                    print("hanly encountered an error")
+                    emit_log("ERROR", f"unable to run hanly an error occured {e} \n{traceback.format_exc()}", log_q)
+                    break
+                except Exception as e:
+                    em = f"Worker error from hanly multiprocessing: {type(e).__name__} {e}"
+                    print(em)
+                    emit_log("ERROR", f"{em} \n {traceback.format_exc()}", log_q)
+                    break
 
     end = time.perf_counter()
+    note_rate("hanly", len_parsed, end - start)
 
     if not is_error and len(all_results) > 0:
         ha_total_time = end - start
@@ -236,4 +235,4 @@ def hanly_parallel(drive_type, rout, created, scr, cerr, parsed, id_to_mime, cac
     logger_total_time = lend - end
 
     gc.collect()
-    return csum, ha_total_time, logger_total_time
+    return csum, ha_total_time, logger_total_time, lookup_time
@@ -0,0 +1,50 @@
+from collections import Counter
+try:
+    import numpy as np
+except ImportError:
+    np = None
+# byte histogram backends for calculate_checksum entropy 10/18/2026
+
+
+class CounterHistogram:
+    """ stdlib fallback. counts every byte of the chunk into a Counter """
+    name = "counter"
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def update(self, chunk):
+        self.counts.update(chunk)
+
+    def values(self):
+        return self.counts.values()
+
+
+class NumpyHistogram:
+    """ bincount over a frombuffer view of the chunk. no per byte python loop """
+    name = "numpy"
+
+    def __init__(self):
+        self.counts = np.zeros(256, dtype=np.int64)
+
+    def update(self, chunk):
+        if len(chunk):
+            self.counts += np.bincount(np.frombuffer(chunk, dtype=np.uint8), minlength=256)
+
+    def values(self):
+        return self.counts[self.counts > 0].tolist()
+
+
+BACKENDS = {
+    "counter": CounterHistogram,
+}
+if np is not None:
+    BACKENDS["numpy"] = NumpyHistogram
+
+DEFAULT_BACKEND = "numpy" if np is not None else "counter"
+
+
+def new_histogram(backend=None):
+    """ return an empty histogram. unknown or unavailable backend falls back to the default """
+    hist_cls = BACKENDS.get(backend or DEFAULT_BACKEND, BACKENDS[DEFAULT_BACKEND])
+    return hist_cls()
@@ -1,6 +1,5 @@
 import logging
 import os
-import psutil
 import re
 import signal
 import subprocess
@@ -20,9 +19,8 @@ from .fsearchfunctions import upt_cache
 from .pyfunctions import ap_decode
 from .pyfunctions import epoch_to_date
 from .pyfunctions import escf_py
-from .pyfunctions import parse_datetime
-from .qtfunctions import return_terminal
 from .rntchangesfunctions import removefile
+from .timecodec import text_dt
 # 07/24/2026
 
 # Globals
@@ -34,6 +32,7 @@ QUOTED_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
 # cross platform
 def process_by_target(target):
     """ return process id or 0 if the process isnt running """
+    import psutil  # only xRC needs it. kept off the command line import path
     for proc in psutil.process_iter(["pid", "cmdline"]):
         try:
             cmdline = proc.info["cmdline"] or []
@@ -46,6 +45,7 @@ def process_by_target(target):
 
 def process_kill(pid, pid_file=None):
     """ close process by id """
+    import psutil
     try:
         proc = psutil.Process(pid)
         proc.terminate()
@@ -183,6 +183,7 @@ def strup(script_dir, script, appdata_local, home_dir, inotify_creation_file, CA
         else:
             kwargs["start_new_session"] = True
             if debug_mode:
+                from .qtfunctions import return_terminal
                 terminal = return_terminal()
                 if terminal:
                     cmd = build_terminal_cmd(terminal, cmd)
@@ -240,7 +241,7 @@ def parse_line(line):
     timestamp1_subfld2 = None if other_fields[1] in ("", "None") else other_fields[1]
     timestamp1 = None if not timestamp1_subfld1 or not timestamp1_subfld2 else f"{timestamp1_subfld1} {timestamp1_subfld2}"
     if timestamp1:
-        timestamp1 = parse_datetime(timestamp1)
+        timestamp1 = text_dt(timestamp1)
     if not timestamp1:
         return None
 
@@ -423,7 +424,7 @@ def time_extract(line, tout_file, logger):
     if parts[0] == "None" or parts[1] == "None":
         logger.error("trim_tout time_extract while parsing log impartial line couldnt get mtime. skipping.. record: %s file: %s", line, tout_file)
         return 0
-    dt = parse_datetime(f"{parts[0]} {parts[1]}")
+    dt = text_dt(f"{parts[0]} {parts[1]}")
     return dt.timestamp() if dt else 0
 
 
@@ -1,5 +1,6 @@
 import logging
 import os
+import time
 from pathlib import Path
 
 
@@ -38,6 +39,7 @@ def logging_worker(queue, record_count, strt, endp, show_progress, logger=None):
     done = 0
     delta_v = endp - strt
     log = logger if logger else logging
+    start = time.perf_counter()
     while True:
         msg = queue.get()
 
@@ -51,7 +53,8 @@ def logging_worker(queue, record_count, strt, endp, show_progress, logger=None):
         if level == "prog" and show_progress:
             n = message
             done += n
-            print(f"Progress: {strt + round((delta_v) * done / record_count)}%", flush=True)
+            rate = done / max(time.perf_counter() - start, 1e-6)
+            print(f"Progress: {strt + round((delta_v) * done / record_count)}% {rate:.0f} files/s", flush=True)
         elif level == 'STOP':
             break
         else:
@@ -0,0 +1,250 @@
+# compiled multi-pattern matcher                                                              10/18/2026
+#
+# the filters, the browser suppress list and the cache clear patterns were tried one at a time for every path.
+# PatternSet compiles a list once for the run. literal substrings, *literal* globs and the literal every match of a
+# regex has to contain all go in one prefix trie turned into a regex. a single overlapping scan of the path finds the
+# literals in it so only the regexes gated by one of them are tried. the cost follows the length of the path and not
+# the number of patterns. a joined alternation with a named group per pattern is the fallback for regexes without a
+# required literal and for the other globs. a regex that cant share it (backreferences, its own named groups) is kept on
+# its own. it pickles as the pattern lists so it can go to the workers as an argument
+import fnmatch
+import re
+
+
+ALONE = re.compile(r"\\[1-9]|\(\?P[<=]")  # numbered or named group references break when joined
+LEAD_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+GLOB_CHARS = re.compile(r"[*?\[]")
+ESCAPE_ARG = re.compile(r"x[0-9a-fA-F]{0,2}|u[0-9a-fA-F]{0,4}|U[0-9a-fA-F]{0,8}|N\{[^}]*\}|0[0-7]{0,2}|[1-7][0-7]{2}|[1-9][0-9]?")
+MIN_GATE = 3  # shorter required literals gate too little to be worth it
+
+
+def trie_regex(words):
+    """ one regex matching any of words. shared prefixes are matched once and a match is always a whole word """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = None
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted((k, v) for k, v in node.items() if k)]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+def scoped(pattern):
+    """ (?i)abc -> (?i:abc). global flags are only allowed at the start of the whole regex """
+    m = LEAD_FLAGS.match(pattern)
+    if m:
+        return f"(?{m.group(1)}:{pattern[m.end():]})"
+    return pattern
+
+
+def required_literal(pattern):
+    """ the longest run of plain characters every match of the regex contains or None. only the top level outside
+        groups and classes is read. a top level | or case folding means there is none """
+    m = LEAD_FLAGS.match(pattern)
+    if m:
+        if set(m.group(1)) & set("ix"):
+            return None
+        pattern = pattern[m.end():]
+
+    runs = []
+    run = []
+    depth = 0
+    in_class = False
+    i = 0
+    n = len(pattern)
+    while i < n:
+        ch = pattern[i]
+        if in_class:
+            if ch == "\\":
+                i += 1
+            elif ch == "]":
+                in_class = False
+            i += 1
+            continue
+
+        lit = None
+        if ch == "\\":
+            nxt = pattern[i + 1:i + 2]
+            if nxt and not nxt.isalnum():
+                lit = nxt
+                i += 1
+            else:
+                # \d \b and the like end the run. \x2d \u2013 \N{...} octal and group references skip their argument too
+                m = ESCAPE_ARG.match(pattern, i + 1)
+                i += len(m.group()) if m else 1
+        elif ch in "*+?{":
+            if run:
+                run.pop()  # the char before is optional or repeated
+            if ch == "{":
+                close = pattern.find("}", i)
+                i = close if close != -1 else i
+        elif ch == "[":
+            in_class = True
+            if pattern[i + 1:i + 2] == "^":
+                i += 1
+            if pattern[i + 1:i + 2] == "]":
+                i += 1
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|":
+            if depth == 0:
+                return None
+        elif ch not in ".^$":
+            lit = ch
+
+        if lit is not None and depth == 0 and not in_class:
+            run.append(lit)
+        else:
+            if run:
+                runs.append("".join(run))
+            run = []
+        i += 1
+    if run:
+        runs.append("".join(run))
+
+    best = max(runs, key=len, default="")
+    return best if len(best) >= MIN_GATE else None
+
+
+def glob_literal(pattern):
+    """ the literal of a *literal* glob or None """
+    if len(pattern) > 2 and pattern[0] == "*" and pattern[-1] == "*" and not GLOB_CHARS.search(pattern[1:-1]):
+        return pattern[1:-1]
+    return None
+
+
+class PatternSet:
+    """ regex    re.search anywhere in the value
+        literal  substring of the value
+        glob     fnmatch of the whole value. % is * as in the cache clear patterns
+
+        patterns is every pattern in that order. counts and which index it """
+
+    def __init__(self, regex=(), literal=(), glob=()):
+        self.regex = list(regex)
+        self.literal = list(literal)
+        self.glob = list(glob)
+        self._compile()
+
+    def __getstate__(self):
+        return {"regex": self.regex, "literal": self.literal, "glob": self.glob}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def __repr__(self):
+        return f"PatternSet({len(self.regex)} regex, {len(self.literal)} literal, {len(self.glob)} glob)"
+
+    def _compile(self):
+        self.patterns = [*self.regex, *self.literal, *self.glob]
+        self._singles = []  # (compiled, whole) per pattern
+        self._words = {}  # literal -> [(index, compiled or None)]. None is a hit on its own
+        self._alone = []  # (index, compiled, whole)
+        search_parts = []  # (group, regex) joined for re.search
+        match_parts = []  # joined for re.match of the whole value
+
+        for i, p in enumerate(self.regex):
+            rx = re.compile(p)
+            self._singles.append((rx, False))
+            word = required_literal(p)
+            if word is not None:
+                self._words.setdefault(word, []).append((i, rx))
+            elif ALONE.search(p):
+                self._alone.append((i, rx, False))
+            else:
+                search_parts.append((f"_p{i}", scoped(p)))
+
+        base = len(self.regex)
+        for i, p in enumerate(self.literal, base):
+            self._singles.append((re.compile(re.escape(p)), False))
+            self._words.setdefault(p, []).append((i, None))
+
+        base += len(self.literal)
+        for i, p in enumerate(self.glob, base):
+            p = p.replace('%', '*')
+            rx = fnmatch.translate(p)
+            self._singles.append((re.compile(rx), True))
+            word = glob_literal(p)
+            if word is not None:
+                self._words.setdefault(word, []).append((i, None))
+            else:
+                match_parts.append((f"_p{i}", rx))
+
+        # a lookahead so finditer stops at every position a literal starts including overlapping ones
+        self._scan = re.compile(f"(?=({trie_regex(self._words)}))") if self._words else None
+        self._search = self._join(search_parts, False)
+        self._match = self._join(match_parts, True)
+
+    def _join(self, parts, whole):
+        """ one alternation. if they dont compile together each goes alone """
+        if not parts:
+            return None
+        try:
+            return re.compile("|".join(f"(?P<{name}>{rx})" for name, rx in parts))
+        except re.error:
+            for name, _ in parts:
+                i = int(name[2:])
+                self._alone.append((i, self._singles[i][0], whole))
+            return None
+
+    def _gated(self, value):
+        """ index of the first pattern hit through the literals in value or None """
+        for m in self._scan.finditer(value):
+            found = m.group(1)
+            # the longest literal at this position was matched. the shorter ones are its prefixes
+            for end in range(len(found), 0, -1):
+                for i, rx in self._words.get(found[:end], ()):
+                    if rx is None or rx.search(value):
+                        return i
+        return None
+
+    def which(self, value):
+        """ index in patterns of a pattern that matches or None """
+        if self._scan is not None:
+            i = self._gated(value)
+            if i is not None:
+                return i
+        if self._search is not None:
+            m = self._search.search(value)
+            if m:
+                return int(m.lastgroup[2:])
+        if self._match is not None:
+            m = self._match.match(value)
+            if m:
+                return int(m.lastgroup[2:])
+        for i, rx, whole in self._alone:
+            if (rx.match(value) if whole else rx.search(value)):
+                return i
+        return None
+
+    def matches(self, value):
+        """ True if any pattern matches """
+        return self.which(value) is not None
+
+    __call__ = matches
+
+    def counts(self, values):
+        """ per pattern the number of values it matches. only values the set matches are tried pattern by pattern """
+        counts = [0] * len(self.patterns)
+        for value in values:
+            if self.which(value) is None:
+                continue
+            for i, (rx, whole) in enumerate(self._singles):
+                if (rx.match(value) if whole else rx.search(value)):
+                    counts[i] += 1
+        return counts
@@ -14,6 +14,7 @@ class ProcessHandler(QObject):
     log = Signal(str)
     error = Signal(str)
     status = Signal(str)
+    rate = Signal(str)  # text after the % of a progress line. stage throughput
     complete = Signal(int, int)
 
     def __init__(self, lclhome, xdg_runtime, dblabel_text, use_polkit=True):
@@ -261,10 +262,13 @@ class ProcessHandler(QObject):
 
         try:
             value_str = line.split("Progress:")[1].strip()
-            percent_str = value_str.split('%')[0].strip()
-            percent = int(float(percent_str))
+            percent_str, _, detail = value_str.partition('%')
+            percent = int(float(percent_str.strip()))
             self.prog_v = percent
             self.progress.emit(percent)
+            detail = detail.strip()
+            if detail:  # walk 1200 files 3400 files/s
+                self.rate.emit(detail)
 
             # if percent >= 90.0 and self.database:
             #     self.status.emit("Waiting remaining worker(s) to finish")
@@ -272,7 +276,7 @@ class ProcessHandler(QObject):
         except ValueError:
             self.log.emit(f"Malformed progress line: {line}")
 
-    def process_stdout_line(self, line):
+    def process_stdout_line(self, line, batch=None):
 
         if "Progress:" in line:
             if self.is_prompt_timer:
@@ -287,7 +291,10 @@ class ProcessHandler(QObject):
 
         else:
             # if line.strip():
-            self.log.emit(line)
+            if batch is not None:
+                batch.append(line)
+            else:
+                self.log.emit(line)
 
     def handle_stdout(self):
 
@@ -300,8 +307,12 @@ class ProcessHandler(QObject):
         lines = self._stdout_buffer.split("\n")
         self._stdout_buffer = lines.pop()
 
+        # one log signal for the lines of a read instead of one per line
+        batch = []
         for line in lines:
-            self.process_stdout_line(line)
+            self.process_stdout_line(line, batch)
+        if batch:
+            self.log.emit("\n".join(batch))
 
     def handle_stderr(self):
         data = self.process.readAllStandardError()
@@ -5,13 +5,17 @@ import sqlite3
 import sys
 import traceback
 from .configfunctions import find_gnupg_home
-from .dirwalker import index_system
+from .gpgcrypto import SEGMENT_APPEND
 from .gpgcrypto import decr
 from .gpgcrypto import encr
+from .gpgcrypto import encr_segment
+from .gpgcrypto import segment_files
+from .gpgcrypto import segment_marks
 from .hanlyparallel import hanly_parallel
 from .pyfunctions import convert_mime_to_int
 from .pyfunctions import cprint
 from .pyfunctions import unescf_py
+from .pysql import add_us_columns
 from .pysql import clear_conn
 from .pysql import collision_check
 from .pysql import create_db
@@ -29,7 +33,7 @@ from .pyfunctions import cnc
 from .rntchangesfunctions import removefile
 
 
-def main(dbopt, dbtarget, xdata, complete, rout, created, cachermPATTERNS, user_setting, logging_values, total_time, total_files, dcr=False, iqt=False, strt=65, endp=90):
+def main(dbopt, dbtarget, xdata, complete, rout, created, cachermPATTERNS, user_setting, logging_values, total_time, total_files, dcr=False, iqt=False, strt=65, endp=90, decrypted=False):
 
     # tempwork = logging_values[3]  # the script temp directory
     scr = logging_values[4]
@@ -49,6 +53,8 @@ def main(dbopt, dbtarget, xdata, complete, rout, created, cachermPATTERNS, user_
     cdiag = user_setting['cdiag']
     ps = user_setting['ps']
     compLVL = user_setting['compLVL']
+    habatch = user_setting.get('habatch', True)
+    seg_limit = user_setting.get('segLIMIT', 20)
 
     sys_tables, _, _ = get_idx_tables(basedir, cache_s)
 
@@ -61,10 +67,11 @@ def main(dbopt, dbtarget, xdata, complete, rout, created, cachermPATTERNS, user_
     goahead = True
     is_ps = False
     conn = None
+    marks = None
 
     res = 0
 
-    ha_total_time = logger_total_time = 0
+    ha_total_time = logger_total_time = ha_lookup_time = 0
     unique_files = 0
     lifetime_throughput = 0
 
@@ -80,7 +87,7 @@ def main(dbopt, dbtarget, xdata, complete, rout, created, cachermPATTERNS, user_
     # app_dir = os.path.dirname(dbtarget)
     # dbopt = os.path.join(app_dir, outfile)
 
-    if not iqt:
+    if not iqt and not decrypted:  # prefetched or session dbopt is already decrypted
         if os.path.isfile(dbtarget):
             result, err = decr(dbtarget, dbopt, user)
             if not result:
@@ -104,6 +111,10 @@ def main(dbopt, dbtarget, xdata, complete, rout, created, cachermPATTERNS, user_
             return None, None
         if not conn:
             conn = sqlite3.connect(dbopt)
+            # a database from before the integer time columns is saved whole once so recent.gpg carries them
+            migrated = add_us_columns(conn, ("logs", *sys_tables))
+            if seg_limit > 0 and os.path.isfile(dbtarget) and not migrated:
+                marks = segment_marks(conn, (*SEGMENT_APPEND, sys_tables[1]))
     except Exception as e:
         print(f'failed with error: {e}')
         print()
@@ -128,6 +139,7 @@ def main(dbopt, dbtarget, xdata, complete, rout, created, cachermPATTERNS, user_
 
                 print('Generating system profile.')
                 appdata_local = logging_values[2]
+                from .dirwalker import index_system  # only for a first profile. keeps the walker off the search import path
                 res = index_system(appdata_local, dbopt, dbtarget, basedir, user, cache_s, email, analytics, False, gnupg_home, compLVL, iqt, strt, endp)
                 if res != 0:
                     print("index_system from dirwalker failed to hash in pstsrg")
@@ -154,7 +166,7 @@ def main(dbopt, dbtarget, xdata, complete, rout, created, cachermPATTERNS, user_
                     if iqt:
                         print(f"Progress: {strt}", flush=True)
 
-                    csum, ha_total_time, logger_total_time = hanly_parallel(model_type, rout, created, scr, cerr, xdata, id_to_mime, cachermPATTERNS, checksum, cdiag, dbopt, is_ps, user, logging_values, sys_tables, iqt, strt, endp)
+                    csum, ha_total_time, logger_total_time, ha_lookup_time = hanly_parallel(model_type, rout, created, scr, cerr, xdata, id_to_mime, cachermPATTERNS, checksum, cdiag, dbopt, is_ps, user, logging_values, sys_tables, iqt, strt, endp, habatch)
 
                 except Exception as e:
                     print(f"hanlydb failed to process : {type(e).__name__} : {e} \n{traceback.format_exc().strip()}", file=sys.stderr)
@@ -230,10 +242,16 @@ def main(dbopt, dbtarget, xdata, complete, rout, created, cachermPATTERNS, user_
         if not db_error:
             try:
                 conn.commit()
-                nc = cnc(dbopt, compLVL)
                 if new_profile:
                     dcr = False
-                sts = encr(dbopt, dbtarget, email, user=user, no_compression=nc, dcr=dcr)
+                # append this run as a delta segment. every seg_limit runs fold them back into recent.gpg
+                elif marks is not None and len(segment_files(dbtarget)) < seg_limit:
+                    sts = encr_segment(conn, marks, dbtarget, email, user=user)
+                    if not sts:
+                        print("Failed to write database segment. Encrypting the whole database.")
+                if not sts:
+                    nc = cnc(dbopt, compLVL)
+                    sts = encr(dbopt, dbtarget, email, user=user, no_compression=nc, dcr=dcr)
                 if not sts:
                     res = 3  # & 2 gpg problem
                     print(f'Failed to encrypt database. Run   gpg --yes -e -r {email} -o {dbtarget} {dbopt}  before running again to preserve data.')
@@ -249,7 +267,7 @@ def main(dbopt, dbtarget, xdata, complete, rout, created, cachermPATTERNS, user_
     finally:
         clear_conn(conn, c)
 
-    data = (csum, unique_files, lifetime_throughput, ha_total_time, logger_total_time)
+    data = (csum, unique_files, lifetime_throughput, ha_total_time, logger_total_time, ha_lookup_time)
 
     if not dcr and res != 3:
         removefile(dbopt)
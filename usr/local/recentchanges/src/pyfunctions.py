@@ -1,13 +1,17 @@
-import fnmatch
 import os
-import re
 from datetime import datetime
 from .configfunctions import not_absolute
+from .patternset import PatternSet
+from .timecodec import FMT
+from .timecodec import text_dt
+
+
+# sampled entropy is stored offset by SAMPLED_ENTROPY in the entropy column. full entropy is 0 - 8 sampled 10 - 18
+SAMPLED_ENTROPY = 10.0
 
 
 def suppress_list(escaped_user, suppress_list):
-    compiled = [re.compile(re.escape(p)) for p in suppress_list]
-    return compiled
+    return PatternSet(literal=suppress_list)
 
 
 def cache_clear_patterns(usr, cachermPATTERNS):
@@ -47,16 +51,6 @@ def user_path(settingName, theusr):
         raise ValueError(f"Invalid type for settingName: {type(settingName).__name__}, expected str or list")
 
 
-# Convert SQL-like % wildcard to fnmatch *
-def matches_any_pattern(s, patterns):
-
-    for pat in patterns:
-        pat = pat.replace('%', '*')
-        if fnmatch.fnmatch(s, pat):
-            return True
-    return False
-
-
 # Initialize check no compression
 def cnc(target_file, compLVL):
     CSZE = 1024*1024
@@ -137,6 +131,8 @@ def epoch_to_date(epoch):
 def parse_datetime(value, fmt="%Y-%m-%d %H:%M:%S"):
     if isinstance(value, datetime):
         return value
+    if fmt == FMT:
+        return text_dt(value)
     try:
         return datetime.strptime(str(value).strip(), fmt)
         # return dt.strftime(fmt)
@@ -193,6 +189,8 @@ def is_integer(value):
 
 
 def is_valid_datetime(value, fmt):
+    if fmt == FMT:
+        return text_dt(value) is not None
     try:
         datetime.strptime(str(value).strip(), fmt)
         return True
@@ -200,6 +198,32 @@ def is_valid_datetime(value, fmt):
         return False
 
 
+def is_sampled(entropy):
+    return entropy is not None and entropy >= SAMPLED_ENTROPY
+
+
+def entropy_value(entropy):
+    """ entropy without the sampled flag """
+    if is_sampled(entropy):
+        return round(entropy - SAMPLED_ENTROPY, 2)
+    return entropy
+
+
+def entropy_delta(recent_entropy, previous_entropy):
+    """ None unless both are full or both are sampled so deltas stay comparable """
+    if recent_entropy is None or previous_entropy is None:
+        return None
+    if is_sampled(recent_entropy) != is_sampled(previous_entropy):
+        return None
+    return abs(recent_entropy - previous_entropy)
+
+
+def entropy_str(entropy):
+    if entropy is None:
+        return "None"
+    return f"{entropy_value(entropy):.2f}{' sampled' if is_sampled(entropy) else ''}"
+
+
 def date_from_stat(st, fmt):
     a_mod = st.st_mtime
     afrm_dt = datetime.fromtimestamp(a_mod)  # datetime.utcfromtimestamp(a_mod)
@@ -1,5 +1,6 @@
 import sqlite3
 import traceback
+from .timecodec import sql_wall_us
 
 
 COLUMNS = [
@@ -22,6 +23,94 @@ COLUMNS = [
     'hardlinks INTEGER'
 ]
 
+# integer images of the TEXT times for logs and sys. local wall clock not epoch. see timecodec. virtual so every
+# writer fills them
+US_COLUMNS = (("timestamp_wall_us", "timestamp"), ("changetime_wall_us", "changetime"))
+OLD_US_COLUMNS = ("timestamp_us", "changetime_us")  # the same columns under names that read as epochs like mtime_us
+
+
+def us_column(name, source):
+    return f"{name} INTEGER GENERATED ALWAYS AS ({sql_wall_us(source)}) VIRTUAL"
+
+
+US_COLUMN_DEFS = [us_column(name, source) for name, source in US_COLUMNS]
+
+
+def stored_columns(c, table, alias=None):
+    """ column list of table for a SELECT in place of *. PRAGMA table_info leaves out the generated US columns """
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(f"{prefix}{row[1]}" if row[1] != "group" else f"{prefix}`group`" for row in c.execute(f"PRAGMA table_info({table})"))
+
+
+def create_us_index(c, table):
+    c.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_filename_wall_us ON {table} (filename, timestamp_wall_us DESC)')
+
+
+def add_us_columns(conn, tables):
+    """ migrate logs and sys tables from before timestamp_wall_us and changetime_wall_us. True if any table changed """
+    c = conn.cursor()
+    changed = False
+    for table in tables:
+        existing = {row[1] for row in c.execute(f"PRAGMA table_xinfo({table})")}
+        old = [name for name in OLD_US_COLUMNS if name in existing]
+        if old:
+            c.execute(f"DROP INDEX IF EXISTS idx_{table}_filename_ts_us")
+            for name in old:
+                c.execute(f"ALTER TABLE {table} DROP COLUMN {name}")
+            changed = True
+        missing = [(name, source) for name, source in US_COLUMNS if name not in existing]
+        if not existing or not missing:
+            continue
+        for name, source in missing:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN {us_column(name, source)}")
+        if table == 'logs' or table.startswith('sys2'):  # the tables hanly takes the latest row from
+            create_us_index(c, table)
+        changed = True
+    if changed:
+        conn.commit()
+    return changed
+
+
+# cache clear marks. logs and stats ids only grow (AUTOINCREMENT) and a clear deletes every row a pattern matches so the
+# next clear of that pattern only reads the rows added since. the LIKE runs over the id range above the mark and not
+# the whole table. a new pattern starts at 0
+CLEAR_MARKS = "clear_marks"
+
+
+def create_clear_marks(c):
+    c.execute(f'''
+    CREATE TABLE IF NOT EXISTS {CLEAR_MARKS} (
+      pattern TEXT NOT NULL,
+      tbl TEXT NOT NULL,
+      last_id INTEGER NOT NULL,
+      PRIMARY KEY (pattern, tbl)
+    )
+    ''')
+
+
+def delete_like(c, table, pattern):
+    """ DELETE FROM table WHERE filename LIKE pattern for the rows added since the last clear of pattern. returns the
+        rows deleted """
+    row = c.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    top = row[0] if row else 0
+    row = c.execute(f"SELECT last_id FROM {CLEAR_MARKS} WHERE pattern = ? AND tbl = ?", (pattern, table)).fetchone()
+    mark = row[0] if row and row[0] <= top else 0  # ids went back. the table was emptied or rebuilt
+    c.execute(f"DELETE FROM {table} WHERE id > ? AND filename LIKE ?", (mark, pattern))
+    deleted = c.rowcount
+    c.execute(f'''
+    INSERT INTO {CLEAR_MARKS} (pattern, tbl, last_id) VALUES (?, ?, ?)
+    ON CONFLICT(pattern, tbl) DO UPDATE SET last_id = excluded.last_id
+    ''', (pattern, table, top))
+    return deleted
+
+
+def drop_clear_marks(cur, table):
+    """ forget the marks of a table whose ids start over """
+    try:
+        cur.execute(f"DELETE FROM {CLEAR_MARKS} WHERE tbl = ?", (table,))
+    except sqlite3.OperationalError:
+        pass
+
 
 def create_logs_table(c, unique_columns, add_column=None):
     columns = [
@@ -54,6 +143,7 @@ def create_logs_table(c, unique_columns, add_column=None):
     c.execute(f'{sql} idx_logs_filename ON logs (filename)')
     # c.execute(f'{sql} idx_logs_checksum_filename ON logs (checksum, filename)')
     c.execute(f'{sql} idx_logs_collision ON logs (checksum, filesize, filename)')
+    create_us_index(c, 'logs')
 
 
 def create_sys_variant(c, table_name, columns, unique_columns):
@@ -70,6 +160,7 @@ def create_sys_variant(c, table_name, columns, unique_columns):
     if table_name.startswith('sys2'):
         c.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_filename_ts ON {table_name} (filename, timestamp DESC)")
         c.execute(f'CREATE INDEX IF NOT EXISTS idx_{table_name}_checksum_filename ON {table_name} (checksum, filename)')  # Composite
+        create_us_index(c, table_name)
 
 
 def create_scan_tables(c):
@@ -110,7 +201,8 @@ def create_sys_tables(c, sys_tables):
         'id INTEGER PRIMARY KEY AUTOINCREMENT',
         *COLUMNS,
         'count INTEGER',
-        'mtime_us INTEGER'
+        'mtime_us INTEGER',
+        *US_COLUMN_DEFS
     ]
 
     create_sys_variant(c, sys_a, columns, ('filename',))
@@ -118,6 +210,64 @@ def create_sys_tables(c, sys_tables):
     create_scan_tables(c)
 
 
+# one row per filename in sys_b. the id of its latest change, how many changes and the latest entropy mime and target
+# so the superimpose view and the diff queries dont group or take MAX(timestamp) over all of sys_b. rows are folded in
+# by id so a reader catches up on anything inserted without increment_f, replayed segments or an older database
+def summary_table(sys_b):
+    return "sum_" + sys_b
+
+
+def sync_sys_summary(c, sys_b):
+    """ create the summary of sys_b if needed and fold in the rows added since it was last synced """
+    table = summary_table(sys_b)
+    c.execute(f'''
+    CREATE TABLE IF NOT EXISTS {table} (
+      filename TEXT PRIMARY KEY,
+      last_id INTEGER NOT NULL,
+      changes INTEGER NOT NULL,
+      entropy REAL,
+      mime_id INTEGER,
+      target TEXT
+    )
+    ''')
+    c.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_last_id ON {table} (last_id)')
+
+    synced = c.execute(f"SELECT COALESCE(MAX(last_id), 0) FROM {table}").fetchone()[0]
+    if synced and synced > c.execute(f"SELECT COALESCE(MAX(id), 0) FROM {sys_b}").fetchone()[0]:
+        c.execute(f"DELETE FROM {table}")  # sys_b was dropped and rebuilt under it
+        synced = 0
+
+    # the bare columns come from the MAX(id) row of each group
+    c.execute(f'''
+    INSERT INTO {table} (filename, last_id, changes, entropy, mime_id, target)
+    SELECT filename, MAX(id), COUNT(*), entropy, mime_id, target
+    FROM {sys_b}
+    WHERE id > ?
+    GROUP BY filename
+    ON CONFLICT(filename) DO UPDATE SET
+      last_id = excluded.last_id,
+      changes = changes + excluded.changes,
+      entropy = excluded.entropy,
+      mime_id = excluded.mime_id,
+      target = excluded.target
+    ''', (synced,))
+
+
+def dbsync_sys_summary(dbopt, sys_b):
+    conn = cur = None
+    try:
+        conn = sqlite3.connect(dbopt)
+        cur = conn.cursor()
+        sync_sys_summary(cur, sys_b)
+        conn.commit()
+        return True
+    except sqlite3.Error as e:
+        print(f"Failed to sync {summary_table(sys_b)} in dbsync_sys_summary {type(e).__name__}: {e}")
+    finally:
+        clear_conn(conn, cur)
+    return False
+
+
 def create_table_cache(c, table, unique_columns):
     columns = [
         'id INTEGER PRIMARY KEY AUTOINCREMENT',
@@ -154,7 +304,7 @@ def create_db(database, sys_tables, action=None):
     conn = sqlite3.connect(database)
     c = conn.cursor()
 
-    create_logs_table(c, ('timestamp', 'filename', 'changetime', 'checksum'), ['mtime_us INTEGER'])
+    create_logs_table(c, ('timestamp', 'filename', 'changetime', 'checksum'), ['mtime_us INTEGER', *US_COLUMN_DEFS])
 
     create_sys_tables(c, sys_tables)  # sys and sys2
 
@@ -352,7 +502,8 @@ def get_sys_changes(cursor, sys_a, sys_b):
         target,
         lastmodified,
         hardlinks,
-        count
+        count,
+        mtime_us
     FROM {sys_b} AS b
     WHERE b.timestamp = (
         SELECT MAX(timestamp)
@@ -378,7 +529,8 @@ def get_sys_changes(cursor, sys_a, sys_b):
         a.target,
         a.lastmodified,
         a.hardlinks,
-        a.count
+        a.count,
+        a.mtime_us
     FROM {sys_a} AS a
     WHERE NOT EXISTS (
         SELECT 1
@@ -425,7 +577,7 @@ def dbtable_has_data(dbopt, table_name):
 
 def clear_sys_profile(conn, cur, basedir, sys_tables, cache_table, systimeche, log_fn=print):
 
-    del_tables = sys_tables + (cache_table,) + (systimeche,)
+    del_tables = sys_tables + (summary_table(sys_tables[1]), cache_table, systimeche)
 
     cur_tbl = ""
     try:
@@ -465,7 +617,7 @@ def clear_sys_profile(conn, cur, basedir, sys_tables, cache_table, systimeche, l
 def dbclear_sys_profile(dbopt, sys_tables, cache_table, systimeche):
     # Drop system time table
     fn = "dbclear_sys_profile"
-    del_tables = sys_tables + (cache_table,) + (systimeche,)
+    del_tables = sys_tables + (summary_table(sys_tables[1]), cache_table, systimeche)
 
     cur_tbl = ""
     conn = cur = None
@@ -526,6 +678,7 @@ def clear_table(table, conn, cur, quiet=False):
             cur.execute("DELETE FROM sqlite_sequence WHERE name=?", (table,))
         except sqlite3.OperationalError:
             pass
+        drop_clear_marks(cur, table)
         conn.commit()
         if not quiet:
             print(f"{table} table cleared.")
@@ -562,6 +715,7 @@ def dbclear_table(dbopt, table_name):
 def rmv_table(table, conn, cur, quiet=False):
     try:
         cur.execute(f"DROP TABLE IF EXISTS {table}")
+        drop_clear_marks(cur, table)
         conn.commit()
         if not quiet:
             print(f"{table} table cleared.")
@@ -725,50 +879,47 @@ def collision(cursor, is_sys, sys_tables=None):
 #     return collision_map, csum
 
 
-def detect_copy(filename, inode, checksum, sys_tables, cursor, ps):
-    if ps:
-        sys_a, sys_b = sys_tables
-        query = f"""
-            SELECT filename, inode FROM logs WHERE checksum = ?
-            UNION ALL
-            SELECT filename, inode FROM {sys_a} WHERE checksum = ?
-            UNION ALL
-            SELECT filename, inode FROM {sys_b} WHERE checksum = ?
+def detect_copies(cursor, records, sys_tables, ps):
+    """ copy detection for new files. records are (key, inode, checksum). returns the keys whose checksum is stored
+        under another inode. one join per table against a TEMP table instead of a lookup per file """
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS copy_batch (key INTEGER PRIMARY KEY, inode INTEGER, checksum TEXT)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS temp.idx_copy_batch_checksum ON copy_batch (checksum)")
+    cursor.execute("DELETE FROM temp.copy_batch")
+    cursor.executemany("INSERT INTO temp.copy_batch (key, inode, checksum) VALUES (?, ?, ?)", records)
+
+    tables = ["logs", *sys_tables] if ps else ["logs"]
+    query = "\nUNION\n".join(
+        f"""
+        SELECT n.key
+        FROM temp.copy_batch n
+        JOIN {table} o ON o.checksum = n.checksum
+        WHERE o.inode <> n.inode
         """
-        cursor.execute(query, (checksum, checksum, checksum))
-    else:
-        query = '''
-            SELECT filename, inode
-            FROM logs
-            WHERE checksum = ?
-        '''
-        cursor.execute(query, (checksum,))
-
-    candidates = cursor.fetchall()
+        for table in tables
+    )
+    cursor.execute(query)
+    return {row[0] for row in cursor.fetchall()}
 
-    for row in candidates:
 
-        _, o_inode = row
-        # if o_filename != filename or o_inode != inode:
-        #    return True
-        if int(o_inode) != inode:
-            return True
-    return False
+RECENT_COLUMNS = [
+    "timestamp", "filename", "changetime", "inode",
+    "accesstime", "checksum", "entropy", "mime_id",
+    "filesize", "symlink", "owner", "`group`",
+    "permissions", "casmod", "target"
+]
 
 
-def get_recent_changes(filename, cursor, table, e_cols=None):
-    columns = [
-        "timestamp", "filename", "changetime", "inode",
-        "accesstime", "checksum", "entropy", "mime_id",
-        "filesize", "symlink", "owner", "`group`",
-        "permissions", "casmod", "target"
-    ]
+def recent_col_str(e_cols=None):
+    columns = list(RECENT_COLUMNS)
     if e_cols:
         if isinstance(e_cols, str):
             e_cols = [col.strip() for col in e_cols.split(',') if col.strip()]
         columns += e_cols
+    return ", ".join(columns)
 
-    col_str = ", ".join(columns)
+
+def get_recent_changes(filename, cursor, table, e_cols=None):
+    col_str = recent_col_str(e_cols)
 
     query = f'''
         SELECT {col_str}
@@ -781,21 +932,51 @@ def get_recent_changes(filename, cursor, table, e_cols=None):
     return cursor.fetchone()
 
 
-def get_recent_sys(filename, cursor, sys_tables, e_cols=None):
+def load_recent_batch(cursor, filenames):
+    """ load a chunk of filenames into a TEMP table for the batched lookups below """
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS recent_batch (filename TEXT PRIMARY KEY)")
+    cursor.execute("DELETE FROM temp.recent_batch")
+    cursor.executemany(
+        "INSERT OR IGNORE INTO temp.recent_batch (filename) VALUES (?)",
+        ((filename,) for filename in filenames)
+    )
+
+
+def get_recent_changes_batch(cursor, table, e_cols=None):
+    """ batched get_recent_changes. latest row per filename in recent_batch keyed by filename """
+    col_str = recent_col_str(e_cols)
+    cursor.execute(f'''
+        SELECT {col_str}
+        FROM (
+            SELECT t.*, ROW_NUMBER() OVER (PARTITION BY t.filename ORDER BY t.timestamp_wall_us DESC) AS rn
+            FROM {table} t
+            JOIN temp.recent_batch b ON b.filename = t.filename
+        )
+        WHERE rn = 1
+    ''')
+    return {row[1]: row for row in cursor.fetchall()}
+
+
+def get_recent_sys_batch(cursor, sys_tables, e_cols=None):
+    """ batched get_recent_sys. latest sys_b row per filename falling back to the sys_a row """
     sys_a, sys_b = sys_tables
+    col_str = recent_col_str(e_cols)
 
-    columns = [
-        "timestamp", "filename", "changetime", "inode",
-        "accesstime", "checksum", "entropy", "mime_id",
-        "filesize", "symlink", "owner", "`group`",
-        "permissions", "casmod", "target"
-    ]
-    if e_cols:
-        if isinstance(e_cols, str):
-            e_cols = [col.strip() for col in e_cols.split(',') if col.strip()]
-        columns += e_cols
+    cursor.execute(f'''
+        SELECT {col_str}
+        FROM {sys_a}
+        WHERE filename IN (SELECT filename FROM temp.recent_batch)
+    ''')
+    rows = {row[1]: row for row in cursor.fetchall()}
+
+    rows.update(get_recent_changes_batch(cursor, sys_b, e_cols))
+    return rows
+
+
+def get_recent_sys(filename, cursor, sys_tables, e_cols=None):
+    sys_a, sys_b = sys_tables
 
-    col_str = ", ".join(columns)
+    col_str = recent_col_str(e_cols)
 
     cursor.execute(f'''
         SELECT {col_str}
@@ -830,6 +1011,7 @@ def increment_f(conn, c, sys_tables, records, logger=None):
     try:
 
         c.executemany(sql_insert, records)
+        sync_sys_summary(c, sys_b)
 
         return True
     except sqlite3.OperationalError as e:
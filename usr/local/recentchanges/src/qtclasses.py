@@ -3,7 +3,7 @@ import psutil
 import re
 import sys
 from dataclasses import dataclass
-from PySide6.QtCore import Signal, QObject, Slot
+from PySide6.QtCore import Signal, QObject, Slot, QTimer
 from PySide6.QtGui import QTextCharFormat, QColor, QTextCursor, QIcon
 from PySide6.QtWidgets import QPlainTextEdit, QVBoxLayout, QDialog, QPushButton, QComboBox, QLineEdit, QDialogButtonBox, QLabel, QCheckBox
 from .gpgcrypto import start_user_agent
@@ -23,45 +23,140 @@ ANSI_COLOR_MAP = {
 RESET_CODE = "0"
 ANSI_REGEX = re.compile(r'\033\[([0-9;]+)m')
 
+FLUSH_MS = 50  # output is written to the pane at most this often
+MAX_BLOCKS = 20000  # lines the pane keeps. the spool keeps everything
+
 
 class FastColorText(QPlainTextEdit):
+    """ hudt. output is queued and written every FLUSH_MS in one edit so a search printing every path costs one layout
+        per frame and not one per line. the pane keeps the last MAX_BLOCKS lines. set_spool writes all of it to a file """
+
     def __init__(self):
         super().__init__()
         self.setReadOnly(True)
+        self.setMaximumBlockCount(MAX_BLOCKS)
         self.current_color = None
 
+        self.spool_path = None
+        self._spool = None
+        self._spool_eol = True
+        self._pending = []
+        self._formats = {}
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_MS)
+        self._flush_timer.timeout.connect(self.flush_output)
+
+    def set_spool(self, path):
+        """ the full output goes to path. it starts empty each session """
+        try:
+            self._spool = open(path, "w", encoding="utf-8", errors="replace")
+            self.spool_path = path
+            return True
+        except OSError:
+            self._spool = None
+            self.spool_path = None
+            return False
+
+    def close_spool(self):
+        self.flush_output()
+        if self._spool:
+            self._spool.close()
+            self._spool = None
+
+    def at_line_start(self):
+        """ True if the output so far queued or not ends a line """
+        if self._pending:
+            return self._pending[-1].endswith(("\n", "\r"))
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        return cursor.positionInBlock() == 0
+
     def append_colored_output(self, line: str):
         # normalized = line.replace("\r\n", "\n").replace("\r", "\n")
-        parts = ANSI_REGEX.split(line)
+        self.spool(ANSI_REGEX.sub("", line))
+        self._pending.append(line)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def spool(self, text):
+        if self._spool and text:
+            try:
+                self._spool.write(text)
+                self._spool_eol = text.endswith(("\n", "\r"))
+            except OSError:
+                self._spool = None
+
+    def flush_output(self):
+        """ write the queued output to the pane """
+        self._flush_timer.stop()
+        if self._spool:
+            try:
+                self._spool.flush()
+            except OSError:
+                self._spool = None
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending = []
+
+        # the pane would drop the older lines right away. only their colors carry over
+        if text.count("\n") > MAX_BLOCKS:
+            lines = text.split("\n")
+            cut = len(lines) - MAX_BLOCKS
+            for code in ANSI_REGEX.findall("\n".join(lines[:cut])):
+                self.set_color(code)
+            text = "\n".join(lines[cut:])
+
+        parts = ANSI_REGEX.split(text)
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
         i = 0
 
         while i < len(parts):
-            text = parts[i]
-            if text:
-                self.insert_colored_text(text, self.current_color)
+            chunk = parts[i]
+            if chunk:
+                cursor.insertText(chunk, self.char_format(self.current_color))
             i += 1
 
             if i < len(parts):
-                code = parts[i]
-                if code == RESET_CODE:
-                    self.current_color = None
-                elif code in ANSI_COLOR_MAP:
-                    self.current_color = ANSI_COLOR_MAP[code]
+                self.set_color(parts[i])
                 i += 1
 
+        cursor.endEditBlock()
+        self.setTextCursor(cursor)
+
         self.verticalScrollBar().setValue(
             self.verticalScrollBar().maximum()
         )
 
-    def insert_colored_text(self, text, color):
-        fmt = QTextCharFormat()
-        if color:
-            fmt.setForeground(color)
-
-        cursor = self.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        cursor.insertText(text, fmt)
-        self.setTextCursor(cursor)
+    def set_color(self, code):
+        if code == RESET_CODE:
+            self.current_color = None
+        elif code in ANSI_COLOR_MAP:
+            self.current_color = ANSI_COLOR_MAP[code]
+
+    def char_format(self, color):
+        key = color.rgba() if color else None  # QColor isnt hashable
+        fmt = self._formats.get(key)
+        if fmt is None:
+            fmt = QTextCharFormat()
+            if color:
+                fmt.setForeground(color)
+            self._formats[key] = fmt
+        return fmt
+
+    def appendPlainText(self, text):
+        self.flush_output()  # after what was queued before it
+        self.spool(("" if self._spool_eol else "\n") + text + "\n")
+        super().appendPlainText(text)
+
+    def clear(self):
+        self._flush_timer.stop()
+        self._pending = []
+        super().clear()
 
 
 class QTextEditLogger(QObject):  # gui/console
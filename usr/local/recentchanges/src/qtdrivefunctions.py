@@ -1,10 +1,8 @@
 import os
-import psutil
-import pyudev
 import sqlite3
 import subprocess
+import sys
 from pathlib import Path
-from PySide6.QtWidgets import QApplication
 from .config import dump_j_settings
 from .config import get_json_settings
 from .config import set_json_settings
@@ -13,8 +11,8 @@ from .config import update_toml_values
 from .gpgcrypto import decr
 from .gpgcrypto import encr
 from .pyfunctions import cnc
+from .pysql import summary_table
 from .pysql import table_exists
-from .qtfunctions import window_prompt
 from .rntchangesfunctions import name_of
 from .rntchangesfunctions import removefile
 
@@ -97,7 +95,12 @@ def get_new_idx_suffix(device, j_settings):
     return key
 
 
+# psutil pyudev and Qt are imported where they are used. the command line search imports this module for the
+# cache and table names and shouldnt pay for them
+
+
 def get_mount_partuuid(mount_point: str) -> str | None:
+    import psutil
     partitions = psutil.disk_partitions()
     device = None
     for p in partitions:
@@ -128,6 +131,7 @@ def get_mount_from_partuuid(partuuid: str) -> str | None:
 
 
 def get_mountpoint(dev_path: str) -> str | None:
+    import psutil
     for part in psutil.disk_partitions(all=True):
         if part.device == dev_path:
             return part.mountpoint
@@ -138,6 +142,7 @@ def device_name_of_mount(mount_point: str) -> str | None:
     if not mount_point:
         return None
 
+    import psutil
     target = os.path.realpath(mount_point)
 
     for part in psutil.disk_partitions(all=True):
@@ -189,6 +194,8 @@ def is_model_ssd(model: str) -> bool:
 
 # udevadm info --name=/dev/nvme0n1p6 --attribute-walk
 def current_drive_type_model_check(base_dir="/"):
+    import psutil
+    import pyudev
 
     device_name = parent_device = None
     rotational = -1
@@ -277,9 +284,11 @@ def current_drive_type_model_check(base_dir="/"):
                     # the drive and then leads to including unecessary packages
                     drive_type = "HDD"
                     parent = None
-                    app_inst = QApplication.instance()
+                    qt = sys.modules.get("PySide6.QtWidgets")  # only loaded by the gui
+                    app_inst = qt.QApplication.instance() if qt else None
                     if app_inst:
-                        parent = QApplication.activeWindow()
+                        from .qtfunctions import window_prompt
+                        parent = qt.QApplication.activeWindow()
                         uinpt = window_prompt(parent, "Drive type", f"Is {base_dir} ssd", "Yes", "No")
                         if uinpt:
                             drive_type = "SSD"
@@ -444,6 +453,7 @@ def get_cache_files(basedir, dbopt, dbtarget, cache_s, json_file, user, email, c
                         try:
                             with sqlite3.connect(dbopt) as conn:
                                 cur = conn.cursor()
+                                cur.execute(f"DROP TABLE IF EXISTS {summary_table(sys_b)}")  # rebuilt from sys_b on next use
                                 for table in table_list:
                                     table_name = table[0]
                                     if table_exists(conn, table_name):
@@ -24,6 +24,8 @@ from .gpgcrypto import encr
 from .gpgcrypto import encrypt_to_text
 from .pyfunctions import is_integer
 from .pysql import clear_conn
+from .pysql import create_clear_marks
+from .pysql import delete_like
 from .rntchangesfunctions import to_bool
 from .rntchangesfunctions import porteus_linux_check
 # 07/10/2026
@@ -371,11 +373,11 @@ def clear_cache(conn, cur, cachermPATTERNS, log_fn=print):
     files_d = cachermPATTERNS
     filename_pattern = None
     try:
+        create_clear_marks(cur)
         for filename_pattern in files_d:
-            cur.execute("DELETE FROM logs WHERE filename LIKE ?", (filename_pattern,))
-            cur.execute("DELETE FROM stats WHERE filename LIKE ?", (filename_pattern,))
-        if filename_pattern is not None:
-            conn.commit()
+            delete_like(cur, "logs", filename_pattern)
+            delete_like(cur, "stats", filename_pattern)
+        conn.commit()
         log_fn("Cache files cleared.")
         return True
     except sqlite3.Error as e:
@@ -2,18 +2,7 @@
 #!/usr/bin/env python3
 # flake8: noqa: E402
 import sys
-from src.dirwalker import main_entry as dirwalker_main
-from src.findfile import main_entry as findfile_main
-from src.gpgkeymanagement import import_key
-from src.qtfunctions import load_file_manager
-from src.qtfunctions import load_konsole
-from src.qtfunctions import kill_process
-from src.qtfunctions import set_clock
-from src.recentchangessearch import main as recentchanges_main
-from src.recentchangessearchparser import build_subparser
-from src.rntchanges import main as rntchanges_main
-from src.rntchangesfunctions import display
-from scripts.watchdog_linux import main as watchdog_main
+# each entry point is imported once the arguments pick it. a terminal search doesnt load the gui modules
 # 07/10/2026
 
 
@@ -33,10 +22,10 @@ def dispatch_internal(argv):
                     "build": 7,
                     "downloads": 12,
                 },
-                "recentchangessearch.py": recentchanges_main,
-                "findfile.py": findfile_main,
-                "import": import_key,
-                "watchdog_linux.py": watchdog_main
+                "recentchangessearch.py": "src.recentchangessearch",
+                "findfile.py": "src.findfile",
+                "import": "src.gpgkeymanagement",
+                "watchdog_linux.py": "scripts.watchdog_linux"
             }
 
             entry = DISPATCH_MAP.get(script)
@@ -61,22 +50,34 @@ def dispatch_internal(argv):
                     print(f"Not enough args for '{cmd}', expected {min_args}, got {len(args)}")
                     sys.exit(1)
 
+                from src.dirwalker import main_entry as dirwalker_main
                 sys.exit(dirwalker_main(args))
 
             elif entry:
 
                 if script == "recentchangessearch.py":
+                    from src.recentchangessearch import main as recentchanges_main
+                    from src.recentchangessearchparser import build_subparser
                     recent_args = build_subparser(script)
-                    sys.exit(entry(*recent_args))
+                    sys.exit(recentchanges_main(*recent_args))
                 elif script == "findfile.py":
-                    sys.exit(entry(args))
+                    from src.findfile import main_entry as findfile_main
+                    sys.exit(findfile_main(args))
                 elif script == "import":
-                    return entry(args)
+                    from src.gpgkeymanagement import import_key
+                    return import_key(args)
                 elif script == "watchdog_linux.py":
-                    sys.exit(entry(*args[1:]))
+                    from scripts.watchdog_linux import main as watchdog_main
+                    sys.exit(watchdog_main(*args[1:]))
 
             elif script == "run":
 
+                from src.qtfunctions import kill_process
+                from src.qtfunctions import load_file_manager
+                from src.qtfunctions import load_konsole
+                from src.qtfunctions import set_clock
+                from src.rntchangesfunctions import display
+
                 if cmd == "filemanager":
                     sys.exit(load_file_manager(*args[1:]))  # lclhome, popPATH=
                 elif cmd == "terminal":
@@ -88,4 +89,5 @@ def dispatch_internal(argv):
                 elif cmd == "setclock":
                     sys.exit(set_clock(*args[1:]))
 
+    from src.rntchanges import main as rntchanges_main
     sys.exit(rntchanges_main(argv))
@@ -11,6 +11,7 @@ from pathlib import Path
 from .config import load_toml
 from .configfunctions import find_install
 from .configfunctions import get_config
+from .dbsession import open_session
 from .gpgcrypto import decr
 from .gpgcrypto import gpg_can_decrypt
 from .gpgkeymanagement import delete_gpg_keys
@@ -149,6 +150,7 @@ def search_times(cur):
 
 def main(appdata_local=None, home_dir=None, user=None, email=None, reset=None, database=None, log_fn=print):
 
+    session_ttl = 0
     if not database:
 
         if not appdata_local:
@@ -165,6 +167,8 @@ def main(appdata_local=None, home_dir=None, user=None, email=None, reset=None, d
         if not config:
             return 1
         email = config['backend']['email']
+        compLVL = config['logs']['compLVL']
+        session_ttl = config['logs'].get('sessionTTL', 0)
 
     pst_data = Path(home_dir) / ".local" / "share" / "recentchanges"
     flth = pst_data / "flth.csv"
@@ -197,7 +201,14 @@ def main(appdata_local=None, home_dir=None, user=None, email=None, reset=None, d
                 if not gpg_can_decrypt(user, dbtarget):
                     return 1
                 dbopt = os.path.join(tempdir, output)
-                result, error_msg = decr(dbtarget, dbopt, user)
+                session = None
+                if session_ttl > 0:
+                    session = open_session(xdg_runtime, dbtarget, dbopt, session_ttl, email, user, compLVL)
+                if session:
+                    dbopt = session
+                    result = True
+                else:
+                    result, error_msg = decr(dbtarget, dbopt, user)
 
                 # can easily break if trying to automate fixing keys. let the user do it if wanted.
 
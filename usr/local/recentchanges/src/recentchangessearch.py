@@ -27,12 +27,18 @@ import signal
 import sys
 import tempfile
 import time
+from contextlib import ExitStack
 from datetime import datetime, timedelta
 from . import processha
+from . import workerpool
 from .config import load_toml
 from .configfunctions import check_config
 from .configfunctions import find_install
 from .configfunctions import get_config
+from .dbsession import discard_db
+from .dbsession import mark_session
+from .dbsession import prefetch_db
+from .dirwalkerfunctions import decr_cache
 from .dirwalkerfunctions import get_base_folders
 from .dirwalkerfunctions import get_relavant_mounts
 from .dirwalkerfunctions import MOUNT_FOLDERS
@@ -56,13 +62,14 @@ from .rntchangesfunctions import clear_logs
 from .rntchangesfunctions import copy_files
 from .rntchangesfunctions import filter_lines_from_list
 from .rntchangesfunctions import filter_output
-from .rntchangesfunctions import find_files
 from .rntchangesfunctions import find_scan
+from .rntchangesfunctions import find_stream
 from .rntchangesfunctions import get_runtime_exclude_list
 from .rntchangesfunctions import hsearch
 from .rntchangesfunctions import logic
 from .rntchangesfunctions import name_of
 from .rntchangesfunctions import porteus_linux_check
+from .rntchangesfunctions import pruned_scan
 from .rntchangesfunctions import removefile
 from .rntchangesfunctions import time_convert
 
@@ -99,6 +106,12 @@ def sighandle(signum, frame):
 
 
 def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None,  dtype=None, dbopt=None, cache_s=None, post_OP=False, gnupg_home=None):
+    # process_lines and hanly_parallel borrow one worker pool for the whole search
+    with workerpool.worker_pool():
+        return run_search(argone, argtwo, usr, pwrd, argf, method, iqt, drive, dtype, dbopt, cache_s, post_OP, gnupg_home)
+
+
+def run_search(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None,  dtype=None, dbopt=None, cache_s=None, post_OP=False, gnupg_home=None):
 
     # has_tty = sys.stdin.isatty() and sys.stderr.isatty()
     # if has_tty:
@@ -156,12 +169,18 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
     checksum = config['diagnostics']['checkSUM']
     checkMETHOD = config['diagnostics']['checkMETHOD']
     cdiag = config['diagnostics']['cdiag']
+    sampleSIZE = config['diagnostics'].get('sampleSIZE', 0)
+    sampleWINDOWS = config['diagnostics'].get('sampleWINDOWS', 64)
+    habatch = config['diagnostics'].get('habatch', True)
     suppress_browser = config['diagnostics']['supbrw']
     supbrwLIST = config['diagnostics']['supbrwLIST']
     suppress = config['diagnostics']['suppress']
     postop = config['diagnostics']['postop']
+    postopRESTAT = config['diagnostics'].get('postopRESTAT', False)
     ps = config['shield']['proteusSHIELD']  # proteus shield
     compLVL = config['logs']['compLVL']
+    segLIMIT = config['logs'].get('segLIMIT', 20)
+    sessionTTL = config['logs'].get('sessionTTL', 0)
     moduleNAME = config['paths']['moduleNAME']
     archivesrh = config['search']['archivesrh']
     basedir = config['search']['drive']  # main drive for search
@@ -173,6 +192,9 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
     _time = config['search']['_time']
     driveTYPE_frm = config['search']['driveTYPE']
     python = config['search']['python']
+    walkTHREADS = config['search'].get('walkTHREADS', 0)
+    pruneSEARCH = config['search'].get('pruneSEARCH', False)
+    pruneROOTS = user_path(config['search'].get('pruneROOTS', []), usr)
     # email_name = config['backend']['name']
     # dspEDITOR = config['display']['dspEDITOR']
     # if dspEDITOR:
@@ -247,7 +269,12 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
         'checkMETHOD': checkMETHOD,
         'ps': ps,
         'cdiag': cdiag,
-        'compLVL': compLVL
+        'compLVL': compLVL,
+        'segLIMIT': segLIMIT,
+        'sampleSIZE': sampleSIZE,
+        'sampleWINDOWS': sampleWINDOWS,
+        'habatch': habatch,
+        'walkTHREADS': walkTHREADS
     }
 
     # end init
@@ -272,9 +299,9 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
     rout = []  # actions from ha
 
     cfr = {}  # cache dict
-    recentnul = b""  # filepaths `recentchanges`
+    recentnul = bytearray()  # filepaths `recentchanges`
 
-    start = end = cstart = cend = ag = 0
+    start = end = cstart = cend = ag = db_time = 0
     validrlt = tmn = filename = search_time = search_paths = None
 
     diffrlt = False
@@ -357,7 +384,7 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
 
     tempd = tempfile.gettempdir()
 
-    with tempfile.TemporaryDirectory(dir=tempd) as tempwork:
+    with tempfile.TemporaryDirectory(dir=tempd) as tempwork, ExitStack() as cleanup:
 
         scr = os.path.join(tempwork, "scr")  # feedback
         cerr = os.path.join(tempwork, "cerr")  # priority
@@ -455,11 +482,35 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
 
         # Main search
 
+        # decrypt the database or open the session copy on a thread while the search walks and hashes
+        db_ready = None
+        if not iqt and os.path.isfile(dbtarget):
+            db_ready = prefetch_db(xdg_runtime, dbtarget, dbopt, sessionTTL, email, usr, compLVL)
+            # a copy pst_srg didnt take is removed however the search ends. sys.exit, an error or ctrl-c
+            cleanup.callback(lambda: discard_db(db_ready))
+
         current_time = datetime.now()
         search_start_dt = (current_time - timedelta(minutes=search_time))
         logger = logging.getLogger("FSEARCH")
 
-        if python:
+        prune_cache = None
+        if pruneSEARCH:
+            prune_cache = decr_cache(cache_s, user=usr)
+            if not prune_cache:
+                print("No directory cache for a pruned search. build IDX or find downloads makes one. running the full search")
+
+        if prune_cache:
+            init = True
+            prune_roots = [os.path.join(basedir, d) for d in pruneROOTS]
+
+            recent, complete_1, end, cstart = pruned_scan(
+                recent, complete_1, init, cfr, search_start_dt, user_setting, logging_values,
+                end, cstart, prune_cache, exclDIRS_fullpath, prune_roots, iqt=iqt, logger=logger,
+                strt=proval, endp=endval
+            )
+            prune_cache = None
+
+        elif python:
             init = True
 
             recent, complete_1, end, cstart = find_scan(
@@ -470,7 +521,6 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
 
         else:
 
-            records = []
             mmin = ["-mmin", f"-{search_time}"]
             cmin = ["-cmin", f"-{search_time}"]
             current_time = datetime.now()
@@ -481,32 +531,37 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
                 search_paths = 'Running command:' + ' '.join(["find"] + search_list + ["("] + mmin + ["-o"] + cmin + [")"] + TAIL)
 
             init = True
-            # def find_files(find_command, search_paths, recentnul, feedback):
-            records, recentnul = find_files(find_command, search_paths, records, recentnul, feedback)
-            _end = time.time()
+            walk_end = []
 
-            if mounts:
+            # records go to process_lines as find prints them. the mounts find widens its window by however long
+            # the first one took so it only starts once that is done
+            def find_records(find_command):
+                yield from find_stream(find_command, search_paths, recentnul, feedback)
+                _end = time.time()
 
-                _start = current_time.timestamp()
-                find_offset = time_convert(_end - _start, 60, 2)
-                check_stop(stopf)
+                if mounts:
 
-                mmin = ["-mmin", f"-{search_time + find_offset:.2f}"]
-                cmin = ["-cmin", f"-{search_time + find_offset:.2f}"]
+                    _start = current_time.timestamp()
+                    find_offset = time_convert(_end - _start, 60, 2)
+                    check_stop(stopf)
 
-                find_command = ["find", *mounts] + ["("] + mmin + ["-o"] + cmin + [")"] + TAIL
+                    mmin = ["-mmin", f"-{search_time + find_offset:.2f}"]
+                    cmin = ["-cmin", f"-{search_time + find_offset:.2f}"]
 
-                records, recentnul = find_files(find_command, search_paths, records, recentnul, feedback)
-            end = time.time()
+                    find_command = ["find", *mounts] + ["("] + mmin + ["-o"] + cmin + [")"] + TAIL
+
+                    yield from find_stream(find_command, search_paths, recentnul, feedback)
+                walk_end.append(time.time())
 
             proval += 10
             endval += 30
 
             if init and checksum:
-                cstart = time.time()
                 cprint.cyan("Running checksum")
 
-            recent, complete_1 = process_lines(process_line, records, search_start_dt, 'FSEARCH', user_setting, logging_values, cfr, iqt=iqt, strt=proval, endp=endval)
+            recent, complete_1 = process_lines(process_line, find_records(find_command), search_start_dt, 'FSEARCH', user_setting, logging_values, cfr, iqt=iqt, strt=proval, endp=endval)
+            # hashing overlaps the walk. only what was left after find finished counts as checksum time
+            end = cstart = walk_end[0] if walk_end else time.time()
 
         cend = time.time()
 
@@ -515,6 +570,7 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
         # end Main search
 
         if recent is None:
+            discard_db(db_ready)
             sys.exit(1)
 
         check_stop(stopf)
@@ -523,6 +579,7 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
             # change_perm(cache_f, uid, gid)
 
         if not recent:
+            discard_db(db_ready)
             cprint.cyan("No new files found")
             if iqt:
                 print("Progress: 100.00%")
@@ -739,6 +796,20 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
             else:
                 dcr = False
 
+            # prefetched database. back to back command line searches reuse the decrypted copy in xdg_runtime
+            session = decrypted = False
+            if db_ready is not None:
+                db_path, session, err, db_time = db_ready.result()
+                db_ready = None
+                if not db_path:
+                    print(err)
+                    return 1
+                decrypted = True
+                if session:
+                    mark_session(xdg_runtime, dbtarget, True)
+                    dbopt = db_path
+                    dcr = True
+
             # pass some analytics into pstsrg
             el = end - start
             el2 = cend - cstart
@@ -748,8 +819,10 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
 
             dbopt, data = pst_srg(
                 dbopt, dbtarget, sortcomplete, complete, rout, created, cachermPATTERNS, user_setting, logging_values,
-                total_time, total_files, dcr=dcr, iqt=iqt, strt=proval, endp=endval
+                total_time, total_files, dcr=dcr, iqt=iqt, strt=proval, endp=endval, decrypted=decrypted
             )
+            if session and dbopt not in (None, "encr_error", "db_error"):
+                mark_session(xdg_runtime, dbtarget, False)
             # dbopt return from pst_srg is either path, encr_error, new_profile or None
             proval = endval
             endval = 100
@@ -761,7 +834,7 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
             #     if os.path.isfile(dbtarget):
             #         change_perm(dbtarget, uid, gid, 0o644)
 
-            csum, unique_files, lifetime_throughput, ha_total_time, logger_total_time = data
+            csum, unique_files, lifetime_throughput, ha_total_time, logger_total_time, ha_lookup_time = data
 
             # for benchmarking pstsrg returned the time for multiprocessing ect. This can help verify if any changes or new designs improve performance and also
             # where the bulk of the work is. This data isnt stored so it is essentially free and adds no complexity.
@@ -770,6 +843,8 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
                     valid_data = True
                     if ha_total_time:
                         print("Hanly total time:", format(ha_total_time, ".3f"), "seconds", "logger:", format(logger_total_time, ".4f"), "seconds")
+                        # summed across workers. compare against habatch = false for the per record lookups
+                        print("Hanly lookups:", format(ha_lookup_time, ".4f"), "seconds", "(batched)" if habatch else "(per record)")
 
             # Diff output to user
             processha.processha(rout, absent, diff_file, cerr, flsrh, argf, srttime, escaped_user, supbrwLIST, suppress_browser, suppress)
@@ -785,7 +860,7 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
                 # run_doctrine(appdata_local, usrDIR, sortcomplete, tmpopt, logf, rout, toml_file, escaped_user, method, fmt)
                 # cprint.green(f"File doctrine.tsv created {usrDIR}/{tsv_doc}")
                 # change_perm(outpath, uid, gid)
-                if build_tsv(sortcomplete, tmpopt, logf, rout, created, escaped_user, outpath, method, fmt):
+                if build_tsv(sortcomplete, tmpopt, logf, rout, created, escaped_user, outpath, method, fmt, restat=postopRESTAT, drive_type=driveTYPE):
                     change_perm(outpath, uid, gid)
                     cprint.green(f"File doctrine.tsv created {usrDIR}/{tsv_doc}")
                 # elif not iqt:
@@ -867,6 +942,8 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
 
             change_perm(flth, uid, gid)
 
+        discard_db(db_ready)  # nothing was left to store
+
         try:
 
             logic(syschg, nodiff, diffrlt, validrlt, thetime, argone, argf, result_output, filename, flsrh, method)  # feedback
@@ -880,6 +957,18 @@ def main(argone, argtwo, usr, pwrd, argf="bnk", method="", iqt=False, drive=None
             print(f'Search took {el:.3f} seconds')
             if checksum:
                 print(f'Checksum took {el2:.3f} seconds')
+            if db_time:
+                print(f'Database ready in {db_time:.3f} seconds alongside the search')
+            pool = workerpool.ACTIVE
+            if pool and pool.startup is not None:
+                print(f'Worker pool started in {pool.startup:.3f} seconds. {pool.workers} workers {pool.stages} stages')
+            rates = dict(pool.rates) if pool else {}
+            if "walk" not in rates and "hash" in rates and el:
+                rates["walk"] = (rates["hash"][0], el)  # collected before hashing. the walk is the search time
+            for stage in ("walk", "hash", "hanly"):
+                if stage in rates:
+                    files, seconds = rates[stage]
+                    print(f'{stage.capitalize()}: {files} files in {seconds:.3f} seconds {files / seconds:.0f} files/s')
             print()
 
             print("Files scanned:", total_files)
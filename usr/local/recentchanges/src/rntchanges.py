@@ -29,8 +29,7 @@
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from src.query import main as query_main
-from src.recentchangessearch import main as recentchanges_main
+# query and search are imported once the argument picks one. a search doesnt load the query module and the reverse
 
 
 def main(argv):
@@ -66,9 +65,12 @@ def main(argv):
 
     if argone == "query" or argone == "reset":
         reset = argone == "reset"
+        from src.query import main as query_main
         return query_main(user=usr, reset=reset)
 
-    elif argone == "search":  # recentchanges search
+    from src.recentchangessearch import main as recentchanges_main
+
+    if argone == "search":  # recentchanges search
         thetime = argtwo
         return recentchanges_main(argone, thetime, usr, pwd, argf, method)
 
@@ -3,21 +3,25 @@ import csv
 import glob
 import importlib.util
 import logging
-import magic
 import os
-import re
 import shlex
 import shutil
 import subprocess
 import sys
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from .config import update_toml_values
 from .configfunctions import find_install
 from .dirwalkerfunctions import files_search
+from .dirwalkerparallel import walk_threads
+from .dirwalkerpruned import pruned_search
 from .fsearchparallel import process_lines
 from .fsearchscan import process_scan
+from .patternset import PatternSet
 from .pyfunctions import cprint
 from .pyfunctions import suppress_list
 from .pyfunctions import unescf_py
@@ -262,7 +266,7 @@ def resolve_editor(dspEDITOR, dspPATH, toml_file):
 
 
 def is_excluded(web_list, file_line):
-    return any(re.search(pat, file_line) for pat in web_list)
+    return web_list.matches(file_line)
 
 
 def is_supressed(web_list, file_line, flag, suppress_browser, suppress):
@@ -350,15 +354,24 @@ def find_scan(recent, complete, init, cfr, search_start_dt, user_setting, loggin
     basedir = user_setting['basedir']
     feedback = user_setting['feedback']
 
-    # normal execution
+    # normal execution. on a ssd the threads stream records to process_lines which hashes while the walk goes on
 
-    records, _ = files_search(basedir, search_start_dt, feedback, exclDIRS, exclDIRS_fullpath=exclDIRS_fullpath, iqt=iqt, logger=logger, strt=strt, endp=endp)
+    threads = user_setting.get('walkTHREADS') or walk_threads(user_setting['driveTYPE'])
+    walk_end = []
+
+    def scan_records(records):
+        yield from records
+        walk_end.append(time.time())
+
+    records, _ = files_search(basedir, search_start_dt, feedback, exclDIRS, exclDIRS_fullpath=exclDIRS_fullpath, iqt=iqt, logger=logger, strt=strt, endp=endp, threads=threads, stream=True)
     strt += 15
     end = time.time()
 
     if records is None:
         return None, [], end, cstart
     endp += 30
+    if not isinstance(records, list):
+        records = scan_records(records)
 
     if init and user_setting['checksum']:
         out_text = "Running checksum."
@@ -368,122 +381,109 @@ def find_scan(recent, complete, init, cfr, search_start_dt, user_setting, loggin
         cstart = time.time()
 
     recent, complete = process_lines(process_scan, records, search_start_dt, 'FSEARCH', user_setting, logging_values, cfr, iqt, strt, endp)
+    if walk_end:
+        end = walk_end[0]
 
     return recent, complete, end, cstart
 
 
-# One search ctime > mtime for downloaded, copied or preserved metadata files. cmin. Main search for mtime newer than mmin.
+def pruned_scan(recent, complete, init, cfr, search_start_dt, user_setting, logging_values, end, cstart, cache, exclDIRS_fullpath, prune_roots, iqt=False, logger=None, strt=20, endp=60):
+    """ find_scan over only the directories the directory cache says changed plus prune_roots """
 
-def find_files(find_command, search_paths, records, recentnul, feedback):
+    basedir = user_setting['basedir']
 
-    if search_paths:
-        print(search_paths)
-    else:
-        print('Running command:', shlex.join(find_command))  # ' '.join(find_command))
+    if iqt:
+        print(f"Progress: {strt}%", flush=True)
+    records, counts = pruned_search(basedir, search_start_dt, cache, exclDIRS_fullpath, prune_roots, logger)
+    end = time.time()
+    strt += 15
+    endp += 30
 
-    # import shlex
-    # cmd = shlex.join(find_command)
+    if user_setting['feedback']:
+        for record in records:
+            print(record[-1])
+    if user_setting['analytics']:
+        print(f"Pruned search skipped {counts['skipped']} of {counts['dirs']} cached directories. scanned {counts['scanned']} ({counts['new']} new)")
 
-    # if secondary:
-    #     cmd += " ; " + shlex.join(secondary)
+    if init and user_setting['checksum']:
+        out_text = "Running checksum."
+        if user_setting['feedback']:
+            out_text = "\n" + out_text
+        cprint.cyan(out_text)
+        cstart = time.time()
 
-    # proc = subprocess.Popen(
-    #     cmd,
-    #     shell=True,
-    #     stdout=subprocess.PIPE,
-    #     stderr=subprocess.PIPE
-    # )
+    recent, complete = process_lines(process_scan, records, search_start_dt, 'FSEARCH', user_setting, logging_values, cfr, iqt, strt, endp)
 
-    try:
+    return recent, complete, end, cstart
 
-        buffer = b''
-        proc = subprocess.Popen(find_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)  # stderr=subprocess.DEVNULL  # original
 
-        # output, err = proc.communicate()  # original if buffering
+# One search ctime > mtime for downloaded, copied or preserved metadata files. cmin. Main search for mtime newer than mmin.
 
-        # if proc.returncode not in (0, 1):  # original if buffering
-        #     stderr_str = err.decode("utf-8")
-        #     print(stderr_str)
-        #     print("Find command failed, unable to continue. Quitting.")
-        #     sys.exit(1)
-        while True:
-            if proc.stdout is None:
-                break
-            chunk = proc.stdout.read(8192)
-            if not chunk:
-                break
-            buffer += chunk
-            while b'\0' in buffer:
-                part, buffer = buffer.split(b'\0', 1)
-                if part.strip():
-
-                    line = part.decode("utf-8", errors="replace")
-                    fields = line.split(maxsplit=10)
-                    if len(fields) >= 11:
-
-                        file_path = fields[10]
-                        recentnul += (file_path.encode() + b'\0')  # copy file list `recentchanges` null byte
-                        if feedback:  # scrolling terminal look       alternative output
-                            print(fields[10], flush=True)
-                        # escaped_entry = " ".join(fields)
-                        records.append(fields)
-        if buffer.strip():
-            try:
-                line = buffer.decode('utf-8', errors='replace')
-                fields = line.split(maxsplit=10)
-                if len(fields) >= 11:
-                    records.append(fields)
+def find_record(part):
+    """ one -printf record. 11 fields the last being the path which can have spaces """
+    fields = part.decode("utf-8", errors="replace").split(maxsplit=10)
+    if len(fields) < 11:
+        return None
+    return tuple(fields)
 
-            except Exception as e:
-                print(f"fault in trailing buffer ignored. {type(e).__name__} {e}")
-                pass
 
-        if proc.stdout is not None:
-            proc.stdout.close()
-        proc.wait()
+def find_stream(find_command, search_paths, recentnul, feedback, chunk_size=65536):
+    """ run find and yield records as they are printed so hashing can start while find is still walking.
+    each read is split on \\0 in one pass and the partial record at the end is carried to the next read.
+    recentnul is a bytearray and gets the \\0 delimited paths """
 
-        if proc.returncode not in (0, 1):
-            if proc.stderr is not None:
+    if search_paths:
+        print(search_paths)
+    else:
+        print('Running command:', shlex.join(find_command))  # ' '.join(find_command))
+
+    proc = None
+    try:
+        with tempfile.TemporaryFile() as err:  # a pipe could fill on permission errors and stall find
+            proc = subprocess.Popen(find_command, stdout=subprocess.PIPE, stderr=err)
+
+            tail = b''
+            while True:
+                chunk = proc.stdout.read1(chunk_size)
+                if not chunk:
+                    break
+                parts = (tail + chunk).split(b'\0')
+                tail = parts.pop()
+                for part in parts:
+                    record = find_record(part)
+                    if record is None:
+                        continue
+                    recentnul.extend(record[10].encode() + b'\0')  # copy file list `recentchanges` null byte
+                    if feedback:  # scrolling terminal look       alternative output
+                        print(record[10], flush=True)
+                    yield record
+            if tail.strip():
+                record = find_record(tail)
+                if record is not None:
+                    yield record
+
+            proc.stdout.close()
+            proc.wait()
 
-                for raw in iter(proc.stderr.readline, b''):
+            if proc.returncode not in (0, 1):
+                err.seek(0)
+                for raw in err:
                     text = raw.decode("utf-8", errors="replace").strip()
                     if text:
                         print(text)
-            print("Find command failed, unable to continue. Quitting.")
-            sys.exit(1)
+                print("Find command failed, unable to continue. Quitting.")
+                sys.exit(1)
 
     except (FileNotFoundError, PermissionError) as e:
-        print(f"Error running find in find_files {e}")
+        print(f"Error running find in find_stream {e}")
         sys.exit(1)
     except Exception as e:
-        print(f"Unexpected error running find ommand: {find_command} \nfind_files func: {type(e).__name__} {e}")
+        print(f"Unexpected error running find ommand: {find_command} \nfind_stream func: {type(e).__name__} {e}")
         sys.exit(1)
-
-    # file_entries = [entry.decode('utf-8', errors='backslashreplace') for entry in output.split(b'\0') if entry]  # original if buffering
-
-    # using escf_py and unesc_py for bash support otherwise can use: filename.encode('unicode_escape').decode('ascii') , codecs.decode(escaped, 'unicode_escape')
-    # using escf_py and unesc_py for bash
-    # filename.encode('unicode_escape').decode('ascii') \n -> \\n \t -> \\t \r -> \\r  \ -> \\  é -> \xe9 not  $ " '
-    # codecs.decode(escaped.encode('ascii'), 'unicode_escape')
-    # json.dumps(filename)    " -> \"   \n -> \\n   \ -> \\   \t -> \\t  \r \\r
-    # json.loads(line)
-
-    # original if buffering
-    # records = []
-    # for entry in file_entries:
-    #     fields = entry.split(maxsplit=10)
-    #     if len(fields) >= 11:
-
-#             file_path = fields[10]
-#             recentnul += (file_path.encode() + b'\0')  # copy file list `recentchanges` null byte
-#             if user_setting['feedback']:  # scrolling terminal look       alternative output
-#                 print(fields[10], flush=True)
-
-    #         # escaped_entry = " ".join(fields)
-    #         records.append(fields)
-    # end original
-
-    return records, recentnul
+    finally:
+        if proc is not None and proc.poll() is None:  # consumer stopped early
+            proc.kill()
+            proc.wait()
 
 
 # recentchanges search
@@ -585,13 +585,18 @@ def check_utility(zipPATH=None, downloads=None, popPATH=None, alarm_sound=None,
     return res
 
 
+@lru_cache(maxsize=4)
+def filter_matcher(patterns):
+    return PatternSet(regex=patterns)
+
+
 def filter_lines_from_list(lines, escaped_user, idx=1):
     if user_filter is None:
         print("Error unable to load filter filter.py")
         return None
     user_filter._filter = user_path(user_filter._filter, escaped_user)
 
-    regexes = [re.compile(p) for p in user_filter._filter]
+    matcher = filter_matcher(tuple(user_filter._filter))
     # regexes = [re.compile(p.replace("{{user}}", escaped_user)) for p in user_filter._filter]
 
     # filtered = [
@@ -606,7 +611,7 @@ def filter_lines_from_list(lines, escaped_user, idx=1):
         if not value:
             continue
 
-        if not any(r.search(value) for r in regexes):
+        if not matcher.matches(value):
             filtered.append(line)
     return filtered
 
@@ -825,7 +830,31 @@ def tsv_sort_by(row, is_link=False):
 # time from the download or copy which could be from 2021 for example. Also by checking the database a copy
 # can also be detected by having the same checksum and a diffrent filename or inode. Sorted by above.
 #
-def build_tsv(sortcomplete, tmpopt, logf, rout, created, escaped_user, outpath, method, fmt):
+def stat_paths(paths, drive_type=None):
+    """ os.stat of each path on a thread pool sized for the drive. None where it failed """
+    def stat(path):
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=walk_threads(drive_type)) as executor:
+        return list(executor.map(stat, paths))
+
+
+def mime_from_file(fpath):
+    """ libmagic mime of a file or "" """
+    import magic  # only for the records without one
+    try:
+        return magic.from_file(fpath, mime=True)  # mimetypes.guess_type(fpath)[0] or "" less detailed
+    except Exception:
+        return ""
+
+
+def build_tsv(sortcomplete, tmpopt, logf, rout, created, escaped_user, outpath, method, fmt, restat=False, drive_type=None):
+    """ file doctrine from the search records. the mime and size are the ones the search hashed with. libmagic only
+        types the files the search didnt hash. restat stats every file again on a thread pool for the current size and
+        the Statable column which is left out without it """
 
     if method != "rnt":
         if logf is tmpopt:
@@ -848,46 +877,44 @@ def build_tsv(sortcomplete, tmpopt, logf, rout, created, escaped_user, outpath,
                 # full_path = ' '.join(parts[5:])
                 # full_path = unescf_py(parts[5])
                 if action == "Copy":
-                    full_path = parts[5:]
+                    full_path = parts[5]
                     copy_paths.add(full_path)
                 elif action == "Created":
-                    full_path = parts[5:]
+                    full_path = parts[5]
                     created_paths.add(full_path)
 
+        sortcomplete = [entry for entry in sortcomplete if len(entry) >= 19 and entry[1]]
+        stats = stat_paths([entry[1] for entry in sortcomplete], drive_type) if restat else None
+
         is_link = any(len(row) > 9 and row[9] == 'y' for row in sortcomplete)
-        header = "Datetime\tFile\tSize(kb)\tType\tSymlink" + ("\tTarget" if is_link else "") + "\tChanged\tcam\tAccessed\tOwner\tStatable\tCopy\tCreated"
+        header = "Datetime\tFile\tSize(kb)\tType\tSymlink" + ("\tTarget" if is_link else "") + "\tChanged\tcam\tAccessed\tOwner" + ("\tStatable" if restat else "") + "\tCopy\tCreated"
 
-        for entry in sortcomplete:
-            if len(entry) < 19:
-                continue
+        for i, entry in enumerate(sortcomplete):
 
-            is_statable = st = None
-            mtyp = is_copy = is_created = ""
+            is_copy = is_created = ""
 
             dt = entry[0]
             fpath = entry[1]
             label = entry[18]
 
-            if not fpath:
-                continue
-            is_statable = False
-            try:
-                st = Path(fpath).stat()
-                mtyp = magic.from_file(fpath, mime=True)  # mimetypes.guess_type(fpath)[0] or "" less detailed
-                is_statable = True
-            except Exception:
-                pass
+            mtyp = entry[7] or ""  # from the header the search read
+            if not mtyp:
+                # not hashed. checksum off, empty or a symlink
+                mtyp = mime_from_file(fpath)
+            st = stats[i] if stats else None
 
             sym_frm = entry[9]
             sym = sym_frm if sym_frm is not None else ""
-            stat_bool = "y" if is_statable else ""  # originally was "" as statable but could be confusing
+            stat_bool = "y" if st else ""  # originally was "" as statable but could be confusing
 
             onr = entry[10]
-            if is_statable:
+            if st:
                 sz = round(st.st_size / 1024, 2)
                 # md = epoch_to_date(st.st_mtime)  # epoch_to_str(st.st_mtime)
+            elif isinstance(entry[8], (int, float)):
+                sz = round(entry[8] / 1024, 2)
             else:
-                sz = entry[8]
+                sz = entry[8] or ""
                 # md = dt
 
             ae = entry[4]
@@ -915,7 +942,10 @@ def build_tsv(sortcomplete, tmpopt, logf, rout, created, escaped_user, outpath,
                 f"{cam or ''}\t"
                 f"{ae or ''}\t"
                 f"{onr}\t"
-                f"{stat_bool}\t"
+            )
+            if restat:  # only known when the files were stat again
+                row += f"{stat_bool}\t"
+            row += (
                 f"{is_copy}\t"
                 f"{is_created}\t"
             )
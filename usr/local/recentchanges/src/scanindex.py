@@ -1,12 +1,36 @@
 import os
+import random
 from . import logs
 from .logs import emit_log
 from .dirwalkerfunctions import meta_sys
+from .pyfunctions import epoch_to_str
 
+# scan tiers
+TIER_STAT = 0  # hash only when lstat differs from the sys row
+TIER_SAMPLE = 1  # tier 0 plus a random sample of the unchanged files each scan
+TIER_FULL = 2  # rehash every file
 
-def scan_index(chunk, id_to_mime, is_sym, i, num_chunks, show_progress=False, algo='md5', strt=0, endp=100):
+
+def stat_unchanged(file_path, record):
+    """ size inode mtime and ctime of a regular file against its latest sys row. rows from before mtime_us compare mtime
+        to the second """
+    st = os.lstat(file_path)
+    if st.st_size != record[8] or st.st_ino != record[3]:
+        return False
+    if epoch_to_str(st.st_ctime) != record[2]:
+        return False
+    mtime_us = record[18] if len(record) > 18 else None
+    if mtime_us is not None:
+        return st.st_mtime_ns // 1_000 == mtime_us
+    return epoch_to_str(st.st_mtime) == record[0]
+
+
+def scan_index(chunk, id_to_mime, is_sym, i, num_chunks, show_progress=False, algo='md5', strt=0, endp=100, tier=TIER_FULL, sample=0):
     # the checksum could change on live system checksum is verified with retries
+    # tier 0 and 1 skip meta_sys for regular files whose stat matches. a symlink or a row without a hash always goes through
+    # sample is the percent of unchanged files tier 1 hashes anyway so a spoofed mtime is still caught over a few scans
     c = r = 0
+    unchanged = sampled = checked = 0
     # t_fold = 0
     dbit = False
 
@@ -61,6 +85,21 @@ def scan_index(chunk, id_to_mime, is_sym, i, num_chunks, show_progress=False, al
                 previous_count = record[17]
                 if not previous_symlink and not previous_md5:
                     emit_log("DEBUG", f"Previous hash was missing attempting to run checksum. file:  {file_path}", logs.WORKER_LOG_Q)
+                    checked += 1
+                elif tier != TIER_FULL and not previous_symlink:
+                    try:
+                        same = stat_unchanged(file_path, record)
+                    except OSError:
+                        same = False  # meta_sys sorts out gone or unreadable
+                    if same:
+                        if tier == TIER_STAT or random.random() * 100 >= sample:
+                            unchanged += 1
+                            continue
+                        sampled += 1
+                    else:
+                        checked += 1
+                else:
+                    checked += 1
                 rlt, status = meta_sys(file_path, previous_md5, previous_entropy, previous_mime_id, previous_symlink, previous_target, previous_count,
                                        is_sym, sys_data, link_data, ent_data, mime_data, id_to_mime, algo, logs.WORKER_LOG_Q)  # append meta data to sys_data
                 if not rlt:
@@ -87,4 +126,4 @@ def scan_index(chunk, id_to_mime, is_sym, i, num_chunks, show_progress=False, al
 
     if dbit and current_step <= len(steps) - 1:
         emit_log("prog", r, logs.WORKER_LOG_Q)
-    return sys_data, link_data, ent_data, mime_data, nsf_records, log_entries, x, y, c
+    return sys_data, link_data, ent_data, mime_data, nsf_records, log_entries, x, y, c, (unchanged, sampled, checked)
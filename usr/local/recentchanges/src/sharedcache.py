@@ -0,0 +1,163 @@
+# read only cache shared with pool workers through a mmap'd file in /dev/shm                10/18/2026
+#
+# ctimecache and systimeche were passed to every chunk as a dict so each submit pickled the whole cache.
+# SharedCache writes the cache once as sorted key hashes, record offsets and marshal'd values and pickles as
+# just its path. workers mmap the file and binary search it. only .get is needed by the workers. a LazyCache from
+# cachefmt is shared as its RCCF dump instead (SharedColumns) so the parent never decodes a root to share it
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from . import cachefmt
+
+
+HEADER = struct.Struct("Q")  # record count
+KEYLEN = struct.Struct("I")
+
+
+def key_hash(key):
+    # blake2b not hash(). str hashes are randomized per process
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8", "surrogateescape"), digest_size=8).digest(), "little")
+
+
+class SharedCache:
+    """ [count][hashes sorted][offsets count+1][keylen key value ...] """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ)
+        self._n = HEADER.unpack_from(self._mm, 0)[0]
+        view = memoryview(self._mm)
+        hend = HEADER.size + 8 * self._n
+        self._hashes = view[HEADER.size:hend].cast("Q")
+        self._offsets = view[hend:hend + 8 * (self._n + 1)].cast("Q")
+
+    @classmethod
+    def build(cls, mapping):
+        """ None if the cache has values marshal cant handle. the caller keeps using the dict """
+        keys = sorted((key_hash(key), key) for key in mapping)
+        n = len(keys)
+        pos = HEADER.size + 8 * n + 8 * (n + 1)
+        offsets = array("Q")
+        records = []
+        try:
+            for _, key in keys:
+                kb = key.encode("utf-8", "surrogateescape")
+                record = KEYLEN.pack(len(kb)) + kb + marshal.dumps(mapping[key])
+                offsets.append(pos)
+                pos += len(record)
+                records.append(record)
+        except ValueError:
+            return None
+        offsets.append(pos)
+
+        fd, path = tempfile.mkstemp(prefix="rntcache_", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER.pack(n))
+                f.write(array("Q", (h for h, _ in keys)).tobytes())
+                f.write(offsets.tobytes())
+                f.writelines(records)
+            return cls(path)
+        except OSError:
+            os.remove(path)
+            raise
+
+    def __reduce__(self):
+        return (SharedCache, (self.path,))
+
+    def __len__(self):
+        return self._n
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        h = key_hash(key)
+        kb = key.encode("utf-8", "surrogateescape")
+        i = bisect_left(self._hashes, h)
+        while i < self._n and self._hashes[i] == h:
+            start = self._offsets[i]
+            kstart = start + KEYLEN.size
+            kend = kstart + KEYLEN.unpack_from(self._mm, start)[0]
+            if self._mm[kstart:kend] == kb:
+                return marshal.loads(self._mm[kend:self._offsets[i + 1]])
+            i += 1
+        return default
+
+    def release(self):
+        """ parent only once the pool is done. workers just exit """
+        self._hashes.release()
+        self._offsets.release()
+        self._mm.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class SharedColumns(SharedCache):
+    """ a LazyCache as its dump. unchanged roots are copied across in runs without being decoded and a worker loads
+        the columns over the mapping on its first .get """
+
+    def __init__(self, path):
+        self.path = path
+        self._mm = None
+        self._cache = None
+
+    @classmethod
+    def build(cls, cache):
+        fd, path = tempfile.mkstemp(prefix="rntcache_", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(cachefmt.dump(cache.kind, cache))
+            return cls(path)
+        except OSError:
+            os.remove(path)
+            raise
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ)
+        self._cache = cachefmt.load(self._mm)
+        return self._cache
+
+    def __reduce__(self):
+        return (SharedColumns, (self.path,))
+
+    def __len__(self):
+        return len(self._cache if self._cache is not None else self._load())
+
+    def get(self, key, default=None):
+        cache = self._cache if self._cache is not None else self._load()
+        return cache.get(key, default)
+
+    def release(self):
+        self._cache = None
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # a value still holds a view. the mapping goes with it
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def share_cache(cache):
+    """ SharedCache for a non empty dict, SharedColumns for a LazyCache else the cache as is """
+    if not isinstance(cache, Mapping) or not cache:
+        return cache
+    try:
+        if isinstance(cache, cachefmt.LazyCache):
+            return SharedColumns.build(cache)
+        return SharedCache.build(cache) or cache
+    except OSError:
+        return cache
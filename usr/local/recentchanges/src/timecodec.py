@@ -0,0 +1,77 @@
+# timestamp codec shared by fsearch, hanly, parselog and the database                         10/18/2026
+#
+# logs and sys keep timestamp changetime and accesstime as "%Y-%m-%d %H:%M:%S" local time TEXT. timestamp_wall_us and
+# changetime_wall_us are the same text as an integer: local wall clock seconds since 1970-01-01 in microseconds. they
+# order and compare exactly like the text and sqlite computes them with strftime('%s', ...) without a timezone so every
+# writer, the gui included, gets them for free.
+#
+# they are not epoch microseconds. they differ from a real epoch by the utc offset and the TEXT stays the source of
+# truth so the records still carry strings. storing true epochs would mean every writer converting at insert and a
+# one time rewrite of every row. _wall_ in the names keeps them from being compared with mtime_us, a real epoch from
+# the filesystem that is only compared with other mtime_us values
+from datetime import datetime, timedelta
+
+
+FMT = "%Y-%m-%d %H:%M:%S"
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+DAY_US = 86_400_000_000
+
+
+def wall_us(dt):
+    """ naive datetime to wall clock microseconds. None passes through """
+    if dt is None:
+        return None
+    return ((dt.toordinal() - EPOCH_ORDINAL) * 86400 + dt.hour * 3600 + dt.minute * 60 + dt.second) * 1_000_000 + dt.microsecond
+
+
+def text_dt(value):
+    """ FMT text to a datetime by slicing. strptime only for anything not shaped like FMT. None if it isnt a time """
+    if isinstance(value, datetime):
+        return value
+    if value is None:
+        return None
+    s = str(value).strip()
+    if len(s) == 19 and s[4] == "-" and s[7] == "-" and s[10] == " " and s[13] == ":" and s[16] == ":":
+        try:
+            return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]), int(s[11:13]), int(s[14:16]), int(s[17:19]))
+        except ValueError:
+            return None
+    try:
+        return datetime.strptime(s, FMT)
+    except ValueError:
+        return None
+
+
+def text_us(value):
+    """ FMT text or datetime to wall clock microseconds. ints are already converted """
+    if isinstance(value, int):
+        return value
+    return wall_us(text_dt(value))
+
+
+def us_dt(us):
+    return EPOCH + timedelta(microseconds=us) if us is not None else None
+
+
+def dt_text(dt):
+    """ format only at output """
+    return dt.strftime(FMT) if dt is not None else None
+
+
+def us_text(us):
+    return dt_text(us_dt(us))
+
+
+def epoch_us(epoch: str) -> int:
+    """ find %T@ or st_mtime text to integer epoch microseconds from the digits so nothing is lost to a float """
+    sec, dot, frac = epoch.partition(".")
+    if not dot:
+        frac = "0"
+    frac = (frac + "000000")[:6]
+    return int(sec) * 1_000_000 + int(frac)
+
+
+def sql_wall_us(column):
+    """ the sqlite expression for text_us of a TEXT column """
+    return f"CAST(strftime('%s', {column}) AS INTEGER) * 1000000"
@@ -8,7 +8,7 @@ from src.logs import write_log
 from src.fileops import calculate_checksum
 from src.fileops import set_stat
 from src.fsearchfunctions import file_owner
-from src.fsearchfunctions import normalize_timestamp
+from src.timecodec import epoch_us
 from src.inotifyfunctions import drop_pid
 from src.inotifyfunctions import process_kill
 from src.pyfunctions import ap_encode
@@ -121,7 +121,7 @@ def get_specs(action, entry, path, output_file, CACHE_F, cdir, lockfile, algo, c
     size = stat_info.st_size
 
     m_epoch_ns = stat_info.st_mtime_ns
-    mtime_us = normalize_timestamp(str(m_epoch))  # mtime_us = m_epoch_ns // 1_000_000 # truncate as opposed to round
+    mtime_us = epoch_us(str(m_epoch))  # mtime_us = m_epoch_ns // 1_000_000 # truncate as opposed to round
 
     inode = stat_info.st_ino
 
@@ -0,0 +1,210 @@
+# persistent worker pool shared by the search stages                                         10/18/2026
+#
+# process_lines, hanly_parallel, find_created, index_system and scan_system each started a ProcessPoolExecutor with its
+# own mp.Queue and logging thread so a search paid the pool start up two or three times. worker_pool opens one pool
+# for the run and the stages borrow it with borrow_pool and stage(). the workers start on first use so a run that stays
+# on the serial path (hdd or a short list) starts none. one log queue and one logging thread serve every stage. stage()
+# points the thread at the logger and progress range of the stage. the read size and entropy sampling differ by stage
+# so they go with each task and a worker only applies them when they change. it runs with the default start method
+# fork or forkserver so everything submitted has to be a module level function
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from .fileops import init_hash_worker
+from .fileops import set_entropy_sample
+from .fileops import set_read_size
+from .logs import write_log
+
+
+MAX_WORKERS = 8
+DRAIN_WAIT = 5  # seconds a stage waits for its messages to be written
+
+ACTIVE = None  # the pool opened by worker_pool
+
+WORKER_SETTINGS = None  # in the worker. (drive_type, sample_size, sample_windows) last applied
+
+
+def ready():
+    return os.getpid()
+
+
+def run_task(settings, fn, *args, **kwargs):
+    """ in the worker. apply the stage settings if they changed and run fn """
+    global WORKER_SETTINGS
+    if settings is not None and settings != WORKER_SETTINGS:
+        drive_type, sample_size, sample_windows = settings
+        set_read_size(drive_type)
+        set_entropy_sample(sample_size, sample_windows)
+        WORKER_SETTINGS = settings
+    return fn(*args, **kwargs)
+
+
+class Stage:
+    """ where the log thread sends messages and progress while a stage runs """
+
+    def __init__(self, total, strt, endp, show_progress, logger):
+        self.total = total
+        self.strt = strt
+        self.endp = endp
+        self.show_progress = show_progress and total
+        self.logger = logger
+        self.done = 0
+        self.start = time.perf_counter()
+
+    def progress(self, n):
+        self.done += n
+        rate = self.done / max(time.perf_counter() - self.start, 1e-6)
+        print(f"Progress: {self.strt + round((self.endp - self.strt) * self.done / self.total)}% {rate:.0f} files/s", flush=True)
+
+
+class WorkerPool:
+    """ ProcessPoolExecutor with one log queue for its lifetime. startup is the seconds the first start took """
+
+    def __init__(self, max_workers=None, method=None):
+        self.workers = max(1, max_workers or min(MAX_WORKERS, os.cpu_count() or 1))
+        self.ctx = mp.get_context(method)
+        self.log_q = None
+        self.startup = None
+        self.restarts = 0
+        self.stages = 0
+        self.rates = {}  # search stage -> (files, seconds). see note_rate
+
+        self._executor = None
+        self._log_t = None
+        self._stage = None
+        self._futures = []
+        self._drained = threading.Condition()
+        self._seen = 0  # last stage whose messages the log thread has written
+
+    def _start(self):
+        t = time.perf_counter()
+        if self.log_q is None:
+            # a SimpleQueue put is written before the task returns so a stage sees all its messages. a Queue puts
+            # from a feeder thread that can still be writing when the result is back
+            self.log_q = self.ctx.SimpleQueue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self.ctx,
+            initializer=init_hash_worker,
+            initargs=(self.log_q,)
+        )
+        # one task per worker so they are all up and warm before the first real chunk is timed
+        for f in [self._executor.submit(ready) for _ in range(self.workers)]:
+            f.result()
+        if self._log_t is None:
+            self._log_t = threading.Thread(target=self._log_loop, daemon=True)  # after the fork
+            self._log_t.start()
+        el = time.perf_counter() - t
+        if self.startup is None:
+            self.startup = el
+
+    def _restart(self):
+        """ a worker died. the executor is broken for good so the next stage gets a new one """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.restarts += 1
+        self._start()
+
+    def submit(self, fn, *args, settings=None, **kwargs):
+        """ fn(*args, **kwargs) in a worker. settings is (drive_type, sample_size, sample_windows) or None """
+        if self._executor is None:
+            self._start()
+        try:
+            future = self._executor.submit(run_task, settings, fn, *args, **kwargs)
+        except BrokenProcessPool:
+            self._restart()
+            future = self._executor.submit(run_task, settings, fn, *args, **kwargs)
+        self._futures.append(future)
+        return future
+
+    @contextmanager
+    def stage(self, total=0, strt=0, endp=100, show_progress=False, logger=None):
+        """ log and progress for the tasks submitted inside. at the end anything not started is cancelled and the
+            running tasks are waited on as leaving a with ProcessPoolExecutor did. then the messages already queued are
+            written to the stage logger before it returns """
+        if self._executor is None:
+            self._start()
+        self._stage = Stage(total, strt, endp, show_progress, logger)
+        self.stages += 1
+        token = self.stages
+        try:
+            yield self
+        finally:
+            for f in self._futures:
+                f.cancel()
+            wait(self._futures)
+            self._futures = []
+            self.log_q.put(("STOP", token))
+            with self._drained:
+                self._drained.wait_for(lambda: self._seen >= token, timeout=DRAIN_WAIT)
+            self._stage = None
+
+    def _log_loop(self):
+        while True:
+            msg = self.log_q.get()
+
+            if msg is None:
+                break
+            stage = self._stage
+            log = stage.logger if stage and stage.logger else logging
+            try:
+                level, message = msg
+            except Exception:
+                log.error(f"Invalid log format detected: {msg}")
+                continue
+            if level == "prog":
+                if stage and stage.show_progress:
+                    stage.progress(message)
+            elif level == "STOP":
+                with self._drained:
+                    self._seen = message
+                    self._drained.notify_all()
+            else:
+                write_log(log, level, message)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._log_t is not None:
+            self.log_q.put(None)
+            self._log_t.join()
+            self._log_t = None
+        if self.log_q is not None:
+            self.log_q.close()
+            self.log_q = None
+
+
+@contextmanager
+def worker_pool(max_workers=None, method=None):
+    """ the pool the stages borrow until the with exits """
+    global ACTIVE
+    outer = ACTIVE
+    pool = WorkerPool(max_workers, method)
+    ACTIVE = pool
+    try:
+        yield pool
+    finally:
+        ACTIVE = outer
+        pool.close()
+
+
+def note_rate(stage, files, seconds):
+    """ files and seconds of a search stage (walk hash hanly) for the analytics. kept on the open worker_pool """
+    if ACTIVE is not None and files and seconds > 0:
+        n, el = ACTIVE.rates.get(stage, (0, 0.0))
+        ACTIVE.rates[stage] = (n + files, el + seconds)
+
+
+@contextmanager
+def borrow_pool():
+    """ the open worker_pool or one for just this call as before """
+    if ACTIVE is not None:
+        yield ACTIVE
+        return
+    with worker_pool() as pool:
+        yield pool
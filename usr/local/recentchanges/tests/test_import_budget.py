@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# command line import budget                                                                  10/18/2026
+#
+# python3 -m unittest discover tests
+#
+# the command line has to start without the gui modules and within benchmarks/importbench.py BUDGET_MS. each check
+# runs a fresh interpreter with -X importtime as the benchmark does
+# flake8: noqa: E402
+import sys
+import unittest
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.importbench import BUDGET_MS
+from benchmarks.importbench import best_total
+from benchmarks.importbench import gui_modules
+
+
+RUNS = 3  # best of. a cold disk or a busy machine only slows one
+
+
+class ImportBudgetTest(unittest.TestCase):
+
+    def test_rntchanges_has_no_gui_modules(self):
+        best = best_total(sys.executable, 1, ["-c", "import src.rntchanges"], None)
+        self.assertIsNotNone(best, "import src.rntchanges failed")
+        self.assertEqual(gui_modules(best[1]), [])
+
+    def test_search_has_no_gui_modules(self):
+        best = best_total(sys.executable, 1)
+        self.assertIsNotNone(best, "main.py did not reach the search")
+        self.assertEqual(gui_modules(best[1]), [])
+
+    def test_search_within_budget(self):
+        best = best_total(sys.executable, RUNS)
+        self.assertIsNotNone(best, "main.py did not reach the search")
+        total_ms = best[0] / 1000
+        self.assertLessEqual(total_ms, BUDGET_MS, f"command line imports took {total_ms:.1f} ms. budget {BUDGET_MS:.0f} ms")
+
+
+if __name__ == "__main__":
+    unittest.main()